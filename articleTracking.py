@@ -1,13 +1,15 @@
-import json
 from collections import defaultdict
 
+from orderstream import open_orders
+
 def analyze_articles(file_path):
     """
     Analyzes a JSON file containing article data and identifies the most
     frequently ordered articles and their reception patterns.
 
     Args:
-        file_path (str): Path to the JSON file.
+        file_path (str): Path to the JSON file, or an iterable of order records
+            (e.g. from orderstream.iter_orders).
 
     Returns:
         tuple: A tuple containing:
@@ -19,28 +21,26 @@ def analyze_articles(file_path):
     article_counts = defaultdict(int)
     reception_dates = defaultdict(list)
 
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-
-        for record in data:
-            article = record.get('ARTICLE')
-            reception_date = record.get('RECEPTION_DATE')
-            if article and reception_date:
-                article_counts[article] += 1
-                reception_dates[article].append(reception_date)
+    for record in open_orders(file_path):
+        article = record.get('ARTICLE')
+        reception_date = record.get('RECEPTION_DATE')
+        if article and reception_date:
+            article_counts[article] += 1
+            reception_dates[article].append(reception_date)
 
     sorted_articles = sorted(article_counts.items(), key=lambda item: item[1], reverse=True)
 
     return sorted_articles, reception_dates
 
-# Example usage:
-file_path = 'EXTERNAL_PRODUCTIONS_converted.json'
-sorted_articles, reception_dates = analyze_articles(file_path)
+if __name__ == "__main__":
+    # Example usage:
+    file_path = 'EXTERNAL_PRODUCTIONS_converted.json'
+    sorted_articles, reception_dates = analyze_articles(file_path)
 
-print("Most Frequently Ordered Articles:")
-for article, count in sorted_articles:
-    print(f"- {article}: {count} orders")
+    print("Most Frequently Ordered Articles:")
+    for article, count in sorted_articles:
+        print(f"- {article}: {count} orders")
 
-print("\nReception Dates:")
-for article, dates in reception_dates.items():
-    print(f"- {article}: {dates}") 
\ No newline at end of file
+    print("\nReception Dates:")
+    for article, dates in reception_dates.items():
+        print(f"- {article}: {dates}") 
@@ -1,14 +1,22 @@
-import json
 from collections import defaultdict, Counter
 from datetime import datetime
 
-def analyze_articles(file_path):
+from orderstream import open_orders
+
+def analyze_articles(file_path, backend='python', state_path=None):
     """
     Analyzes a JSON file containing article data, identifies the most
     frequently ordered articles, and suggests stock levels based on ordering patterns.
 
     Args:
-        file_path (str): Path to the JSON file.
+        file_path (str): Path to the JSON file, or an iterable of order records
+            (e.g. from orderstream.iter_orders).
+        backend (str): 'python' for the record-by-record loop, 'numpy' for the
+            vectorized implementation in articlevector, or 'state' to fold only the
+            orders not seen before into the saved stockstate.StockState and read
+            the results from its aggregates.
+        state_path (str, optional): State file for the 'state' backend
+            (default stockstate.STATE_PATH).
 
     Returns:
         tuple: A tuple containing:
@@ -18,20 +26,28 @@ def analyze_articles(file_path):
             - A stock prediction based on past order frequency.
     """
 
+    if backend == 'numpy':
+        import articlevector
+        return articlevector.analyze_articles(file_path)
+    if backend == 'state':
+        state = _updated_state(file_path, state_path)
+        sorted_articles = state.sorted_articles()
+        summarized_receptions = state.summarized_receptions()
+        return sorted_articles, summarized_receptions, state.predict_stock_requirements()
+    if backend != 'python':
+        raise ValueError(f"Unknown backend: {backend}")
+
     article_counts = defaultdict(int)
     reception_dates = defaultdict(list)
 
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-
-        for record in data:
-            article = record.get('ARTICLE')
-            reception_timestamp = record.get('RECEPTION_DATE')
-            
-            if article and reception_timestamp:
-                reception_date = datetime.fromtimestamp(reception_timestamp / 1000)  # Convert ms to date
-                article_counts[article] += 1
-                reception_dates[article].append(reception_date)
+    for record in open_orders(file_path):
+        article = record.get('ARTICLE')
+        reception_timestamp = record.get('RECEPTION_DATE')
+        
+        if article and reception_timestamp:
+            reception_date = datetime.fromtimestamp(reception_timestamp / 1000)  # Convert ms to date
+            article_counts[article] += 1
+            reception_dates[article].append(reception_date)
 
     # Sort articles by their order count
     sorted_articles = sorted(article_counts.items(), key=lambda item: item[1], reverse=True)
@@ -88,16 +104,26 @@ def predict_stock_requirements(summarized_receptions):
     
     return stock_predictions
 
-# Example usage:
-file_path = 'EXTERNAL_PRODUCTIONS_converted.json'
-sorted_articles, summarized_receptions, stock_predictions = analyze_articles(file_path)
-
-# Print the most frequently ordered articles
-print("Most Frequently Ordered Articles:")
-for article, count in sorted_articles:
-    print(f"- {article}: {count} orders")
-
-# Print stock predictions
-print("\nPredicted Stock Requirements (based on average monthly orders):")
-for article, predicted_stock in stock_predictions.items():
-    print(f"- {article}: Predicted stock level: {predicted_stock} units")
+def _updated_state(file_path, state_path=None):
+    # The saved stock state with the file's new orders folded in
+    from stockstate import STATE_PATH, StockState
+
+    state = StockState.load(state_path or STATE_PATH)
+    state.update(file_path)
+    state.save()
+    return state
+
+if __name__ == "__main__":
+    # Example usage:
+    file_path = 'EXTERNAL_PRODUCTIONS_converted.json'
+    sorted_articles, summarized_receptions, stock_predictions = analyze_articles(file_path)
+
+    # Print the most frequently ordered articles
+    print("Most Frequently Ordered Articles:")
+    for article, count in sorted_articles:
+        print(f"- {article}: {count} orders")
+
+    # Print stock predictions
+    print("\nPredicted Stock Requirements (based on average monthly orders):")
+    for article, predicted_stock in stock_predictions.items():
+        print(f"- {article}: Predicted stock level: {predicted_stock} units")
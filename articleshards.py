@@ -0,0 +1,428 @@
+import codecs
+import json
+import os
+import re
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+
+import numpy as np
+
+from orderstream import open_orders
+from stockindex import StockIndex, local_month, utc_month
+
+BATCH_SIZE = 20000
+NO_INDEX = float('inf')
+# Bytes a range worker reads at a time past the end of its range
+READ_SIZE = 1 << 20
+# Bytes scanned at a time for quotes and brackets
+SCAN_BLOCK = 1 << 24
+# Record index of a file part's first record: part * PART_STRIDE, so indexes from
+# different parts keep the file order when compared
+PART_STRIDE = 1 << 40
+# The rest of a JSON string from inside it; an unterminated one runs to the end
+_STRING_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*(?:"|\Z)', re.DOTALL)
+# Strings and brackets, walked to find the first record of a range
+_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*(?:"|\Z)|[{}\[\]]', re.DOTALL)
+_SEPARATOR = re.compile(r'[\s,]*')
+
+
+def _new_article(index):
+    # [first index, orders, first index with QTY, orders with QTY, QTY sum,
+    #  reception months, send months]
+    return [index, 0, NO_INDEX, 0, 0, {}, {}]
+
+
+def aggregate_rows(partial, rows):
+    """
+    Folds compact order rows into a shard's partial aggregates.
+
+    Each row is (record index, ARTICLE, RECEPTION_DATE, SEND_DATE, QTY). The record
+    index is kept for every article and month so the merged result can restore
+    the first-seen order the serial scripts produce.
+
+    Args:
+        partial (dict): article -> aggregate list, updated in place.
+        rows (iterable): Compact order rows.
+
+    Returns:
+        dict: The updated partial aggregates.
+    """
+    for index, article, reception_timestamp, send_timestamp, qty in rows:
+        entry = partial.get(article)
+        if entry is None:
+            entry = partial[article] = _new_article(index)
+
+        if reception_timestamp:
+            year, month = local_month(reception_timestamp)
+            bucket = entry[5].get((year, month))
+            if bucket is None:
+                # [first index, orders, first index with QTY, orders with QTY]
+                bucket = entry[5][(year, month)] = [index, 0, NO_INDEX, 0]
+            bucket[1] += 1
+            entry[1] += 1
+            if qty is not None:
+                if bucket[3] == 0:
+                    bucket[2] = index
+                bucket[3] += 1
+                if entry[3] == 0:
+                    entry[2] = index
+                entry[3] += 1
+                entry[4] += qty
+
+        if send_timestamp is not None:
+            send_bucket = entry[6].setdefault(utc_month(send_timestamp), [0, 0])
+            send_bucket[0] += qty or 0
+            send_bucket[1] += 1
+
+    return partial
+
+
+def _merge_partials(partials):
+    """
+    Merges partial aggregates over overlapping articles (e.g. from different
+    parts of the file): counts and sums add up, first indexes take the minimum.
+
+    Args:
+        partials (iterable): Partial aggregates from aggregate_rows.
+
+    Returns:
+        dict: article -> merged aggregate list.
+    """
+    merged = {}
+    for partial in partials:
+        for article, entry in partial.items():
+            into = merged.get(article)
+            if into is None:
+                merged[article] = entry
+                continue
+            into[0] = min(into[0], entry[0])
+            into[1] += entry[1]
+            into[2] = min(into[2], entry[2])
+            into[3] += entry[3]
+            into[4] += entry[4]
+            for month, bucket in entry[5].items():
+                target = into[5].get(month)
+                if target is None:
+                    into[5][month] = bucket
+                else:
+                    target[0] = min(target[0], bucket[0])
+                    target[1] += bucket[1]
+                    target[2] = min(target[2], bucket[2])
+                    target[3] += bucket[3]
+            for month, bucket in entry[6].items():
+                target = into[6].setdefault(month, [0, 0])
+                target[0] += bucket[0]
+                target[1] += bucket[1]
+    return merged
+
+
+def _scan_range(task):
+    # For bytes [start, end): whether they hold an odd number of unescaped quotes,
+    # and the brackets opened minus closed outside strings if the range starts
+    # outside a string, and if it starts inside one. Quotes, backslashes and
+    # brackets are ASCII, so the raw bytes can be scanned without decoding.
+    path, start, end = task
+    odd = 0  # Inside a string, counting from outside at start
+    backslashes = 0  # Backslashes ending the previous block
+    opened = closed = opened_inside = closed_inside = 0
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(SCAN_BLOCK, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            data = np.frombuffer(block, dtype=np.uint8)
+            quote = data == ord('"')
+            if quote[0] and backslashes % 2:
+                quote[0] = False
+            if b'\\' in block:
+                # A quote after an odd run of backslashes is escaped
+                backslash = data == ord('\\')
+                for position in np.flatnonzero(quote[1:] & backslash[:-1]) + 1:
+                    run = 1
+                    while run < position and block[position - run - 1] == ord('\\'):
+                        run += 1
+                    if run == position:
+                        run += backslashes
+                    if run % 2:
+                        quote[position] = False
+                trailing = len(block) - len(block.rstrip(b'\\'))
+                backslashes = trailing + backslashes if trailing == len(block) else trailing
+            else:
+                backslashes = 0
+            inside = np.bitwise_xor.accumulate(quote.view(np.uint8)).view(bool)
+            if odd:
+                inside = ~inside
+            opening = (data == ord('{')) | (data == ord('['))
+            closing = (data == ord('}')) | (data == ord(']'))
+            opened += int(np.count_nonzero(opening))
+            closed += int(np.count_nonzero(closing))
+            opened_inside += int(np.count_nonzero(opening & inside))
+            closed_inside += int(np.count_nonzero(closing & inside))
+            odd = int(inside[-1])
+    return odd, (opened - opened_inside) - (closed - closed_inside), opened_inside - closed_inside
+
+
+def _range_rows(path, part, start, end, in_string, depth, record_depth):
+    # Compact rows of the records that start in bytes [start, end) of a JSON array
+    # or NDJSON file, given whether the range starts inside a string and at which
+    # bracket depth. The first record is the first '{' outside strings at the depth
+    # of the records; the last one may run past end.
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    with open(path, 'rb') as f:
+        f.seek(start)
+        text = text_decoder.decode(f.read(end - start))
+        end_pos = len(text)
+        eof = False
+
+        pos = _STRING_REST.match(text).end() if in_string else 0
+        while True:
+            token = _TOKEN.search(text, pos)
+            if token is None or token.start() >= end_pos:
+                return
+            pos = token.end()
+            char = token.group()
+            if char == '{' and depth == record_depth:
+                pos = token.start()
+                break
+            if char in '{[':
+                depth += 1
+            elif char in '}]':
+                depth -= 1
+
+        index = part * PART_STRIDE
+        while pos < end_pos:
+            while True:
+                try:
+                    record, record_end = decoder.raw_decode(text, pos)
+                    break
+                except ValueError:
+                    if eof:
+                        raise
+                    # The record runs past the loaded text
+                    chunk = f.read(READ_SIZE)
+                    eof = not chunk
+                    text += text_decoder.decode(chunk, final=eof)
+            if not isinstance(record, dict):
+                raise ValueError(f"Expected an order record at byte {start} + {pos} characters")
+            article = record.get('ARTICLE')
+            if article:
+                yield index, article, record.get('RECEPTION_DATE'), record.get('SEND_DATE'), record.get('QTY')
+            index += 1
+            pos = _SEPARATOR.match(text, record_end).end()
+            if pos < len(text) and text[pos] == ']':
+                return
+
+
+def _aggregate_range(task):
+    try:
+        return aggregate_rows({}, _range_rows(*task))
+    except ValueError:
+        # Malformed or unexpected JSON: the caller aggregates the file serially,
+        # which reports the error if the file really is malformed
+        return None
+
+
+def _aggregate_batch(rows):
+    return aggregate_rows({}, rows)
+
+
+def _byte_ranges(path, parts):
+    # Equal byte ranges, each starting on a UTF-8 character boundary and never
+    # right after a backslash, so no escape sequence is split between ranges
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as f:
+        for part in range(1, parts):
+            offset = max(size * part // parts, bounds[-1], 1)
+            f.seek(offset - 1)
+            previous = f.read(1)
+            while offset < size:
+                current = f.read(1)
+                if (current[0] & 0xC0) != 0x80 and previous != b'\\':
+                    break
+                previous = current
+                offset += 1
+            bounds.append(min(offset, size))
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _record_depth(path):
+    # Bracket depth of the records: 1 inside a top-level array, 0 for NDJSON
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(4096), b''):
+            stripped = block.lstrip()
+            if stripped:
+                return 1 if stripped[:1] == b'[' else 0
+    return 0
+
+
+def _compact_rows(records, start=0):
+    for index, record in enumerate(records, start):
+        article = record.get('ARTICLE')
+        if article:
+            yield index, article, record.get('RECEPTION_DATE'), record.get('SEND_DATE'), record.get('QTY')
+
+
+class ArticleAggregates:
+    """
+    Merged per-article aggregates, from which the article and stock analyses are
+    answered. Produced by aggregate_articles for any number of workers.
+    """
+
+    def __init__(self, partials):
+        merged = _merge_partials(partials)
+        self.articles = dict(sorted(merged.items(), key=lambda item: item[1][0]))
+
+    def analyze_articles(self):
+        """
+        Same result as articlegpt.analyze_articles.
+
+        Returns:
+            tuple: (sorted_articles, summarized_receptions, stock_predictions).
+        """
+        article_counts = {}
+        summarized_receptions = {}
+        for article, entry in self.articles.items():
+            if entry[1] == 0:
+                continue
+            article_counts[article] = entry[1]
+            months = sorted(entry[5].items(), key=lambda item: item[1][0])
+            summarized_receptions[article] = {f"{year:04d}-{month:02d}": bucket[1]
+                                              for (year, month), bucket in months}
+
+        # Articles appear in order of their first reception, as in the serial loop
+        first_reception = {article: min(bucket[0] for bucket in self.articles[article][5].values())
+                           for article in article_counts}
+        order = sorted(article_counts, key=first_reception.get)
+        article_counts = {article: article_counts[article] for article in order}
+        summarized_receptions = {article: summarized_receptions[article] for article in order}
+
+        sorted_articles = sorted(article_counts.items(), key=lambda item: item[1], reverse=True)
+        stock_predictions = {article: _moving_average(list(monthly.values()))
+                             for article, monthly in summarized_receptions.items()}
+        return sorted_articles, summarized_receptions, stock_predictions
+
+    def article_quantities(self, top_n=5):
+        """
+        Same result as finalarticle.analyze_articles.
+
+        Returns:
+            dict: "most_frequent_articles" and "predicted_stock_needs".
+        """
+        # Only orders with a QTY count here; order articles by their first such order
+        first_with_qty = {article: entry[2] for article, entry in self.articles.items() if entry[3]}
+        with_qty = [(article, self.articles[article]) for article in sorted(first_with_qty, key=first_with_qty.get)]
+
+        quantities = {article: entry[4] for article, entry in with_qty}
+        most_frequent = sorted(quantities.items(), key=lambda item: item[1], reverse=True)
+
+        predicted_stock_needs = {}
+        for article, entry in with_qty:
+            months = sorted((bucket for bucket in entry[5].values() if bucket[3]), key=lambda bucket: bucket[2])
+            predicted_stock_needs[article] = _moving_average([bucket[3] for bucket in months])
+
+        return {
+            "most_frequent_articles": [article for article, _ in most_frequent[:top_n]],
+            "predicted_stock_needs": predicted_stock_needs
+        }
+
+    def stock_index(self):
+        """
+        Returns a StockIndex (UTC SEND_DATE months) for analyze_stock-style queries.
+
+        Returns:
+            StockIndex: Index equal to StockIndex.build over the same records.
+        """
+        index = StockIndex(utc=True)
+        index.article_counts = Counter()
+        for article, entry in self.articles.items():
+            orders = sum(bucket[1] for bucket in entry[6].values())
+            if orders:
+                index.article_counts[article] = orders
+                index.monthly[article] = entry[6]
+        return index
+
+
+def _moving_average(order_counts):
+    if len(order_counts) >= 3:
+        return sum(order_counts[-3:]) // 3
+    return sum(order_counts) // len(order_counts)
+
+
+def aggregate_articles(source, workers=None, batch_size=BATCH_SIZE):
+    """
+    Computes per-article counts, monthly histograms and QTY sums, optionally
+    spread over worker processes.
+
+    A file is split into one byte range per worker. A first pass counts, per
+    range, the unescaped quotes and the brackets opened outside strings; chained
+    from the start of the file these give whether each range starts inside a
+    string and at which depth, so every worker can find its first record exactly
+    (braces inside string values are never taken for records). Each worker then
+    parses and aggregates the records starting in its range and the parent only
+    merges the partial results. If a worker meets JSON it cannot decode, the file
+    is aggregated serially instead, which raises if it really is malformed.
+    Records from an iterable are sent to the workers in batches of compact rows.
+    The output is identical for any worker count.
+
+    Args:
+        source: Path to the JSON order file, or an iterable of order records.
+        workers (int, optional): Number of worker processes. Defaults to the CPU
+            count; 1 aggregates in the calling process.
+        batch_size (int): Records per batch sent to a worker for an iterable source.
+
+    Returns:
+        ArticleAggregates: The merged aggregates.
+
+    Raises:
+        RuntimeError: If a worker process exits before finishing.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    if workers == 1:
+        return ArticleAggregates([aggregate_rows({}, _compact_rows(open_orders(source)))])
+
+    is_path = isinstance(source, (str, bytes)) or hasattr(source, '__fspath__')
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            if is_path:
+                ranges = _byte_ranges(source, workers)
+                scans = pool.map(_scan_range, [(source, start, end) for start, end in ranges])
+                record_depth = _record_depth(source)
+                tasks, in_string, depth = [], False, 0
+                for part, ((start, end), (odd, outside, inside)) in enumerate(zip(ranges, scans)):
+                    tasks.append((source, part, start, end, in_string, depth, record_depth))
+                    depth += inside if in_string else outside
+                    in_string ^= bool(odd)
+                partials = list(pool.map(_aggregate_range, tasks))
+                if None not in partials:
+                    return ArticleAggregates(partials)
+            else:
+                # Bound the batches in flight so a fast reader does not buffer the whole source
+                partials, pending = [], deque()
+                rows = _compact_rows(open_orders(source))
+                for batch in iter(lambda: list(islice(rows, batch_size)), []):
+                    pending.append(pool.submit(_aggregate_batch, batch))
+                    if len(pending) > 2 * workers:
+                        partials.append(pending.popleft().result())
+                partials.extend(future.result() for future in pending)
+                return ArticleAggregates(partials)
+    except BrokenProcessPool as error:
+        raise RuntimeError("An article shard worker exited unexpectedly") from error
+
+    return ArticleAggregates([aggregate_rows({}, _compact_rows(open_orders(source)))])
+
+
+if __name__ == "__main__":
+    aggregates = aggregate_articles('EXTERNAL_PRODUCTIONS_converted.json', workers=2)
+    print(aggregates.article_quantities())
+    print(aggregates.stock_index().predict(month=10, year=2023))
@@ -0,0 +1,211 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from orderstream import open_orders
+
+
+def month_codes(timestamps_ms, utc=False):
+    """
+    Converts epoch-millisecond timestamps into integer month codes
+    (months since 1970-01, so code = (year - 1970) * 12 + month - 1).
+
+    In UTC this is pure array arithmetic through datetime64. In local time (what
+    datetime.fromtimestamp uses in the scripts) each distinct timestamp is converted
+    once and broadcast back, since orders share a small set of reception dates.
+
+    Args:
+        timestamps_ms (array-like): Milliseconds since the Unix epoch.
+        utc (bool): Bucket in UTC instead of the local time zone.
+
+    Returns:
+        np.ndarray: int64 month code per timestamp.
+    """
+    timestamps_ms = np.asarray(timestamps_ms)
+    if utc:
+        return timestamps_ms.astype('int64').astype('datetime64[ms]').astype('datetime64[M]').astype('int64')
+
+    inverse, unique_ms = pd.factorize(timestamps_ms)
+    unique_codes = np.empty(len(unique_ms), dtype='int64')
+    for i, ms in enumerate(unique_ms.tolist()):
+        date = datetime.fromtimestamp(ms / 1000)
+        unique_codes[i] = (date.year - 1970) * 12 + date.month - 1
+    return unique_codes[inverse]
+
+
+def format_month(code):
+    """
+    Formats a month code as 'YYYY-MM'.
+
+    Args:
+        code (int): Months since 1970-01.
+
+    Returns:
+        str: The month in '%Y-%m' form.
+    """
+    year, month = divmod(int(code), 12)
+    return f"{year + 1970:04d}-{month + 1:02d}"
+
+
+def orders_to_arrays(source, require_qty=False):
+    """
+    Collects the ARTICLE, RECEPTION_DATE and QTY fields into arrays, keeping only
+    the records the scripts would count (article and reception date present, and
+    QTY present when require_qty is set).
+
+    Args:
+        source: Path to the JSON file, an iterable of order records, or a DataFrame
+            with ARTICLE, RECEPTION_DATE (epoch ms) and QTY columns.
+        require_qty (bool): Also drop records whose QTY is missing.
+
+    Returns:
+        tuple: (articles, reception_ms, qty) as NumPy arrays.
+    """
+    if isinstance(source, pd.DataFrame):
+        articles = source['ARTICLE'].to_numpy(dtype=object)
+        reception = source['RECEPTION_DATE']
+        if pd.api.types.is_datetime64_any_dtype(reception):
+            # NaT becomes 0, which the truthiness filter below drops like a missing date
+            reception_ms = np.where(reception.notna(), reception.to_numpy('datetime64[ms]').view('int64'), 0)
+        else:
+            reception_ms = reception.to_numpy()
+        qty = source['QTY'].to_numpy() if 'QTY' in source else np.zeros(len(source))
+        keep = pd.notna(articles) & (articles != '') & pd.notna(reception_ms) & (reception_ms != 0)
+        if require_qty:
+            keep &= pd.notna(qty)
+        return articles[keep], reception_ms[keep].astype('int64'), qty[keep]
+
+    articles = []
+    reception_ms = []
+    qty = []
+    for record in open_orders(source):
+        article = record.get('ARTICLE')
+        reception_timestamp = record.get('RECEPTION_DATE')
+        quantity = record.get('QTY')
+        if article and reception_timestamp and (quantity is not None or not require_qty):
+            articles.append(article)
+            reception_ms.append(reception_timestamp)
+            qty.append(quantity if quantity is not None else 0)
+
+    return (np.array(articles, dtype=object), np.array(reception_ms, dtype='int64'),
+            np.array(qty) if qty else np.array([], dtype='int64'))
+
+
+def _grouped_months(article_codes, months):
+    """
+    Groups rows by (article, month) and orders each article's months by first
+    appearance, the order a Counter fed in record order would produce.
+
+    Returns:
+        tuple: (group_article, group_month, group_count) arrays sorted by article
+        and then by first appearance.
+    """
+    month_min = months.min()
+    span = months.max() - month_min + 1
+    keys = article_codes.astype('int64') * span + (months - month_min)
+
+    unique_keys, first_index, counts = np.unique(keys, return_index=True, return_counts=True)
+    group_article = unique_keys // span
+    order = np.lexsort((first_index, group_article))
+    return group_article[order], (unique_keys % span + month_min)[order], counts[order]
+
+
+def _moving_average(group_article, group_count, n_articles):
+    """
+    Integer average of each article's last three months (or of all months when it
+    has fewer than three), as in predict_stock_requirements.
+    """
+    months_per_article = np.bincount(group_article, minlength=n_articles)
+    starts = np.concatenate(([0], np.cumsum(months_per_article)[:-1]))
+    position = np.arange(len(group_article)) - starts[group_article]
+    in_last_three = position >= months_per_article[group_article] - 3
+
+    total = np.bincount(group_article, weights=group_count, minlength=n_articles).astype('int64')
+    last_three = np.bincount(group_article, weights=group_count * in_last_three,
+                             minlength=n_articles).astype('int64')
+    return np.where(months_per_article >= 3, last_three // 3,
+                    total // np.maximum(months_per_article, 1))
+
+
+def _sum_by_article(article_codes, values, n_articles):
+    sums = np.bincount(article_codes, weights=values, minlength=n_articles)
+    if np.issubdtype(np.asarray(values).dtype, np.integer):
+        return sums.round().astype('int64')
+    return sums
+
+
+def analyze_articles(source, utc=False):
+    """
+    Vectorized equivalent of articlegpt.analyze_articles.
+
+    Args:
+        source: Path to the JSON file, an iterable of order records, or a DataFrame.
+        utc (bool): Bucket reception dates by UTC month instead of local time.
+
+    Returns:
+        tuple: A tuple containing:
+            - A sorted list of tuples (article, count) representing the
+              most frequently ordered articles and their order counts.
+            - A dictionary mapping each article to a summarized reception frequency.
+            - A stock prediction based on past order frequency.
+    """
+    articles, reception_ms, _ = orders_to_arrays(source)
+    if len(articles) == 0:
+        return [], {}, {}
+
+    article_codes, names = pd.factorize(articles)
+    n_articles = len(names)
+    months = month_codes(reception_ms, utc=utc)
+
+    counts = np.bincount(article_codes, minlength=n_articles)
+    ranking = np.argsort(-counts, kind='stable')
+    sorted_articles = list(zip(names[ranking].tolist(), counts[ranking].tolist()))
+
+    group_article, group_month, group_count = _grouped_months(article_codes, months)
+    summarized_receptions = {article: {} for article in names.tolist()}
+    for article, month, count in zip(group_article.tolist(), group_month.tolist(), group_count.tolist()):
+        summarized_receptions[names[article]][format_month(month)] = count
+
+    predictions = _moving_average(group_article, group_count, n_articles)
+    stock_predictions = dict(zip(names.tolist(), predictions.tolist()))
+
+    return sorted_articles, summarized_receptions, stock_predictions
+
+
+def analyze_article_quantities(source, utc=False, top_n=5):
+    """
+    Vectorized equivalent of finalarticle.analyze_articles.
+
+    Args:
+        source: Path to the JSON file, an iterable of order records, or a DataFrame.
+        utc (bool): Bucket reception dates by UTC month instead of local time.
+        top_n (int): Number of articles to list by total quantity ordered.
+
+    Returns:
+        dict: A dictionary containing:
+            - "most_frequent_articles": A list of the most frequently ordered articles.
+            - "predicted_stock_needs": A dictionary mapping article to predicted stock need.
+    """
+    articles, reception_ms, qty = orders_to_arrays(source, require_qty=True)
+    if len(articles) == 0:
+        return {"most_frequent_articles": [], "predicted_stock_needs": {}}
+
+    article_codes, names = pd.factorize(articles)
+    n_articles = len(names)
+    months = month_codes(reception_ms, utc=utc)
+
+    quantities = _sum_by_article(article_codes, qty, n_articles)
+    ranking = np.argsort(-quantities, kind='stable')[:top_n]
+
+    group_article, _, group_count = _grouped_months(article_codes, months)
+    predictions = _moving_average(group_article, group_count, n_articles)
+
+    return {
+        "most_frequent_articles": names[ranking].tolist(),
+        "predicted_stock_needs": dict(zip(names.tolist(), predictions.tolist()))
+    }
+
+
+if __name__ == "__main__":
+    print(analyze_article_quantities('EXTERNAL_PRODUCTIONS_converted.json'))
@@ -2,6 +2,9 @@ import pandas as pd
 from sklearn.linear_model import LinearRegression
 from sklearn.model_selection import train_test_split
 
+from fulfillment import fulfillment_metrics
+from ordermodel import load_orders
+
 def analyze_production(file):
     """
     Analyzes production data from an Excel file.
@@ -13,7 +16,7 @@ def analyze_production(file):
         None. Prints results to the console.
     """
 
-    df = pd.read_excel(file)
+    df = load_orders(file).to_frame()
 
     # Calculate production time
     df["SEND_DATE"] = pd.to_datetime(df["SEND_DATE"], format='%Y-%m-%d %H:%M:%S', errors='coerce')
@@ -23,16 +26,11 @@ def analyze_production(file):
     # Identify orders with and without errors
     df["HAS_ERRORS"] = (df["MISSING"] > 0) | (df["REJECTED"] > 0)
 
-    # Calculate average production time for orders with errors
-    avg_production_time_with_errors = df[df["HAS_ERRORS"] == True]["PRODUCTION_TIME"].mean()
-
-    # Calculate average production time for orders without errors
-    avg_production_time_without_errors = df[df["HAS_ERRORS"] == False]["PRODUCTION_TIME"].mean()
-
-    # Calculate accuracy rate
-    total_orders = len(df)
-    accurate_orders = len(df[df["HAS_ERRORS"] == False])
-    accuracy_rate = (accurate_orders / total_orders) * 100
+    # Calculate average production times and accuracy rate in one grouped pass
+    metrics = fulfillment_metrics(df)
+    avg_production_time_with_errors = metrics["avg_time_with_errors"]
+    avg_production_time_without_errors = metrics["avg_time_without_errors"]
+    accuracy_rate = metrics["accuracy_rate"]
 
     print(f"Average Production Time (Orders with Errors): {avg_production_time_with_errors:.2f} days")
     print(f"Average Production Time (Orders without Errors): {avg_production_time_without_errors:.2f} days")
@@ -66,5 +64,6 @@ def analyze_production(file):
     else:
         print("Quantity and production time have a similar impact on error rates.")
 
-# Example usage:
-analyze_production("EXTERNAL_PRODUCTIONS_converted.xlsx")
+if __name__ == "__main__":
+    # Example usage:
+    analyze_production("EXTERNAL_PRODUCTIONS_converted.xlsx")
@@ -1,5 +1,8 @@
 import pandas as pd
 
+from fulfillment import fulfillment_metrics
+from ordermodel import load_orders
+
 def analyze_production(file):
     """
     Analyzes production data from an Excel file to calculate:
@@ -16,7 +19,7 @@ def analyze_production(file):
     """
     # Load the Excel file into a pandas DataFrame
     try:
-        df = pd.read_excel(file)
+        df = load_orders(file).to_frame()
     except FileNotFoundError:
         print(f"Error: File not found at 'EXTERNAL_PRODUCTIONS_converted.xlsx'. Please check the file path.")
         return
@@ -31,14 +34,11 @@ def analyze_production(file):
     # Identify orders with and without errors
     df['ERRORS'] = (df['MISSING'] > 0) | (df['REJECTED'] > 0)
 
-    # Calculate average production times
-    average_time_with_errors = df[df['ERRORS']]['PRODUCTION_TIME'].mean()
-    average_time_without_errors = df[~df['ERRORS']]['PRODUCTION_TIME'].mean()
-
-    # Calculate accuracy rate
-    total_orders = len(df)
-    accurate_orders = len(df[~df['ERRORS']])
-    accuracy_rate = (accurate_orders / total_orders) * 100
+    # Calculate average production times and accuracy rate in one grouped pass
+    metrics = fulfillment_metrics(df)
+    average_time_with_errors = metrics['avg_time_with_errors']
+    average_time_without_errors = metrics['avg_time_without_errors']
+    accuracy_rate = metrics['accuracy_rate']
 
     # Print the results
     print("Production Analysis:")
@@ -46,5 +46,6 @@ def analyze_production(file):
     print(f"Average Production Time (Orders without Errors): {average_time_without_errors:.2f} days")
     print(f"Average Accuracy Rate: {accuracy_rate:.2f}%")
 
-# Call the function to perform the analysis
-analyze_production("EXTERNAL_PRODUCTIONS_converted.xlsx") 
\ No newline at end of file
+if __name__ == "__main__":
+    # Call the function to perform the analysis
+    analyze_production("EXTERNAL_PRODUCTIONS_converted.xlsx") 
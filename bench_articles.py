@@ -0,0 +1,63 @@
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import articlegpt
+import articlevector
+import finalarticle
+from orderstream import iter_orders
+from synthdata import synthetic_orders, write_records
+
+def time_call(func, *args, repeat=3):
+    """
+    Returns the best wall time of `repeat` calls and the last result.
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the python and numpy article backends.")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'orders.json')
+        write_records(synthetic_orders(args.rows), path)
+
+        # Parse once so the comparison measures the analysis, not JSON decoding
+        records = [
+            {key: record[key] for key in ('ARTICLE', 'RECEPTION_DATE', 'QTY')}
+            for record in iter_orders(path)
+        ]
+
+        frame = pd.DataFrame(records)
+
+        cases = [
+            ('articlegpt.analyze_articles', articlegpt.analyze_articles, articlevector.analyze_articles),
+            ('finalarticle.analyze_articles', finalarticle.analyze_articles,
+             articlevector.analyze_article_quantities),
+        ]
+        print(f"{args.rows:,} synthetic orders")
+        for name, python_impl, numpy_impl in cases:
+            python_time, expected = time_call(python_impl, records, repeat=args.repeat)
+            numpy_time, result = time_call(numpy_impl, records, repeat=args.repeat)
+            frame_time, frame_result = time_call(numpy_impl, frame, repeat=args.repeat)
+            if result != expected or frame_result != expected:
+                raise AssertionError(f"{name}: numpy backend result differs from python backend")
+            print(f"{name}: python {python_time:.3f}s, "
+                  f"numpy from records {numpy_time:.3f}s ({python_time / numpy_time:.1f}x), "
+                  f"numpy from columns {frame_time:.3f}s ({python_time / frame_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import os
+import tempfile
+import time
+
+from articleshards import aggregate_articles
+from synthdata import synthetic_orders, write_records
+
+# OBSERVATION values with braces, brackets, quotes and escapes inside the string,
+# which must never be taken for record boundaries
+TRICKY_OBSERVATIONS = ['x,{},y', '{"ARTICLE": "31/1-0000"}', '], [{', 'quote " and \\" }', '\\', 'é{ñ}']
+
+
+def _result(aggregates):
+    return (aggregates.analyze_articles(), aggregates.article_quantities(),
+            aggregates.stock_index().predict(month=10, year=2020))
+
+
+def check_string_braces(directory, rows=2000, worker_counts=range(2, 8)):
+    """
+    Checks that every worker count gives the serial result on orders whose string
+    values contain braces, brackets and escaped quotes.
+
+    Raises:
+        AssertionError: If a worker count gives a different result.
+    """
+    def tricky():
+        for chunk in synthetic_orders(rows, chunk_size=500):
+            for i, record in enumerate(chunk):
+                record['OBSERVATION'] = TRICKY_OBSERVATIONS[i % len(TRICKY_OBSERVATIONS)] * (1 + i % 3)
+            yield chunk
+
+    for name, fmt in (('tricky.json', 'json'), ('tricky.ndjson', 'ndjson')):
+        path = os.path.join(directory, name)
+        write_records(tricky(), path, fmt)
+        expected = _result(aggregate_articles(path, workers=1))
+        for workers in worker_counts:
+            if _result(aggregate_articles(path, workers=workers)) != expected:
+                raise AssertionError(f"{workers} workers misread string values in {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sharded article aggregation from 1 to N workers.")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'orders.json')
+        write_records(synthetic_orders(args.rows), path)
+        check_string_braces(tmp)
+
+        # Each run parses the file too: the workers read their own byte ranges of it
+        print(f"{args.rows:,} synthetic orders")
+        baseline_time = None
+        expected = None
+        for workers in range(1, args.max_workers + 1):
+            start = time.perf_counter()
+            result = _result(aggregate_articles(path, workers=workers))
+            elapsed = time.perf_counter() - start
+
+            if expected is None:
+                expected, baseline_time = result, elapsed
+            elif result != expected:
+                raise AssertionError(f"{workers} workers produced a different result than 1 worker")
+            print(f"{workers} worker(s): {elapsed:.3f}s, speedup {baseline_time / elapsed:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from synthdata import FORMATS, XLSX_MAX_ROWS, generate, parse_rows
+
+DATA_DIR = os.path.join('.cache', 'bench')
+
+
+def _analyze_articles(path):
+    import articlegpt
+    return articlegpt.analyze_articles(path)
+
+
+def _analyze_stock(path):
+    import FIXarticleattempt2
+    return FIXarticleattempt2.analyze_stock(path, month=10, year=2023)
+
+
+def _transform_data(path):
+    import jsonprod
+    return jsonprod.transform_data(path)
+
+
+def _analyze_order_fulfillment(path):
+    import both
+    return both.analyze_order_fulfillment(path)
+
+
+def _size_anova(path):
+    import sizeattempt
+    from ordermodel import load_orders
+    return sizeattempt.size_anova(load_orders(path).to_frame())
+
+
+def _size_analysis(path):
+    import sizeanalysis
+    from ordermodel import load_orders
+    df = load_orders(path).to_frame()
+    return sizeanalysis.test_sizes(df, 'kruskal'), sizeanalysis.bootstrap_error_rates(df)
+
+
+def _pollinator_correlation(path):
+    import pollin
+    from orderstream import iter_orders
+    # iter_orders reads any JSON array or NDJSON file of records
+    return pollin.pollinator_correlation(list(iter_orders(path)))
+
+
+def _pollinator_groups(path):
+    import pollinatorstats
+    return pollinatorstats.pollinator_regression(path).results()
+
+
+def _lot_ranking(path):
+    import lotranking
+    columns = lotranking.lot_columns(path)
+    return lotranking.rank_lots(columns), lotranking.rank_lots(columns, by=('Module', 'Turn', 'Variety'))
+
+
+# Case name -> (dataset, formats it accepts, function of the data path)
+CASES = {
+    'analyze_articles': ('orders', ('json', 'ndjson'), _analyze_articles),
+    'analyze_stock': ('orders', ('json', 'ndjson'), _analyze_stock),
+    'transform_data': ('orders', ('json', 'ndjson'), _transform_data),
+    'analyze_order_fulfillment': ('orders', ('json', 'ndjson', 'xlsx'), _analyze_order_fulfillment),
+    'size_anova': ('orders', ('json', 'ndjson', 'xlsx'), _size_anova),
+    'size_analysis': ('orders', ('json', 'ndjson', 'xlsx'), _size_analysis),
+    'pollinator_correlation': ('flowering', ('json', 'ndjson'), _pollinator_correlation),
+    'pollinator_groups': ('flowering', ('json', 'ndjson'), _pollinator_groups),
+    'lot_ranking': ('flowering', ('json', 'ndjson'), _lot_ranking),
+}
+
+
+def dataset_path(dataset, rows, fmt, data_dir=DATA_DIR, seed=42):
+    """
+    Returns the path of a synthetic data file, generating it on first use.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"synthetic_{dataset}_{rows}_{seed}.{fmt}")
+    if not os.path.exists(path):
+        tmp_path = f"{path}.tmp.{fmt}"
+        generate(dataset, rows, tmp_path, fmt, seed)
+        os.replace(tmp_path, path)
+    return path
+
+
+def _measure(case, path, repeat):
+    # Runs in a fresh process so peak RSS belongs to this case alone
+    func = CASES[case][2]
+    with contextlib.redirect_stdout(io.StringIO()):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(path)
+            times.append(time.perf_counter() - start)
+
+        # A separate traced run, since tracing slows the timed ones down
+        tracemalloc.start()
+        func(path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'times': times,
+        'peak_traced_bytes': peak,
+        'max_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    }
+
+
+def run_case(case, path, repeat=3):
+    """
+    Times one entry point on one data file and profiles its memory.
+
+    The case runs in a spawned child process: `repeat` timed calls, then one call
+    under tracemalloc for the peak of Python/NumPy allocations. The child's maximum
+    resident set size is reported as well.
+
+    Args:
+        case (str): Name from CASES.
+        path (str): Data file to run on.
+        repeat (int): Timed calls.
+
+    Returns:
+        dict: first, best and mean seconds, every time, peak traced bytes and max RSS bytes.
+    """
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        measured = pool.apply(_measure, (case, path, repeat))
+    times = measured['times']
+    return {
+        'first_seconds': times[0],
+        'best_seconds': min(times),
+        'mean_seconds': sum(times) / len(times),
+        **measured,
+    }
+
+
+def environment():
+    """
+    Describes the code version and machine a run was made on.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_suite(rows=(10000,), formats=FORMATS, cases=None, repeat=3, data_dir=DATA_DIR, seed=42):
+    """
+    Runs every selected case on synthetic data of each size and format.
+
+    Combinations a case does not read, and xlsx files above the worksheet row
+    limit, are recorded as skipped.
+
+    Returns:
+        dict: {'environment': ..., 'results': [one dict per case, rows and format]}.
+    """
+    results = []
+    for n in rows:
+        for fmt in formats:
+            for case in cases or CASES:
+                dataset, accepted, _ = CASES[case]
+                result = {'case': case, 'dataset': dataset, 'rows': n, 'format': fmt}
+                if fmt not in accepted:
+                    results.append({**result, 'skipped': f"{case} does not read {fmt}"})
+                    continue
+                if fmt == 'xlsx' and n > XLSX_MAX_ROWS:
+                    results.append({**result, 'skipped': f"more than {XLSX_MAX_ROWS} rows do not fit in xlsx"})
+                    continue
+                path = dataset_path(dataset, n, fmt, data_dir, seed)
+                result.update(run_case(case, path, repeat))
+                print(f"{case} [{n:,} {fmt}]: best {result['best_seconds']:.3f}s, "
+                      f"peak traced {result['peak_traced_bytes'] / 2**20:.1f} MiB, "
+                      f"max RSS {result['max_rss_bytes'] / 2**20:.1f} MiB")
+                results.append(result)
+    return {'environment': environment(), 'results': results}
+
+
+def compare(previous, current, threshold=1.10):
+    """
+    Lists cases whose best time grew by more than `threshold` between two runs.
+
+    Args:
+        previous (dict): Earlier run_suite output.
+        current (dict): Later run_suite output.
+        threshold (float): Allowed ratio of current to previous best time.
+
+    Returns:
+        list: (case, rows, format, previous seconds, current seconds) for each regression.
+    """
+    def timed(run):
+        return {(r['case'], r['rows'], r['format']): r['best_seconds']
+                for r in run['results'] if 'best_seconds' in r}
+
+    before = timed(previous)
+    return [(case, n, fmt, before[case, n, fmt], seconds)
+            for (case, n, fmt), seconds in timed(current).items()
+            if (case, n, fmt) in before and seconds > before[case, n, fmt] * threshold]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time and memory-profile the analysis entry points.")
+    parser.add_argument('--rows', type=parse_rows, nargs='+', default=[10000], help="e.g. 10k 1M 10M")
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS))
+    parser.add_argument('--cases', nargs='+', choices=list(CASES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help="Earlier results file to check for regressions")
+    args = parser.parse_args()
+
+    report = run_suite(args.rows, args.formats, args.cases, args.repeat, args.data_dir)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            previous = json.load(f)
+        for case, n, fmt, before, after in compare(previous, report):
+            print(f"Regression: {case} [{n:,} {fmt}] {before:.3f}s -> {after:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import argparse
+
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
@@ -5,12 +7,19 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, confusion_matrix, classification_report
 from sklearn.preprocessing import StandardScaler
 
-def analyze_order_fulfillment(filename):
+from featurestore import open_store, training_data
+from fulfillment import fulfillment_metrics
+from ordermodel import load_orders
+
+def analyze_order_fulfillment(filename, feature_store=None):
     """
     Analyzes order fulfillment time, accuracy, and predicts errors based on time to completion and quantity.
 
     Args:
         filename: The path to the Excel file containing the order data.
+        feature_store: Optional FeatureStore. When given, the model is trained on its stored
+            per-order features (article/LOTE error rates, lead time, QTY ratio) besides
+            Time_to_Fulfillment and QTY, instead of on those two columns alone.
 
     Returns:
         A tuple containing:
@@ -21,7 +30,7 @@ def analyze_order_fulfillment(filename):
     """
     
     # Read data into a DataFrame
-    df = pd.read_excel(filename)
+    df = load_orders(filename).to_frame()
 
     # Convert SEND_DATE and RECEPTION_DATE to datetime, coercing invalid dates to NaT
     df['SEND_DATE'] = pd.to_datetime(df['SEND_DATE'], errors='coerce')
@@ -37,28 +46,27 @@ def analyze_order_fulfillment(filename):
     # Calculate time to fulfillment in days
     df['Time_to_Fulfillment'] = (df['RECEPTION_DATE'] - df['SEND_DATE']).dt.days
 
-    # Calculate average production time for orders with errors (MISSING or REJECTED >= 1)
-    with_errors = df[(df['MISSING'] >= 1) | (df['REJECTED'] >= 1)]
-    avg_time_with_errors = with_errors['Time_to_Fulfillment'].mean()
-
-    # Calculate average production time for orders without errors (MISSING == 0 and REJECTED == 0)
-    without_errors = df[(df['MISSING'] == 0) & (df['REJECTED'] == 0)]
-    avg_time_without_errors = without_errors['Time_to_Fulfillment'].mean()
-
-    # Calculate overall order fulfillment accuracy rate
-    total_orders = df.shape[0]
-    accurate_orders = without_errors.shape[0]
-    accuracy_rate = (accurate_orders / total_orders) * 100 if total_orders > 0 else 0
+    # Calculate average production time for orders with errors (MISSING or REJECTED >= 1),
+    # without errors, and the overall accuracy rate in one grouped pass
+    metrics = fulfillment_metrics(df)
+    avg_time_with_errors = metrics['avg_time_with_errors']
+    avg_time_without_errors = metrics['avg_time_without_errors']
+    accuracy_rate = metrics['accuracy_rate']
 
     # Feature Engineering for Prediction
     df['ERRORS'] = (df['MISSING'] > 0) | (df['REJECTED'] > 0)
 
-    # Select relevant features for prediction
-    X = df[['Time_to_Fulfillment', 'QTY']]
-    y = df['ERRORS'].astype(int)  # 1 if there are errors, 0 otherwise
+    if feature_store is None:
+        # Select relevant features for prediction
+        X = df[['Time_to_Fulfillment', 'QTY']]
+        y = df['ERRORS'].astype(int)  # 1 if there are errors, 0 otherwise
 
-    # Handle any NaN or infinite values in features (if any)
-    X = X.replace([np.inf, -np.inf], np.nan).dropna()
+        # Handle any NaN or infinite values in features (if any)
+        X = X.replace([np.inf, -np.inf], np.nan).dropna()
+    else:
+        # Features as they stood before each order, read from the store instead of
+        # recomputed from the order history
+        X, y = training_data(feature_store)
 
     # Split data into training and testing sets
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
@@ -97,6 +105,15 @@ def analyze_order_fulfillment(filename):
 
     return avg_time_with_errors, avg_time_without_errors, accuracy_rate, accuracy, confusion, report
 
-# Assuming the filename is correct
-filename = "EXTERNAL_PRODUCTIONS_converted.xlsx"
-results = analyze_order_fulfillment(filename)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Order fulfillment report and error model.")
+    parser.add_argument('--feature-store', help="Train on the features of this feature store (filled from the orders if new)")
+    args = parser.parse_args()
+
+    # Assuming the filename is correct
+    filename = "EXTERNAL_PRODUCTIONS_converted.xlsx"
+    if args.feature_store:
+        with open_store(filename, args.feature_store) as store:
+            results = analyze_order_fulfillment(filename, feature_store=store)
+    else:
+        results = analyze_order_fulfillment(filename)
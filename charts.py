@@ -0,0 +1,272 @@
+import argparse
+import math
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from orderstream import open_orders
+from pollinatorstats import FLOWERING_FILE, GROUP_KEYS, X_KEY, Y_KEY, RunningRegression
+
+# Above this many points a scatter plot is replaced by a hexbin or a sample
+POINT_THRESHOLD = 20000
+# Points kept when large scatters are downsampled
+SAMPLE_SIZE = 5000
+FORMATS = ('png', 'svg')
+
+
+class Reservoir:
+    """
+    Uniform random sample of k items from a stream of unknown length, kept in one
+    pass with O(k) memory (reservoir sampling with geometric skips, Li's Algorithm L).
+    """
+
+    def __init__(self, k, seed=42):
+        self.k = k
+        self.items = []
+        self.seen = 0
+        self._rng = np.random.default_rng(seed)
+        self._weight = 1.0
+        self._next = None
+
+    def add(self, item):
+        self.seen += 1
+        if len(self.items) < self.k:
+            self.items.append(item)
+            if len(self.items) == self.k:
+                self._advance()
+        elif self.seen == self._next:
+            self.items[self._rng.integers(self.k)] = item
+            self._advance()
+
+    def _advance(self):
+        # Position of the next item that enters the reservoir
+        self._weight *= math.exp(math.log(self._rng.random()) / self.k)
+        self._next = self.seen + math.floor(math.log(self._rng.random()) / math.log1p(-self._weight)) + 1
+
+
+def reservoir_sample(points, k, seed=42):
+    """
+    Picks k items uniformly at random from an iterable in one pass.
+
+    Args:
+        points (iterable): Items to sample, e.g. (x, y) tuples.
+        k (int): Sample size.
+        seed (int): Random seed.
+
+    Returns:
+        list: Up to k items, all of them if the iterable is shorter.
+    """
+    reservoir = Reservoir(k, seed)
+    for item in points:
+        reservoir.add(item)
+    return reservoir.items
+
+
+def draw_points(ax, x, y, mode='hexbin', threshold=POINT_THRESHOLD, sample_size=SAMPLE_SIZE, seed=42, **kwargs):
+    """
+    Draws a scatter of x against y, switching to a hexbin density plot or a uniform
+    sample of the points when there are more than `threshold` of them.
+
+    Args:
+        ax (matplotlib.axes.Axes): Axes to draw on.
+        x, y (array-like): Point coordinates.
+        mode (str): 'hexbin' or 'sample' for large inputs.
+        threshold (int): Largest number of points drawn individually.
+        sample_size (int): Points kept in 'sample' mode.
+        seed (int): Random seed for 'sample' mode.
+        **kwargs: Passed to ax.scatter for small inputs and samples.
+    """
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    # Many markers as individual SVG paths make huge files; draw them as an image instead
+    kwargs.setdefault('rasterized', min(len(x), threshold) > 1000)
+    if len(x) <= threshold:
+        ax.scatter(x, y, **kwargs)
+    elif mode == 'hexbin':
+        collection = ax.hexbin(x, y, gridsize=60, bins='log', mincnt=1, cmap='viridis')
+        ax.figure.colorbar(collection, ax=ax, label='Points (log)')
+    elif mode == 'sample':
+        picks = np.sort(reservoir_sample(range(len(x)), sample_size, seed))
+        ax.scatter(x[picks], y[picks], **kwargs)
+    else:
+        raise ValueError(f"Unknown mode: {mode}")
+
+
+def draw_fit(ax, x, fit, **kwargs):
+    """
+    Draws the regression line between the smallest and largest x.
+
+    Args:
+        ax (matplotlib.axes.Axes): Axes to draw on.
+        x (array-like): Point x coordinates (or just the x range's two ends).
+        fit (dict): With 'slope' and 'intercept' (e.g. RunningRegression.result()).
+        **kwargs: Passed to ax.plot.
+    """
+    if len(x) == 0 or math.isnan(fit['slope']):
+        return
+    ends = np.array([np.min(x), np.max(x)], dtype='float64')
+    ax.plot(ends, fit['slope'] * ends + fit['intercept'], **kwargs)
+
+
+def _new_figure(figsize):
+    # A bare Agg figure: no pyplot state, no display, safe to use in worker processes
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=figsize)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def render_pollinator_chart(x, y, path, title='Correlation between Pollinators and Fruits per Plant',
+                            fit=None, mode='hexbin', threshold=POINT_THRESHOLD, x_range=None):
+    """
+    Writes a pollinators vs fruits-per-plant chart with its regression line to a PNG or SVG file.
+
+    Args:
+        x, y (array-like): Pollinators and Fruits/Plant.
+        path (str): Output file; the format follows the extension.
+        title (str): Chart title.
+        fit (dict, optional): Precomputed RunningRegression.result(); computed if omitted.
+        mode (str): Large-input rendering, 'hexbin' or 'sample'.
+        threshold (int): Largest number of points drawn individually.
+        x_range (tuple, optional): Ends of the regression line when x is only a
+            sample of the data; defaults to the range of x.
+
+    Returns:
+        str: The path written.
+    """
+    if fit is None:
+        regression = RunningRegression()
+        regression.add_batch(x, y)
+        fit = regression.result()
+
+    figure = _new_figure((10, 6))
+    ax = figure.add_subplot()
+    draw_points(ax, x, y, mode=mode, threshold=threshold, alpha=0.5)
+    draw_fit(ax, x if x_range is None else x_range, fit, color='red', label='Regression Line')
+    ax.set_title(title)
+    ax.set_xlabel('Number of Pollinators')
+    ax.set_ylabel('Fruits per Plant')
+    ax.text(0.05, 0.95, f"Correlation: {fit['correlation']:.2f}  (n={fit['n']})", transform=ax.transAxes)
+    ax.grid(True)
+    figure.savefig(path)
+    return path
+
+
+def render_lots_chart(lots, metric, path):
+    """
+    Writes a bar chart of the top lots by a metric to a PNG or SVG file.
+
+    Args:
+        lots (list): (lot, value) pairs in display order.
+        metric (str): Metric name for the labels.
+        path (str): Output file; the format follows the extension.
+
+    Returns:
+        str: The path written.
+    """
+    figure = _new_figure((12, 6))
+    ax = figure.add_subplot()
+    ax.bar(range(len(lots)), [value for _, value in lots])
+    ax.set_title(f"Top {len(lots)} Most Productive Lots Based on {metric}")
+    ax.set_xlabel("Lot Position")
+    ax.set_ylabel(metric)
+    ax.set_xticks(range(len(lots)), [str(lot) for lot, _ in lots], rotation=45)
+    figure.savefig(path)
+    return path
+
+
+def _render_task(task):
+    return render_pollinator_chart(*task)
+
+
+def _file_name(key):
+    return re.sub(r'[^A-Za-z0-9.-]+', '_', '-'.join(str(part) for part in key)).strip('_') or 'all'
+
+
+def render_group_charts(source=FLOWERING_FILE, by=('Module',), out_dir='charts', fmt='png',
+                        workers=None, mode='hexbin', threshold=POINT_THRESHOLD):
+    """
+    Writes one pollinator chart per group (e.g. per Module or per Variety), rendering
+    groups in parallel worker processes.
+
+    The records are read once; each group's points (or, in 'sample' mode, a
+    reservoir sample of them) and its regression from pollinatorstats.RunningRegression
+    are then handed to a worker.
+
+    Args:
+        source: Flowering JSON/NDJSON path or an iterable of records.
+        by (str | tuple): Group key names from pollinatorstats.GROUP_KEYS.
+        out_dir (str): Directory the charts are written to.
+        fmt (str): 'png' or 'svg'.
+        workers (int, optional): Worker processes. Defaults to the CPU count; 1 renders inline.
+        mode (str): Large-group rendering, 'hexbin' or 'sample'.
+        threshold (int): Largest number of points drawn individually.
+
+    Returns:
+        list: Paths of the written charts.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+    by = (by,) if isinstance(by, str) else tuple(by)
+    raw_keys = [GROUP_KEYS[name] for name in by]
+
+    # In 'sample' mode each group keeps only a reservoir of points; the regression
+    # and x range are still accumulated over every point
+    sampled = mode == 'sample'
+    groups = {}
+    for record in open_orders(source):
+        x, y = record.get(X_KEY), record.get(Y_KEY)
+        if not isinstance(x, (int, float)) or not isinstance(y, (int, float)):
+            continue
+        group = groups.get(key := tuple(record.get(raw) for raw in raw_keys))
+        if group is None:
+            points = Reservoir(SAMPLE_SIZE, seed=len(groups)) if sampled else []
+            group = groups[key] = (RunningRegression(), points, [x, x])
+        regression, points, x_range = group
+        regression.add(x, y)
+        if sampled:
+            points.add((x, y))
+        else:
+            points.append((x, y))
+        if x < x_range[0]:
+            x_range[0] = x
+        elif x > x_range[1]:
+            x_range[1] = x
+
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = []
+    for key, (regression, points, x_range) in groups.items():
+        xy = np.array(points.items if sampled else points, dtype='float64').reshape(-1, 2)
+        title = ', '.join(f"{name} {value}" for name, value in zip(by, key)) or 'All lots'
+        path = os.path.join(out_dir, f"pollinators_{_file_name(key)}.{fmt}")
+        tasks.append((xy[:, 0], xy[:, 1], path, title, regression.result(), mode, threshold, tuple(x_range)))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        return [_render_task(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_task, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render pollinator charts per group to image files.")
+    parser.add_argument('--source', default=FLOWERING_FILE)
+    parser.add_argument('--by', nargs='*', default=['Module'], choices=list(GROUP_KEYS))
+    parser.add_argument('--out-dir', default='charts')
+    parser.add_argument('--format', choices=FORMATS, default='png')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--mode', choices=('hexbin', 'sample'), default='hexbin')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    paths = render_group_charts(args.source, args.by, args.out_dir, args.format, args.workers, args.mode)
+    print(f"Wrote {len(paths)} charts to {args.out_dir} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
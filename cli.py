@@ -0,0 +1,224 @@
+import argparse
+import importlib
+import subprocess
+import sys
+import time
+
+# Only the standard library is imported up front; each subcommand imports the
+# analysis modules (and with them pandas, scipy, sklearn, ...) it needs when it runs
+ORDERS_JSON = 'EXTERNAL_PRODUCTIONS_converted.json'
+ORDERS_XLSX = 'EXTERNAL_PRODUCTIONS_converted.xlsx'
+# Same as pollinatorstats.FLOWERING_FILE, repeated so --help does not import pandas
+FLOWERING_FILE = 'Last projection (1st flowering) - 2022_converted.json'
+
+
+def _call(args, func, *call_args, **kwargs):
+    # Through the result cache when --cache is given
+    if not args.cache:
+        return func(*call_args, **kwargs)
+    import resultcache
+
+    with resultcache.ResultCache(args.cache_dir or resultcache.CACHE_DIR) as cache:
+        return cache.call(func, *call_args, **kwargs)
+
+
+def _articles(args, articlegpt):
+    sorted_articles, _, stock_predictions = _call(args, articlegpt.analyze_articles, args.source)
+    print("Most Frequently Ordered Articles:")
+    for article, count in sorted_articles[:args.top]:
+        print(f"- {article}: {count} orders")
+    print("\nPredicted Stock Requirements (based on average monthly orders):")
+    for article, _ in sorted_articles[:args.top]:
+        print(f"- {article}: Predicted stock level: {stock_predictions.get(article)} units")
+
+
+def _stock(args, FIXarticleattempt2):
+    print(_call(args, FIXarticleattempt2.analyze_stock, args.source, month=args.month, year=args.year))
+
+
+def _fulfillment(args, both):
+    # analyze_order_fulfillment prints its own report
+    _call(args, both.analyze_order_fulfillment, args.source)
+
+
+def _predict(args, errormodel, ordermodel):
+    df = ordermodel.load_orders(args.source).to_frame()
+    pipeline, metadata = errormodel.get_model(df, estimator=args.estimator)
+    print(f"Model trained on {metadata['training_rows']} orders ({metadata['data_hash'][:12]})")
+    df['ERROR_RISK'] = errormodel.score(df, pipeline)
+    print(df[['ARTICLE', 'QTY', 'ERROR_RISK']].sort_values('ERROR_RISK', ascending=False).head(args.top))
+
+
+def _sizes(args, sizeanalysis, ordermodel):
+    df = ordermodel.load_orders(args.source).to_frame()
+    for method in args.methods:
+        statistic, pvalue = sizeanalysis.test_sizes(df, method)
+        print(f"{method}: statistic {statistic:.3f}, p-value {pvalue:.4f}")
+    if args.resamples:
+        print(sizeanalysis.bootstrap_error_rates(df, n_resamples=args.resamples, workers=args.workers))
+
+
+def _pollinators(args, pollinatorstats):
+    grouped = _call(args, pollinatorstats.pollinator_regression, args.source, by=args.by)
+    print(grouped.results().to_string())
+    print(grouped.overall())
+    if args.chart_dir:
+        import charts
+
+        paths = charts.render_group_charts(args.source, args.by, args.chart_dir, args.format, args.workers)
+        print(f"Wrote {len(paths)} charts to {args.chart_dir}")
+
+
+def _lots(args, lotranking):
+    columns = lotranking.lot_columns(args.source, metrics=args.metrics, keys=tuple(args.by))
+    print(lotranking.rank_lots(columns, metrics=args.metrics, n=args.top, by=args.by or None).to_string())
+
+
+def _transform(args, jsonprod):
+    if args.output == '-':
+        jsonprod.write_transformed(args.source, sys.stdout, ndjson=args.ndjson)
+    else:
+        count = jsonprod.write_transformed(args.source, args.output, ndjson=args.ndjson)
+        print(f"Wrote {count} records to {args.output}")
+
+
+def _cache(args, resultcache):
+    with resultcache.ResultCache(args.cache_dir or resultcache.CACHE_DIR) as cache:
+        if args.clear:
+            cache.clear()
+            print("Cache cleared")
+            return
+        for row in cache.stats():
+            print(f"{row['function']}: {row['hits']} hits, {row['misses']} misses "
+                  f"({row['hit_rate']:.0%}), saved {row['saved_seconds']:.2f}s of "
+                  f"{row['compute_seconds']:.2f}s computed, {row['entries']} stored ({row['bytes']:,} bytes)")
+
+
+# Subcommand -> (description, modules it imports, handler called with the modules)
+COMMANDS = {
+    'articles': ("Most ordered articles and their stock predictions", ('articlegpt',), _articles),
+    'stock': ("Stock prediction for a month", ('FIXarticleattempt2',), _stock),
+    'fulfillment': ("Production time, accuracy and error model report", ('both',), _fulfillment),
+    'predict': ("Error risk of each order from the registered model", ('errormodel', 'ordermodel'), _predict),
+    'sizes': ("Error rates by size: tests and bootstrap intervals", ('sizeanalysis', 'ordermodel'), _sizes),
+    'pollinators': ("Pollinator/fruit regression per group", ('pollinatorstats',), _pollinators),
+    'lots': ("Top lots per metric, overall or per group", ('lotranking',), _lots),
+    'transform': ("Orders with parsed dates and derived fields as JSON", ('jsonprod',), _transform),
+    'cache': ("Result cache hit/miss statistics", ('resultcache',), _cache),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Order and flowering analyses.")
+    parser.add_argument('--timings', action='store_true', help="Report import and run times on stderr")
+    parser.add_argument('--cache', action='store_true',
+                        help="Reuse stored results of articles, stock, fulfillment and pollinators for unchanged inputs")
+    parser.add_argument('--cache-dir', help="Result cache directory (default .cache/results)")
+    parser.add_argument('--import-only', action='store_true', help=argparse.SUPPRESS)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def command(name):
+        return commands.add_parser(name, help=COMMANDS[name][0], description=COMMANDS[name][0])
+
+    sub = command('articles')
+    sub.add_argument('--source', default=ORDERS_JSON)
+    sub.add_argument('--top', type=int, default=10)
+
+    sub = command('stock')
+    sub.add_argument('--source', default=ORDERS_JSON)
+    sub.add_argument('--month', type=int, default=10)
+    sub.add_argument('--year', type=int, default=2023)
+
+    sub = command('fulfillment')
+    sub.add_argument('--source', default=ORDERS_XLSX)
+
+    sub = command('predict')
+    sub.add_argument('--source', default=ORDERS_XLSX)
+    sub.add_argument('--estimator', choices=('random_forest', 'logistic'), default='random_forest')
+    sub.add_argument('--top', type=int, default=10)
+
+    sub = command('sizes')
+    sub.add_argument('--source', default=ORDERS_XLSX)
+    sub.add_argument('--methods', nargs='+', choices=('anova', 'kruskal'), default=['anova', 'kruskal'])
+    sub.add_argument('--resamples', type=int, default=2000, help="Bootstrap resamples (0 to skip)")
+    sub.add_argument('--workers', type=int)
+
+    group_keys = ('Module', 'Turn', 'Variety', 'Projection')
+    sub = command('pollinators')
+    sub.add_argument('--source', default=FLOWERING_FILE)
+    sub.add_argument('--by', nargs='*', choices=group_keys, default=['Module'])
+    sub.add_argument('--chart-dir', help="Also write one chart per group here")
+    sub.add_argument('--format', choices=('png', 'svg'), default='png')
+    sub.add_argument('--workers', type=int)
+
+    sub = command('lots')
+    sub.add_argument('--source', default=FLOWERING_FILE)
+    sub.add_argument('--metrics', nargs='+', default=['Ton/Lot', 'Ton/Hectare', 'Fruits/Plant'])
+    sub.add_argument('--by', nargs='*', choices=group_keys, default=[])
+    sub.add_argument('--top', type=int, default=5)
+
+    sub = command('transform')
+    sub.add_argument('--source', default=ORDERS_JSON)
+    sub.add_argument('--output', default='-', help="Output file, or - for stdout")
+    sub.add_argument('--ndjson', action='store_true')
+
+    sub = command('cache')
+    sub.add_argument('--clear', action='store_true', help="Delete every stored result and reset the statistics")
+
+    sub = commands.add_parser('startup', help="Measure the cold-start time of each subcommand")
+    sub.add_argument('--commands', nargs='+', choices=list(COMMANDS), default=list(COMMANDS))
+    sub.add_argument('--repeat', type=int, default=3)
+    return parser
+
+
+def cold_start(commands=tuple(COMMANDS), repeat=3):
+    """
+    Measures how long each subcommand takes to get ready to run: a fresh
+    interpreter starting, parsing its arguments and importing its modules.
+
+    Args:
+        commands (tuple): Names from COMMANDS.
+        repeat (int): Fresh processes per subcommand; the best time is kept.
+
+    Returns:
+        dict: Subcommand -> best seconds, with 'python' for a bare interpreter start.
+    """
+    def best(argv):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run(argv, check=True, stdout=subprocess.DEVNULL)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    timings = {'python': best([sys.executable, '-c', 'pass'])}
+    for name in commands:
+        timings[name] = best([sys.executable, __file__, '--import-only', name])
+    return timings
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'startup':
+        timings = cold_start(args.commands, args.repeat)
+        baseline = timings.pop('python')
+        print(f"{'command':<12} {'cold start':>10} {'startup':>10}")
+        for name, seconds in timings.items():
+            print(f"{name:<12} {seconds:>9.3f}s {seconds - baseline:>9.3f}s")
+        print(f"(startup excludes the bare interpreter start of {baseline:.3f}s)")
+        return
+
+    _, module_names, handler = COMMANDS[args.command]
+    start = time.perf_counter()
+    modules = [importlib.import_module(name) for name in module_names]
+    imported = time.perf_counter()
+    if args.import_only:
+        return
+    handler(args, *modules)
+    if args.timings:
+        print(f"{args.command}: imports {imported - start:.3f}s, run {time.perf_counter() - imported:.3f}s",
+              file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from ordermodel import load_orders
+
+FEATURES = ['Time_to_Fulfillment', 'QTY']
+REGISTRY_DIR = os.path.join('.cache', 'models')
+
+# The classifiers tried in both.py/predict.py (random forest) and orderfufill.py (logistic regression)
+ESTIMATORS = {
+    'random_forest': lambda: RandomForestClassifier(random_state=42),
+    'random_forest_balanced': lambda: RandomForestClassifier(class_weight='balanced', random_state=42),
+    'logistic': lambda: LogisticRegression(),
+}
+
+
+def build_features(df):
+    """
+    Builds the error-prediction features used in both.py.
+
+    Args:
+        df (pd.DataFrame): Orders with SEND_DATE, RECEPTION_DATE and QTY.
+
+    Returns:
+        pd.DataFrame: Time_to_Fulfillment (days) and QTY, indexed like df.
+    """
+    send_date = pd.to_datetime(df['SEND_DATE'], errors='coerce')
+    reception_date = pd.to_datetime(df['RECEPTION_DATE'], errors='coerce')
+    features = pd.DataFrame({
+        'Time_to_Fulfillment': (reception_date - send_date).dt.days,
+        'QTY': pd.to_numeric(df['QTY'], errors='coerce'),
+    }, index=df.index)
+    return features.replace([np.inf, -np.inf], np.nan).astype('float64')
+
+
+def build_labels(df):
+    """
+    Returns 1 for orders with missing or rejected items, 0 otherwise.
+
+    Args:
+        df (pd.DataFrame): Orders with MISSING and REJECTED.
+
+    Returns:
+        pd.Series: int error label per order.
+    """
+    return ((df['MISSING'].fillna(0) > 0) | (df['REJECTED'].fillna(0) > 0)).astype(int)
+
+
+def training_data(df):
+    """
+    Returns the complete-feature rows of df as (X, y).
+
+    Args:
+        df (pd.DataFrame): Historical orders.
+
+    Returns:
+        tuple: (X, y) with rows lacking a feature dropped.
+    """
+    X = build_features(df)
+    y = build_labels(df)
+    complete = X.notna().all(axis=1)
+    return X[complete], y[complete]
+
+
+def data_hash(X, y):
+    """
+    Hashes a training set so a stored model can be matched to the data it was fit on.
+
+    Args:
+        X (pd.DataFrame): Feature matrix.
+        y (pd.Series): Labels.
+
+    Returns:
+        str: SHA-256 hex digest of the feature names, values and labels.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(list(X.columns)).encode('utf-8'))
+    digest.update(np.ascontiguousarray(X.to_numpy('float64')).tobytes())
+    digest.update(np.ascontiguousarray(y.to_numpy('int64')).tobytes())
+    return digest.hexdigest()
+
+
+def _paths(registry_dir, estimator):
+    return (os.path.join(registry_dir, f'{estimator}.joblib'),
+            os.path.join(registry_dir, f'{estimator}.json'))
+
+
+def train_pipeline(X, y, estimator='random_forest'):
+    """
+    Fits a StandardScaler + classifier pipeline.
+
+    Args:
+        X (pd.DataFrame): Feature matrix.
+        y (pd.Series): Labels.
+        estimator (str): One of ESTIMATORS.
+
+    Returns:
+        Pipeline: The fitted pipeline.
+    """
+    pipeline = Pipeline([('scaler', StandardScaler()), ('model', ESTIMATORS[estimator]())])
+    pipeline.fit(X, y)
+    return pipeline
+
+
+def load_model(estimator='random_forest', registry_dir=REGISTRY_DIR):
+    """
+    Loads a stored pipeline and its metadata.
+
+    Args:
+        estimator (str): One of ESTIMATORS.
+        registry_dir (str): Directory holding the registry.
+
+    Returns:
+        tuple: (pipeline, metadata), or (None, None) if nothing is stored.
+    """
+    model_path, meta_path = _paths(registry_dir, estimator)
+    try:
+        with open(meta_path, 'r') as f:
+            metadata = json.load(f)
+    except FileNotFoundError:
+        return None, None
+    if not os.path.exists(model_path):
+        return None, None
+    return joblib.load(model_path), metadata
+
+
+def get_model(training, estimator='random_forest', registry_dir=REGISTRY_DIR):
+    """
+    Returns a fitted error-prediction pipeline for the given training data,
+    retraining only when the data's hash differs from the stored model's.
+
+    Args:
+        training: Historical orders, as a DataFrame or a path accepted by
+            ordermodel.load_orders (JSON export or workbook).
+        estimator (str): One of ESTIMATORS.
+        registry_dir (str): Directory holding the registry.
+
+    Returns:
+        tuple: (pipeline, metadata) where metadata records the features,
+        estimator, training data hash, row count and library versions.
+    """
+    if estimator not in ESTIMATORS:
+        raise ValueError(f"Unknown estimator: {estimator}")
+    df = training if isinstance(training, pd.DataFrame) else load_orders(training).to_frame()
+    X, y = training_data(df)
+    digest = data_hash(X, y)
+
+    pipeline, metadata = load_model(estimator, registry_dir)
+    if pipeline is not None and metadata.get('data_hash') == digest \
+            and metadata.get('sklearn_version') == sklearn.__version__:
+        return pipeline, metadata
+
+    pipeline = train_pipeline(X, y, estimator)
+    metadata = {
+        'estimator': estimator,
+        'features': FEATURES,
+        'data_hash': digest,
+        'training_rows': int(len(X)),
+        'error_rate': float(y.mean()) if len(y) else 0.0,
+        'sklearn_version': sklearn.__version__,
+        'trained_at': datetime.now(timezone.utc).isoformat(),
+    }
+
+    os.makedirs(registry_dir, exist_ok=True)
+    model_path, meta_path = _paths(registry_dir, estimator)
+    joblib.dump(pipeline, model_path + '.tmp')
+    os.replace(model_path + '.tmp', model_path)
+    # Metadata is written last, so a model file without matching metadata is never trusted
+    with open(meta_path + '.tmp', 'w') as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(meta_path + '.tmp', meta_path)
+    return pipeline, metadata
+
+
+def score(orders, pipeline, chunk_size=100000):
+    """
+    Predicts the error probability of each order in vectorized chunks.
+
+    Args:
+        orders (pd.DataFrame): Orders with SEND_DATE, RECEPTION_DATE and QTY.
+        pipeline (Pipeline): A fitted pipeline from get_model.
+        chunk_size (int): Rows passed to predict_proba at a time.
+
+    Returns:
+        np.ndarray: Probability of an error per order (NaN where a feature is missing).
+    """
+    X = build_features(orders)
+    complete = X.notna().all(axis=1).to_numpy()
+    values = X.to_numpy('float64')
+    risk = np.full(len(X), np.nan)
+
+    rows = np.flatnonzero(complete)
+    positive = list(pipeline.classes_).index(1) if 1 in pipeline.classes_ else None
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        if positive is None:
+            risk[chunk] = 0.0
+        else:
+            chunk_frame = pd.DataFrame(values[chunk], columns=FEATURES)
+            risk[chunk] = pipeline.predict_proba(chunk_frame)[:, positive]
+    return risk
+
+
+if __name__ == "__main__":
+    df = load_orders("EXTERNAL_PRODUCTIONS_converted.xlsx").to_frame()
+    pipeline, metadata = get_model(df)
+    print(f"Model trained on {metadata['training_rows']} orders ({metadata['data_hash'][:12]})")
+    df['ERROR_RISK'] = score(df, pipeline)
+    print(df[['ARTICLE', 'QTY', 'ERROR_RISK']].sort_values('ERROR_RISK', ascending=False).head(10))
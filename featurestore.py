@@ -0,0 +1,309 @@
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from orderstream import open_orders
+
+STORE_PATH = os.path.join('.cache', 'features.sqlite')
+MS_PER_DAY = 86400000
+
+# Features kept per order next to Time_to_Fulfillment and QTY
+FEATURE_COLUMNS = ['article_error_rate', 'lote_error_rate', 'article_lead_time', 'qty_ratio']
+
+# Pseudo-orders at the overall error rate blended into each article/LOTE rate,
+# so keys with little history are pulled towards the overall rate
+PRIOR_WEIGHT = 5
+
+# Smoothing factor of the exponentially weighted lead time per article
+LEAD_TIME_ALPHA = 0.3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    orders INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    lead_time_sum REAL NOT NULL,
+    lead_time_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS article_stats (
+    article TEXT PRIMARY KEY,
+    orders INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    qty_sum REAL NOT NULL,
+    lead_time REAL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS lote_stats (
+    lote TEXT PRIMARY KEY,
+    orders INTEGER NOT NULL,
+    errors INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS order_features (
+    id INTEGER PRIMARY KEY,
+    article TEXT NOT NULL,
+    lote TEXT,
+    send_date INTEGER,
+    qty REAL NOT NULL,
+    time_to_fulfillment REAL,
+    errors INTEGER NOT NULL,
+    article_error_rate REAL NOT NULL,
+    lote_error_rate REAL NOT NULL,
+    article_lead_time REAL,
+    qty_ratio REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS order_features_article ON order_features (article);
+CREATE INDEX IF NOT EXISTS order_features_lote ON order_features (lote);
+INSERT OR IGNORE INTO totals VALUES (0, 0, 0, 0.0, 0);
+"""
+
+# SQLite's default limit on bound parameters per statement
+_MAX_PARAMS = 999
+
+
+class FeatureStore:
+    """
+    Incrementally maintained order features in an indexed SQLite table.
+
+    Per-article and per-LOTE running aggregates (order and error counts, QTY sum,
+    exponentially weighted lead time) live in tables keyed by ARTICLE and LOTE.
+    ingest() folds new orders into them and materializes each order's features as
+    they stood before the order, so training never sees an order's own outcome.
+    lookup() reads the current aggregates for new orders by key, so scoring does
+    not scan the order history.
+
+    Features:
+        - article_error_rate: Smoothed share of the article's earlier orders with errors.
+        - lote_error_rate: Same for the order's LOTE.
+        - article_lead_time: Weighted average of the article's earlier lead times in
+          days (the overall mean lead time when the article has none).
+        - qty_ratio: QTY relative to the article's earlier mean QTY (1.0 without history).
+    """
+
+    def __init__(self, path=STORE_PATH):
+        """
+        Args:
+            path (str): SQLite file; created with its directory if missing.
+                ':memory:' keeps the store in memory.
+        """
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM order_features").fetchone()[0]
+
+    def ingest(self, new_records, batch_size=10000):
+        """
+        Folds new orders into the aggregates and stores their point-in-time features.
+        Orders should arrive in the order they were sent; each one only sees the
+        orders ingested before it.
+
+        Args:
+            new_records: Path to a JSON file of new orders, or an iterable of raw
+                order dicts (epoch-millisecond dates).
+            batch_size (int): Orders written per transaction.
+
+        Returns:
+            int: Number of orders ingested (orders without ARTICLE or QTY are skipped).
+        """
+        ingested = 0
+        batch = []
+        for record in open_orders(new_records):
+            if record.get('ARTICLE') is None or record.get('QTY') is None:
+                continue
+            batch.append(record)
+            if len(batch) == batch_size:
+                ingested += self._ingest_batch(batch)
+                batch = []
+        if batch:
+            ingested += self._ingest_batch(batch)
+        return ingested
+
+    def _ingest_batch(self, batch):
+        connection = self.connection
+        articles = self._fetch('article_stats', 'article', {record['ARTICLE'] for record in batch})
+        lotes = self._fetch('lote_stats', 'lote', {record.get('LOTE') for record in batch} - {None})
+        total_orders, total_errors, lead_sum, lead_count = connection.execute(
+            "SELECT orders, errors, lead_time_sum, lead_time_count FROM totals").fetchone()
+
+        rows = []
+        for record in batch:
+            article, lote, qty = record['ARTICLE'], record.get('LOTE'), float(record['QTY'])
+            send, reception = record.get('SEND_DATE'), record.get('RECEPTION_DATE')
+            errors = int((record.get('MISSING') or 0) > 0 or (record.get('REJECTED') or 0) > 0)
+            lead_time = (reception - send) // MS_PER_DAY if send is not None and reception is not None else None
+
+            prior = total_errors / total_orders if total_orders else 0.0
+            article_stats = articles.setdefault(article, [0, 0, 0.0, None])
+            lote_stats = lotes.setdefault(lote, [0, 0]) if lote is not None else [0, 0]
+            rows.append((
+                article, lote, send, qty, lead_time, errors,
+                _smoothed_rate(article_stats[1], article_stats[0], prior),
+                _smoothed_rate(lote_stats[1], lote_stats[0], prior),
+                article_stats[3] if article_stats[3] is not None else (lead_sum / lead_count if lead_count else None),
+                qty / (article_stats[2] / article_stats[0]) if article_stats[0] and article_stats[2] else 1.0,
+            ))
+
+            # Fold the order's outcome in after its features were taken
+            article_stats[0] += 1
+            article_stats[1] += errors
+            article_stats[2] += qty
+            lote_stats[0] += 1
+            lote_stats[1] += errors
+            total_orders += 1
+            total_errors += errors
+            if lead_time is not None:
+                previous = article_stats[3]
+                article_stats[3] = lead_time if previous is None else \
+                    LEAD_TIME_ALPHA * lead_time + (1 - LEAD_TIME_ALPHA) * previous
+                lead_sum += lead_time
+                lead_count += 1
+
+        with connection:
+            connection.executemany(
+                "INSERT INTO order_features (article, lote, send_date, qty, time_to_fulfillment, errors, "
+                "article_error_rate, lote_error_rate, article_lead_time, qty_ratio) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            connection.executemany(
+                "INSERT OR REPLACE INTO article_stats VALUES (?, ?, ?, ?, ?)",
+                [(article, *stats) for article, stats in articles.items()])
+            connection.executemany(
+                "INSERT OR REPLACE INTO lote_stats VALUES (?, ?, ?)",
+                [(lote, *stats) for lote, stats in lotes.items()])
+            connection.execute(
+                "UPDATE totals SET orders = ?, errors = ?, lead_time_sum = ?, lead_time_count = ?",
+                (total_orders, total_errors, lead_sum, lead_count))
+        return len(rows)
+
+    def _fetch(self, table, key, values):
+        # Primary-key lookups for the given keys only, in chunks under SQLite's parameter limit
+        values = list(values)
+        found = {}
+        for start in range(0, len(values), _MAX_PARAMS):
+            chunk = values[start:start + _MAX_PARAMS]
+            placeholders = ', '.join('?' * len(chunk))
+            for row in self.connection.execute(
+                    f"SELECT * FROM {table} WHERE {key} IN ({placeholders})", chunk):
+                found[row[0]] = list(row[1:])
+        return found
+
+    def lookup(self, orders):
+        """
+        Returns the current features for orders being scored, from key lookups on
+        the article and LOTE aggregates.
+
+        Args:
+            orders (pd.DataFrame): Orders with ARTICLE, LOTE and QTY.
+
+        Returns:
+            pd.DataFrame: FEATURE_COLUMNS, indexed like orders.
+        """
+        article = orders['ARTICLE'].astype(object)
+        lote = orders['LOTE'].astype(object) if 'LOTE' in orders else pd.Series(None, index=orders.index)
+        qty = pd.to_numeric(orders['QTY'], errors='coerce').astype('float64')
+
+        articles = self._fetch('article_stats', 'article', article.dropna().unique())
+        lotes = self._fetch('lote_stats', 'lote', lote.dropna().unique())
+        total_orders, total_errors, lead_sum, lead_count = self.connection.execute(
+            "SELECT orders, errors, lead_time_sum, lead_time_count FROM totals").fetchone()
+        prior = total_errors / total_orders if total_orders else 0.0
+        overall_lead_time = lead_sum / lead_count if lead_count else np.nan
+
+        article_frame = pd.DataFrame.from_dict(
+            articles, orient='index', columns=['orders', 'errors', 'qty_sum', 'lead_time'], dtype='float64')
+        lote_frame = pd.DataFrame.from_dict(lotes, orient='index', columns=['orders', 'errors'], dtype='float64')
+        article_rows = article_frame.reindex(article.to_numpy()).fillna({'orders': 0, 'errors': 0, 'qty_sum': 0})
+        lote_rows = lote_frame.reindex(lote.to_numpy()).fillna(0)
+
+        mean_qty = (article_rows['qty_sum'] / article_rows['orders']).where(article_rows['qty_sum'] > 0)
+        return pd.DataFrame({
+            'article_error_rate': _smoothed_rate(article_rows['errors'], article_rows['orders'], prior).to_numpy(),
+            'lote_error_rate': _smoothed_rate(lote_rows['errors'], lote_rows['orders'], prior).to_numpy(),
+            'article_lead_time': article_rows['lead_time'].fillna(overall_lead_time).to_numpy(),
+            'qty_ratio': (qty.to_numpy() / mean_qty.to_numpy()),
+        }, index=orders.index).fillna({'qty_ratio': 1.0})
+
+    def training_frame(self):
+        """
+        Returns every ingested order with its materialized features and label.
+
+        Returns:
+            pd.DataFrame: ARTICLE, LOTE, SEND_DATE, Time_to_Fulfillment, QTY,
+            FEATURE_COLUMNS and ERRORS (0/1), in ingestion order.
+        """
+        frame = pd.read_sql_query(
+            "SELECT article AS ARTICLE, lote AS LOTE, send_date AS SEND_DATE, "
+            "time_to_fulfillment AS Time_to_Fulfillment, qty AS QTY, "
+            f"{', '.join(FEATURE_COLUMNS)}, errors AS ERRORS FROM order_features ORDER BY id",
+            self.connection)
+        frame['SEND_DATE'] = pd.to_datetime(frame['SEND_DATE'], unit='ms')
+        return frame
+
+
+def _smoothed_rate(errors, orders, prior):
+    return (errors + PRIOR_WEIGHT * prior) / (orders + PRIOR_WEIGHT)
+
+
+def open_store(source, path=STORE_PATH):
+    """
+    Opens a feature store, ingesting the orders of source first when it is empty.
+
+    Args:
+        source (str): Order export (JSON or Excel workbook) to fill a new store from.
+        path (str): SQLite file of the store.
+
+    Returns:
+        FeatureStore: The open store.
+    """
+    store = FeatureStore(path)
+    if not len(store):
+        from ordermodel import load_orders
+
+        store.ingest(record.to_dict() for record in load_orders(source))
+    return store
+
+
+def training_data(store, base_features=('Time_to_Fulfillment', 'QTY')):
+    """
+    Returns (X, y) for the error classifiers from the materialized features.
+
+    Args:
+        store (FeatureStore): A store with ingested history.
+        base_features (tuple): Per-order columns kept next to FEATURE_COLUMNS.
+
+    Returns:
+        tuple: (X, y) with rows lacking a feature dropped.
+    """
+    frame = store.training_frame()
+    X = frame[list(base_features) + FEATURE_COLUMNS].astype('float64')
+    complete = X.notna().all(axis=1)
+    return X[complete], frame.loc[complete, 'ERRORS']
+
+
+if __name__ == "__main__":
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import classification_report
+    from sklearn.model_selection import train_test_split
+
+    with FeatureStore(':memory:') as store:
+        print(f"Ingested {store.ingest('EXTERNAL_PRODUCTIONS_converted.json')} orders")
+        X, y = training_data(store)
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
+        model = RandomForestClassifier(class_weight='balanced', random_state=42).fit(X_train, y_train)
+        print(classification_report(y_test, model.predict(X_test), zero_division=0))
+        print(pd.Series(model.feature_importances_, index=X.columns).sort_values(ascending=False))
+
+        new_orders = store.training_frame().tail(5)
+        print(store.lookup(new_orders))
@@ -1,14 +1,22 @@
-import json
 from collections import defaultdict, Counter
 from datetime import datetime
 
-def analyze_articles(file_path):
+from orderstream import open_orders
+
+def analyze_articles(file_path, backend='python', state_path=None):
     """
     Analyzes a JSON file containing article data, identifies the most
     frequently ordered articles, and suggests stock levels based on ordering patterns.
 
     Args:
-        file_path (str): Path to the JSON file.
+        file_path (str): Path to the JSON file, or an iterable of order records
+            (e.g. from orderstream.iter_orders).
+        backend (str): 'python' for the record-by-record loop, 'numpy' for the
+            vectorized implementation in articlevector, or 'state' to fold only the
+            orders not seen before into the saved stockstate.StockState and read
+            the results from its aggregates.
+        state_path (str, optional): State file for the 'state' backend
+            (default stockstate.STATE_PATH).
 
     Returns:
         dict: A dictionary containing:
@@ -16,21 +24,30 @@ def analyze_articles(file_path):
             - "predicted_stock_needs": A dictionary mapping article to predicted stock need.
     """
 
+    if backend == 'numpy':
+        import articlevector
+        return articlevector.analyze_article_quantities(file_path)
+    if backend == 'state':
+        state = _updated_state(file_path, state_path)
+        return {
+            "most_frequent_articles": state.most_frequent_articles(5),
+            "predicted_stock_needs": state.predict_stock_requirements(require_qty=True)
+        }
+    if backend != 'python':
+        raise ValueError(f"Unknown backend: {backend}")
+
     article_counts = defaultdict(int)
     reception_dates = defaultdict(list)
 
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-
-        for record in data:
-            article = record.get('ARTICLE')
-            reception_timestamp = record.get('RECEPTION_DATE')
-            qty = record.get('QTY')
+    for record in open_orders(file_path):
+        article = record.get('ARTICLE')
+        reception_timestamp = record.get('RECEPTION_DATE')
+        qty = record.get('QTY')
 
-            if article and reception_timestamp and qty is not None:
-                reception_date = datetime.fromtimestamp(reception_timestamp / 1000)  # Convert ms to date
-                article_counts[article] += qty  # Aggregate total quantity ordered
-                reception_dates[article].append(reception_date)
+        if article and reception_timestamp and qty is not None:
+            reception_date = datetime.fromtimestamp(reception_timestamp / 1000)  # Convert ms to date
+            article_counts[article] += qty  # Aggregate total quantity ordered
+            reception_dates[article].append(reception_date)
 
     # Sort articles by their total order count
     most_frequent_articles = sorted(article_counts.items(), key=lambda item: item[1], reverse=True)
@@ -77,9 +94,20 @@ def predict_stock_requirements(reception_dates):
     return stock_predictions
 
 
-# Example usage:
-file_path = 'EXTERNAL_PRODUCTIONS_converted.json'
-analysis_results = analyze_articles(file_path)
+def _updated_state(file_path, state_path=None):
+    # The saved stock state with the file's new orders folded in
+    from stockstate import STATE_PATH, StockState
+
+    state = StockState.load(state_path or STATE_PATH)
+    state.update(file_path)
+    state.save()
+    return state
+
+
+if __name__ == "__main__":
+    # Example usage:
+    file_path = 'EXTERNAL_PRODUCTIONS_converted.json'
+    analysis_results = analyze_articles(file_path)
 
-# Print the results
-print(analysis_results)
+    # Print the results
+    print(analysis_results)
@@ -0,0 +1,409 @@
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from ordercache import file_digest
+from orderstream import iter_orders
+from pollinatorstats import FLOWERING_FILE
+
+SCHEMA_FILE = 'schema.json'
+SCHEMA_VERSION = 1
+
+# Normalized column name -> (raw key in the flowering export, kind)
+COLUMNS = {
+    'date': ('Date', 'datetime'),
+    'module': ('Module', 'categorical'),
+    'turn': ('Turn ', 'int'),
+    'lot': ('Lots', 'categorical'),
+    'area': ('Area\n (Hectares)', 'float'),
+    'variety': ('Variety\n of the pattern', 'categorical'),
+    'plants': ('Plants/Lot', 'int'),
+    'pollinators': ('Pollinators', 'int'),
+    'harvestable': ('Harvestable Plants', 'int'),
+    'projection': ('Projection', 'categorical'),
+    'fruits_full': ('Fruits/Plant (100%)', 'float'),
+    'profitability': ('Fruit profitability', 'float'),
+    'fruit_weight': ('Fruit weight/projection', 'float'),
+    'fruits_plant': ('Fruits/Plant', 'float'),
+    'ton_lot': ('Ton/Lot', 'float'),
+    'ton_hectare': ('Ton/Hectare', 'float'),
+}
+INDEXED = ('date', 'module', 'turn', 'lot', 'variety')
+YIELD_COLUMNS = ('lot', 'fruits_plant', 'ton_lot', 'ton_hectare')
+
+# Missing values of int columns (stored as int64)
+INT_MISSING = np.iinfo('int64').min
+
+OPERATORS = ('==', '!=', 'in', '<', '<=', '>', '>=', 'between')
+
+
+def store_path_for(source_path, cache_dir=None):
+    """
+    Returns the directory holding the indexed columns of a flowering file.
+
+    Args:
+        source_path (str): Path to the flowering JSON/NDJSON file.
+        cache_dir (str, optional): Root cache directory. Defaults to a `.cache`
+            folder next to the source file.
+
+    Returns:
+        str: Path to the store directory for this file.
+    """
+    source_path = os.path.abspath(source_path)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(source_path), '.cache')
+    return os.path.join(cache_dir, os.path.basename(source_path) + '.flowering')
+
+
+def _read_schema(store_path):
+    try:
+        with open(os.path.join(store_path, SCHEMA_FILE), 'r') as f:
+            schema = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if schema.get('version') != SCHEMA_VERSION:
+        return None
+    return schema
+
+
+def _write_schema(store_path, schema):
+    # Write to a temporary file first so readers never see a half-written schema
+    tmp_path = os.path.join(store_path, SCHEMA_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(schema, f, indent=2)
+    os.replace(tmp_path, os.path.join(store_path, SCHEMA_FILE))
+
+
+def _is_fresh(schema, source_path, stat):
+    # Same check as ordercache: mtime/size first, the hash only when those changed,
+    # and a matching hash just refreshes the recorded mtime
+    source = schema['source']
+    if source['mtime_ns'] == stat.st_mtime_ns and source['size'] == stat.st_size:
+        return True
+    if source['size'] != stat.st_size:
+        return False
+    if source['sha256'] != file_digest(source_path):
+        return False
+    source['mtime_ns'] = stat.st_mtime_ns
+    return True
+
+
+def _typed(kind, values):
+    # Raw JSON values -> (stored array, categories or None)
+    if kind == 'categorical':
+        codes, categories = pd.factorize(np.array(values, dtype=object), use_na_sentinel=True)
+        return codes.astype('int32'), [value.item() if isinstance(value, np.generic) else value
+                                       for value in categories]
+    if kind == 'datetime':
+        return np.array([INT_MISSING if value is None else value for value in values],
+                        dtype='int64').view('datetime64[ms]'), None
+    if kind == 'int':
+        return np.array([INT_MISSING if value is None else value for value in values], dtype='int64'), None
+    return np.array([np.nan if value is None else value for value in values], dtype='float64'), None
+
+
+def build_store(source_path, store_path):
+    """
+    Reads the flowering file once and writes every column as a typed NumPy array
+    under its normalized name, with an index on each INDEXED column.
+
+    Text and mixed-type columns (module, lot, variety, projection) are dictionary
+    encoded as int32 codes (-1 for missing) with their distinct values in the
+    schema. Each index is the stable sort order of the column (by code for
+    categoricals), its sorted keys, and its distinct keys with their start
+    offsets: a sorted index for ranges and the base of a hash index for equality.
+
+    Args:
+        source_path (str): Path to the flowering JSON/NDJSON file.
+        store_path (str): Directory to write the store into (replaced if present).
+
+    Returns:
+        dict: The schema describing the written columns.
+    """
+    stat = os.stat(source_path)
+    raw = {name: [] for name in COLUMNS}
+    for record in iter_orders(source_path):
+        for name, (key, _) in COLUMNS.items():
+            raw[name].append(record.get(key))
+
+    parent = os.path.dirname(store_path)
+    os.makedirs(parent, exist_ok=True)
+    build_path = tempfile.mkdtemp(prefix='.building-', dir=parent)
+
+    columns = {}
+    for name, (key, kind) in COLUMNS.items():
+        values, categories = _typed(kind, raw.pop(name))
+        np.save(os.path.join(build_path, f'{name}.npy'), values, allow_pickle=False)
+        columns[name] = {'raw': key, 'kind': kind, 'dtype': str(values.dtype), 'categories': categories}
+
+        if name in INDEXED:
+            order = np.argsort(values, kind='stable')
+            keys = values[order]
+            distinct, starts = np.unique(keys, return_index=True)
+            for part, array in (('order', order), ('keys', keys), ('distinct', distinct),
+                                ('starts', np.append(starts, len(keys)))):
+                np.save(os.path.join(build_path, f'{name}.{part}.npy'), array, allow_pickle=False)
+
+    schema = {
+        'version': SCHEMA_VERSION,
+        'source': {
+            'path': os.path.abspath(source_path),
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': file_digest(source_path),
+        },
+        'rows': len(values),
+        'columns': columns,
+    }
+    _write_schema(build_path, schema)
+
+    # Swap the finished store into place
+    if os.path.isdir(store_path):
+        shutil.rmtree(store_path)
+    os.replace(build_path, store_path)
+    return schema
+
+
+class FloweringStore:
+    """
+    Flowering projections as memory-mapped typed columns with indexes.
+
+    Filters on indexed columns (date, module, turn, lot, variety) are answered
+    from the indexes: hash lookups for == and in, binary searches over the sorted
+    keys for ranges. Only the matching rows of the other filter columns and of
+    the projected columns are then read, so unrelated rows are never loaded or
+    decoded.
+
+    Attributes:
+        path (str): Store directory.
+        schema (dict): Column kinds, dtypes and categories.
+        rows (int): Number of records.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.schema = _read_schema(path)
+        if self.schema is None:
+            raise FileNotFoundError(f"No flowering store at {path}")
+        self.rows = self.schema['rows']
+        self._columns = {}
+        self._indexes = {}
+        self._codes = {}
+
+    @classmethod
+    def open(cls, source_path=FLOWERING_FILE, cache_dir=None):
+        """
+        Opens the store for a flowering file, building it on first use and
+        rebuilding it when the file's contents change.
+
+        Args:
+            source_path (str): Path to the flowering JSON/NDJSON file.
+            cache_dir (str, optional): Root cache directory.
+
+        Returns:
+            FloweringStore: The opened store.
+        """
+        stat = os.stat(source_path)
+        store_path = store_path_for(source_path, cache_dir)
+        schema = _read_schema(store_path)
+        if schema is not None:
+            recorded_mtime = schema['source']['mtime_ns']
+            if not _is_fresh(schema, source_path, stat):
+                schema = None
+            elif schema['source']['mtime_ns'] != recorded_mtime:
+                _write_schema(store_path, schema)
+        if schema is None:
+            build_store(source_path, store_path)
+        return cls(store_path)
+
+    def column(self, name, rows=None):
+        """
+        Returns a column, or only some of its rows, decoded to its values.
+
+        Args:
+            name (str): Normalized column name from COLUMNS.
+            rows (np.ndarray, optional): Row numbers to read.
+
+        Returns:
+            np.ndarray: datetime64, int64 or float64 values; object for categoricals
+            (None where missing).
+        """
+        values = self._stored(name)
+        if rows is not None:
+            values = values[rows]
+        categories = self.schema['columns'][name]['categories']
+        if categories is None:
+            return np.asarray(values)
+        decoded = np.empty(len(values), dtype=object)
+        present = values >= 0
+        decoded[present] = np.asarray(categories, dtype=object)[values[present]]
+        return decoded
+
+    def _stored(self, name):
+        if name not in self.schema['columns']:
+            raise KeyError(f"Unknown column: {name}")
+        if name not in self._columns:
+            self._columns[name] = np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r',
+                                          allow_pickle=False)
+        return self._columns[name]
+
+    def _index(self, name):
+        if name not in self._indexes:
+            parts = {part: np.load(os.path.join(self.path, f'{name}.{part}.npy'), mmap_mode='r',
+                                   allow_pickle=False)
+                     for part in ('order', 'keys', 'distinct', 'starts')}
+            # Hash index: distinct key (epoch ms for dates) -> its slot in starts
+            distinct = parts['distinct']
+            if distinct.dtype.kind == 'M':
+                distinct = distinct.view('int64')
+            parts['slots'] = {key: slot for slot, key in enumerate(distinct.tolist())}
+            self._indexes[name] = parts
+        return self._indexes[name]
+
+    def _key(self, name, value):
+        # A filter value in the stored representation: the code of a category (None
+        # if it does not occur) or a datetime64 for dates
+        column = self.schema['columns'][name]
+        if column['categories'] is not None:
+            if name not in self._codes:
+                self._codes[name] = {value: code for code, value in enumerate(column['categories'])}
+            return self._codes[name].get(value)
+        if column['kind'] == 'datetime':
+            return pd.Timestamp(value).to_datetime64().astype('datetime64[ms]')
+        return value
+
+    def _indexed_rows(self, name, op, value):
+        # Rows matching one filter, from the column's index (unsorted)
+        index = self._index(name)
+        order, keys, starts, slots = index['order'], index['keys'], index['starts'], index['slots']
+        categorical = self.schema['columns'][name]['categories'] is not None
+
+        if op in ('==', 'in'):
+            values = [value] if op == '==' else list(value)
+            # Each slot once, so repeated values do not repeat rows
+            picked = {}
+            for item in values:
+                key = self._key(name, item)
+                if isinstance(key, np.datetime64):
+                    key = int(key.astype('int64'))
+                slot = slots.get(key)
+                if slot is not None:
+                    picked[slot] = order[starts[slot]:starts[slot + 1]]
+            return np.concatenate(list(picked.values())) if picked else np.empty(0, dtype='int64')
+
+        if categorical:
+            raise ValueError(f"{name} is categorical and only supports ==, != and in")
+        low, high, low_side, high_side = None, None, 'left', 'right'
+        if op == 'between':
+            low, high = value
+        elif op in ('>', '>='):
+            low, low_side = value, 'right' if op == '>' else 'left'
+        else:
+            high, high_side = value, 'left' if op == '<' else 'right'
+        start = 0 if low is None else int(np.searchsorted(keys, self._key(name, low), side=low_side))
+        stop = len(keys) if high is None else int(np.searchsorted(keys, self._key(name, high), side=high_side))
+        # Missing values (INT_MISSING first, NaT last in the sorted keys) match no range
+        missing = slots.get(INT_MISSING)
+        if missing is not None:
+            if starts[missing] == 0:
+                start = max(start, int(starts[missing + 1]))
+            else:
+                stop = min(stop, int(starts[missing]))
+        return np.asarray(order[start:max(start, stop)])
+
+    def _matches(self, name, op, value, rows):
+        # Mask over `rows` for a filter, reading only those rows of the column
+        if self.schema['columns'][name]['categories'] is not None:
+            stored = np.asarray(self._stored(name)[rows])
+            if op in ('==', '!='):
+                code = self._key(name, value)
+                mask = stored == (-2 if code is None else code)
+                return ~mask if op == '!=' else mask
+            if op == 'in':
+                codes = [code for code in (self._key(name, item) for item in value) if code is not None]
+                return np.isin(stored, codes)
+            raise ValueError(f"{name} is categorical and only supports ==, != and in")
+
+        stored = np.asarray(self._stored(name)[rows])
+        if op == 'in':
+            return np.isin(stored, [self._key(name, item) for item in value])
+        if op in ('==', '!='):
+            return (np.equal if op == '==' else np.not_equal)(stored, self._key(name, value))
+        # Ranges never match a missing int (NaT and NaN already compare false)
+        mask = np.ones(len(stored), dtype=bool) if stored.dtype.kind != 'i' else stored != INT_MISSING
+        if op == 'between':
+            low, high = value
+            if low is not None:
+                mask &= stored >= self._key(name, low)
+            if high is not None:
+                mask &= stored <= self._key(name, high)
+            return mask
+        key = self._key(name, value)
+        return mask & {'<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal}[op](stored, key)
+
+    def select(self, filters=()):
+        """
+        Returns the row numbers matching every filter.
+
+        Filters on indexed columns (except !=) are resolved through the indexes and
+        intersected, most selective first. The remaining filters are checked on
+        those candidate rows only; without an indexed filter they read their
+        columns in full.
+
+        Args:
+            filters (list): (column, operator, value) tuples, operators from OPERATORS.
+                'in' takes a sequence and 'between' an inclusive (low, high) pair
+                where either end may be None. Dates take anything pd.Timestamp reads.
+                Missing values match != but never a range, as with pandas NaN.
+
+        Returns:
+            np.ndarray: Matching row numbers in file order.
+        """
+        indexed, residual = [], []
+        for name, op, value in filters:
+            if name not in COLUMNS:
+                raise KeyError(f"Unknown column: {name}")
+            if op not in OPERATORS:
+                raise ValueError(f"Unknown operator: {op}")
+            (indexed if name in INDEXED and op != '!=' else residual).append((name, op, value))
+
+        rows = None
+        for candidates in sorted((self._indexed_rows(*f) for f in indexed), key=len):
+            rows = np.sort(candidates) if rows is None else np.intersect1d(rows, candidates, assume_unique=True)
+            if len(rows) == 0:
+                return rows
+        if rows is None:
+            rows = np.arange(self.rows)
+        for name, op, value in residual:
+            rows = rows[self._matches(name, op, value, rows)]
+            if len(rows) == 0:
+                break
+        return rows
+
+    def query(self, filters=(), columns=None):
+        """
+        Returns the records matching the filters, with only the requested columns.
+
+        Args:
+            filters (list): (column, operator, value) tuples; see select().
+            columns (list, optional): Normalized column names. Defaults to all columns.
+
+        Returns:
+            pd.DataFrame: One row per match in file order, indexed by row number.
+        """
+        rows = self.select(filters)
+        names = list(COLUMNS) if columns is None else list(columns)
+        return pd.DataFrame({name: self.column(name, rows) for name in names},
+                            index=pd.Index(rows, name='row'))
+
+
+if __name__ == "__main__":
+    store = FloweringStore.open()
+    print(store.query([('module', '==', 4), ('date', 'between', ('2021-12-20', '2021-12-22'))],
+                      columns=YIELD_COLUMNS))
+    print(store.query([('variety', 'in', ['Degania', 'Degania 117']), ('ton_hectare', '>', 15)],
+                      columns=('date', 'module', 'turn', *YIELD_COLUMNS)))
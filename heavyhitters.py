@@ -0,0 +1,155 @@
+import heapq
+import math
+from itertools import count
+
+from orderstream import open_orders
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter sketch (Metwally et al.) with weighted updates.
+
+    At most `capacity` items are tracked. When a new item arrives and the sketch
+    is full, the item with the smallest count is replaced and the new item
+    inherits that count as its possible overestimate. For a stream of total
+    weight N every estimate is at most N / capacity above the true value, and
+    any item whose true weight exceeds N / capacity is guaranteed to be tracked.
+
+    Attributes:
+        capacity (int): Maximum number of tracked items.
+        total (float): Total weight seen so far.
+    """
+
+    def __init__(self, capacity):
+        """
+        Args:
+            capacity (int): Maximum number of tracked items.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.total = 0
+        self._counts = {}  # item -> [estimate, error]
+        self._heap = []    # (estimate, tie-breaker, item); stale entries are skipped lazily
+        self._sequence = count()
+
+    @classmethod
+    def from_error(cls, epsilon):
+        """
+        Creates a sketch whose overestimate is bounded by epsilon * total weight.
+
+        Args:
+            epsilon (float): Relative error bound, e.g. 0.001 for 0.1%.
+
+        Returns:
+            SpaceSaving: A sketch with capacity ceil(1 / epsilon).
+        """
+        if not 0 < epsilon <= 1:
+            raise ValueError("epsilon must be in (0, 1]")
+        return cls(math.ceil(1 / epsilon))
+
+    def add(self, item, weight=1):
+        """
+        Adds an occurrence of item with the given (non-negative) weight.
+
+        Args:
+            item: Hashable item, e.g. an article identifier.
+            weight (int | float): Weight of this occurrence (1 for counting, QTY for volume).
+        """
+        if weight < 0:
+            raise ValueError("weights must be non-negative")
+        self.total += weight
+
+        entry = self._counts.get(item)
+        if entry is None:
+            if len(self._counts) < self.capacity:
+                entry = self._counts[item] = [0, 0]
+            else:
+                floor = self._pop_min()
+                entry = self._counts[item] = [floor, floor]
+        entry[0] += weight
+        heapq.heappush(self._heap, (entry[0], next(self._sequence), item))
+
+        if len(self._heap) > 4 * self.capacity:
+            self._compact()
+
+    def _pop_min(self):
+        while True:
+            estimate, _, item = heapq.heappop(self._heap)
+            entry = self._counts.get(item)
+            if entry is not None and entry[0] == estimate:
+                del self._counts[item]
+                return estimate
+
+    def _compact(self):
+        # Drop stale heap entries so memory stays proportional to capacity
+        self._heap = [(entry[0], next(self._sequence), item) for item, entry in self._counts.items()]
+        heapq.heapify(self._heap)
+
+    @property
+    def max_error(self):
+        """
+        float: Upper bound on how far any estimate can exceed the true weight.
+        """
+        return self.total / self.capacity
+
+    def top(self, n):
+        """
+        Returns the n items with the largest estimated weight.
+
+        Args:
+            n (int): Number of items to return.
+
+        Returns:
+            list: (item, estimate, error) tuples, largest first. The true weight of
+            each item lies in [estimate - error, estimate].
+        """
+        ranked = heapq.nlargest(n, self._counts.items(), key=lambda pair: pair[1][0])
+        return [(item, estimate, error) for item, (estimate, error) in ranked]
+
+
+def top_articles(source, k=5, by='count', epsilon=None, capacity=None):
+    """
+    Streams order records and reports the top-k articles with bounded memory.
+
+    Args:
+        source: Path to the JSON order file, or an iterable of order records.
+        k (int): Number of articles to report.
+        by (str): 'count' to rank by number of orders, 'qty' to rank by total QTY.
+        epsilon (float, optional): Relative error bound; sets the sketch capacity to
+            ceil(1 / epsilon). Defaults to capacity 100 * k.
+        capacity (int, optional): Explicit sketch capacity (overrides epsilon).
+
+    Returns:
+        tuple: A tuple containing:
+            - A list of (article, estimate, error) tuples, largest first.
+            - The sketch's global error bound (total weight / capacity).
+    """
+    if by not in ('count', 'qty'):
+        raise ValueError(f"Unknown ranking: {by}")
+    if capacity is None:
+        capacity = math.ceil(1 / epsilon) if epsilon is not None else 100 * k
+    sketch = SpaceSaving(max(capacity, k))
+
+    for record in open_orders(source):
+        article = record.get('ARTICLE')
+        if not article:
+            continue
+        if by == 'count':
+            sketch.add(article)
+        else:
+            qty = record.get('QTY')
+            if qty:
+                sketch.add(article, qty)
+
+    return sketch.top(k), sketch.max_error
+
+
+if __name__ == "__main__":
+    file_path = 'EXTERNAL_PRODUCTIONS_converted.json'
+    for ranking in ('count', 'qty'):
+        top, max_error = top_articles(file_path, k=5, by=ranking, capacity=20)
+        print(f"Top articles by {ranking} (estimates at most {max_error:.1f} too high):")
+        for article, estimate, error in top:
+            # Space-Saving only overestimates, so the true value is in [estimate - error, estimate]
+            print(f"- {article}: {estimate - error} to {estimate}")
@@ -1,5 +1,101 @@
 import json
+import os
+import sys
 from datetime import datetime
+from functools import lru_cache
+
+from orderstream import iter_orders
+
+
+@lru_cache(maxsize=4096)
+def format_send_date(timestamp):
+    """
+    Formats a SEND_DATE timestamp as YYYY-MM-DD. Results are cached because many
+    orders share the same send date.
+
+    Args:
+        timestamp: Unix timestamp in seconds or milliseconds, or None.
+
+    Returns:
+        str: The formatted date, "Invalid Date" or "Missing Date".
+    """
+    if isinstance(timestamp, (int, float)):
+        try:
+            # Assuming timestamp is in seconds; adjust if in milliseconds
+            if timestamp > 10**10:  # Consider it as milliseconds
+                timestamp /= 1000
+            return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
+        except ValueError:
+            return "Invalid Date"
+    return "Missing Date"
+
+
+def transform_records(records):
+    """
+    Lazily applies the SEND_DATE formatting and ARTICLE_SIZE column to each record.
+
+    Args:
+        records (iterable): Order dicts (e.g. from orderstream.iter_orders).
+
+    Yields:
+        dict: Each record, transformed in place.
+    """
+    for item in records:
+        # Convert Unix timestamp to YYYY-MM-DD with error handling
+        item['SEND_DATE'] = format_send_date(item.get('SEND_DATE'))
+
+        # Combine ARTICLE and SIZE columns
+        article = item.get('ARTICLE', 'Unknown Article')
+        size = item.get('SIZE', 'Unknown Size')
+        item['ARTICLE_SIZE'] = f"{article}-{size}"
+
+        yield item
+
+
+def write_transformed(file_path, output, ndjson=False):
+    """
+    Streams the transformed records to a file or text stream, one record at a time,
+    so peak memory is a single record plus I/O buffers.
+
+    Args:
+        file_path (str): The path to the JSON file.
+        output: Output path, or a writable text stream such as sys.stdout.
+        ndjson (bool): Write one compact JSON object per line instead of a
+            pretty-printed JSON array (same layout as json.dumps(data, indent=2)).
+
+    Returns:
+        int: Number of records written.
+
+    Raises:
+        FileNotFoundError: If the input file does not exist.
+        json.JSONDecodeError: If the input file contains invalid JSON.
+    """
+    if isinstance(output, (str, bytes)) or hasattr(output, '__fspath__'):
+        # Write next to the destination and swap it in, so a failure never leaves a truncated file
+        tmp_path = f"{output}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                written = write_transformed(file_path, f, ndjson=ndjson)
+            os.replace(tmp_path, output)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return written
+
+    written = 0
+    for item in transform_records(iter_orders(file_path)):
+        if ndjson:
+            output.write(json.dumps(item))
+            output.write('\n')
+        else:
+            output.write('[\n  ' if written == 0 else ',\n  ')
+            output.write(json.dumps(item, indent=2).replace('\n', '\n  '))
+        written += 1
+
+    if not ndjson:
+        output.write('\n]\n' if written else '[]\n')
+    return written
+
 
 def transform_data(file_path):
     """
@@ -13,8 +109,7 @@ def transform_data(file_path):
         list: The transformed data.
     """
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        return list(transform_records(iter_orders(file_path)))
     except FileNotFoundError:
         print(f"Error: The file {file_path} was not found.")
         return []
@@ -22,36 +117,13 @@ def transform_data(file_path):
         print(f"Error: The file {file_path} contains invalid JSON.")
         return []
 
-    transformed_data = []
-    for item in data:
-        # Convert Unix timestamp to YYYY-MM-DD with error handling
-        timestamp = item.get('SEND_DATE')
-        if isinstance(timestamp, (int, float)):
-            try:
-                # Assuming timestamp is in seconds; adjust if in milliseconds
-                if timestamp > 10**10:  # Consider it as milliseconds
-                    timestamp /= 1000
-                formatted_date = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
-            except ValueError:
-                formatted_date = "Invalid Date"
-        else:
-            formatted_date = "Missing Date"
-        
-        item['SEND_DATE'] = formatted_date
-
-        # Combine ARTICLE and SIZE columns
-        article = item.get('ARTICLE', 'Unknown Article')
-        size = item.get('SIZE', 'Unknown Size')
-        item['ARTICLE_SIZE'] = f"{article}-{size}"
-
-        transformed_data.append(item)
-
-    return transformed_data
 
-# Example usage
-file_path = "EXTERNAL_PRODUCTIONS_converted.json"
-transformed_data = transform_data(file_path)
-
-# Output the transformed data
-if transformed_data:
-    print(json.dumps(transformed_data, indent=2))
\ No newline at end of file
+if __name__ == "__main__":
+    # Example usage: stream the transformed data to stdout
+    file_path = "EXTERNAL_PRODUCTIONS_converted.json"
+    try:
+        write_transformed(file_path, sys.stdout)
+    except FileNotFoundError:
+        print(f"Error: The file {file_path} was not found.")
+    except json.JSONDecodeError:
+        print(f"Error: The file {file_path} contains invalid JSON.")
@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+
+from orderstream import open_orders
+from pollinatorstats import FLOWERING_FILE, GROUP_KEYS
+
+LOT_KEY = 'Lots'
+METRICS = ('Ton/Lot', 'Ton/Hectare', 'Fruits/Plant')
+
+
+# Above this many groups the per-group selection loop gives way to one stable sort
+MAX_LOOP_GROUPS = 10000
+
+
+def lot_columns(source=FLOWERING_FILE, metrics=METRICS, keys=tuple(GROUP_KEYS)):
+    """
+    Reads flowering records into column arrays for ranking.
+
+    Args:
+        source: Flowering JSON/NDJSON path or an iterable of records.
+        metrics (tuple): Raw metric keys to read as float64 (NaN when missing).
+        keys (tuple): Group key names from pollinatorstats.GROUP_KEYS, read as
+            pandas Categoricals so grouping works on their integer codes.
+
+    Returns:
+        dict: 'Lots', each metric and each key name -> column.
+    """
+    rows = {name: [] for name in (LOT_KEY, *metrics, *keys)}
+    raw = {name: GROUP_KEYS.get(name, name) for name in rows}
+    for record in open_orders(source):
+        for name, values in rows.items():
+            values.append(record.get(raw[name]))
+
+    columns = {LOT_KEY: np.array(rows[LOT_KEY], dtype=object)}
+    for metric in metrics:
+        columns[metric] = np.array([np.nan if value is None else value for value in rows[metric]], dtype='float64')
+    for key in keys:
+        columns[key] = pd.Categorical(np.array(rows[key], dtype=object))
+    return columns
+
+
+def top_n_indices(values, n):
+    """
+    Returns the positions of the n largest values, largest first, using partial
+    selection rather than a full sort. Ties keep their input order (as a stable
+    descending sort would) and NaN values are ignored.
+
+    Args:
+        values (np.ndarray): Metric values.
+        n (int): Number of positions.
+
+    Returns:
+        np.ndarray: Up to n positions into values.
+    """
+    missing = np.isnan(values)
+    if missing.any():
+        candidates = np.flatnonzero(~missing)
+        selected = values[candidates]
+    else:
+        candidates = None
+        selected = values
+
+    if n <= 0:
+        picked = np.empty(0, dtype='int64')
+    elif len(selected) > n:
+        # The n-th largest value; everything above it is in, ties fill the rest in input order
+        threshold = np.partition(selected, len(selected) - n)[len(selected) - n]
+        above = np.flatnonzero(selected > threshold)
+        ties = np.flatnonzero(selected == threshold)[:n - len(above)]
+        picked = np.concatenate([above, ties])
+    else:
+        picked = np.arange(len(selected))
+
+    positions = picked if candidates is None else candidates[picked]
+    return positions[np.lexsort((positions, -values[positions]))]
+
+
+def _group_codes(columns, by):
+    # One code per row for the combination of key values, the number of codes, and
+    # the key values each code stands for
+    codes = []
+    uniques = []
+    for key in by:
+        key_codes, key_uniques = pd.factorize(columns[key], use_na_sentinel=False)
+        codes.append(key_codes)
+        uniques.append(np.asarray(key_uniques, dtype=object))
+    shape = [len(u) for u in uniques]
+    combined = np.ravel_multi_index(codes, shape) if codes[0].size else np.empty(0, dtype='int64')
+    n_groups = int(np.prod(shape))
+    if n_groups > len(combined):
+        # Sparse key combinations: renumber the ones that occur
+        combined, present = pd.factorize(combined)
+        key_codes = np.unravel_index(present, shape)
+        n_groups = len(present)
+    else:
+        key_codes = np.unravel_index(np.arange(n_groups), shape)
+    return combined, n_groups, [u[k] for u, k in zip(uniques, key_codes)]
+
+
+def _grouped_top_n(values, group, n_groups, order, starts, counts, n):
+    # Positions of each group's top n, and the group and rank of each
+    if order is not None:
+        # Rows are ordered by group (stable), so each group is a contiguous slice
+        # in input order and gets its own partial selection
+        ordered = values[order]
+        rows, ranks = [], []
+        for start, count in zip(starts, counts):
+            if count:
+                local = top_n_indices(ordered[start:start + count], n)
+                rows.append(order[start + local])
+                ranks.append(np.arange(len(local)))
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype='int64')
+        ranks = np.concatenate(ranks) if ranks else np.empty(0, dtype='int64')
+        return rows, ranks
+
+    valid = np.flatnonzero(~np.isnan(values))
+    # lexsort is stable, so equal values stay in input order
+    ordered = valid[np.lexsort((-values[valid], group[valid]))]
+    sorted_groups = group[ordered]
+    group_starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    ranks = np.arange(len(ordered)) - np.repeat(group_starts, np.diff(np.r_[group_starts, len(ordered)]))
+    keep = ranks < n
+    return ordered[keep], ranks[keep]
+
+
+def rank_lots(columns, metrics=METRICS, n=5, by=None):
+    """
+    Ranks lots on several metrics at once, overall or within groups.
+
+    Rankings use partial selection (top_n_indices). For grouped rankings the rows
+    are ordered by group once, with a stable sort on the small integer group codes,
+    and every metric then selects within each group's slice; with very many groups
+    one stable sort per metric is used instead.
+
+    Args:
+        columns (dict): From lot_columns (or any mapping of equal-length arrays
+            with 'Lots', the metrics and the group keys).
+        metrics (tuple): Metric columns to rank on.
+        n (int): Lots per ranking.
+        by (str | tuple, optional): Group key names, e.g. 'Module' or ('Module', 'Variety').
+
+    Returns:
+        pd.DataFrame: Long format, one row per ranked lot: the group keys (when
+        grouped), metric, rank (1 = best), Lots, value and row (position in columns).
+    """
+    by = () if by is None else (by,) if isinstance(by, str) else tuple(by)
+    lots = np.asarray(columns[LOT_KEY], dtype=object)
+    frames = []
+
+    if by:
+        group, n_groups, group_values = _group_codes(columns, by)
+        order = starts = counts = None
+        if n_groups <= MAX_LOOP_GROUPS:
+            # uint16 codes let NumPy use a linear-time radix sort
+            order = np.argsort(group.astype('uint16'), kind='stable')
+            counts = np.bincount(group, minlength=n_groups)
+            starts = np.r_[0, np.cumsum(counts)[:-1]]
+
+    for metric in metrics:
+        values = np.asarray(columns[metric], dtype='float64')
+        if by:
+            rows, ranks = _grouped_top_n(values, group, n_groups, order, starts, counts, n)
+            frame = pd.DataFrame({key: key_values[group[rows]] for key, key_values in zip(by, group_values)})
+        else:
+            rows = top_n_indices(values, n)
+            ranks = np.arange(len(rows))
+            frame = pd.DataFrame(index=range(len(rows)))
+        frame['metric'] = metric
+        frame['rank'] = ranks + 1
+        frame[LOT_KEY] = lots[rows]
+        frame['value'] = values[rows]
+        frame['row'] = rows
+        frames.append(frame)
+
+    columns_out = [*by, 'metric', 'rank', LOT_KEY, 'value', 'row']
+    if not frames:
+        return pd.DataFrame(columns=columns_out)
+    return pd.concat(frames, ignore_index=True)[columns_out]
+
+
+if __name__ == "__main__":
+    columns = lot_columns()
+    with pd.option_context('display.width', 200, 'display.max_rows', 100):
+        print(rank_lots(columns))
+        print(rank_lots(columns, metrics=('Ton/Lot',), n=3, by=('Module', 'Variety')))
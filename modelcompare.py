@@ -0,0 +1,178 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.metrics import accuracy_score, recall_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from errormodel import training_data
+from ordermodel import load_orders
+
+
+class ThresholdedLinearRegression(ClassifierMixin, BaseEstimator):
+    """
+    LinearRegression on the 0/1 error label (as in twoAttempt1.py/attemptboth.py),
+    turned into a classifier by thresholding the prediction.
+    """
+
+    def __init__(self, threshold=0.5):
+        self.threshold = threshold
+
+    def fit(self, X, y):
+        self.regression_ = LinearRegression().fit(X, y)
+        self.classes_ = np.array([0, 1])
+        return self
+
+    def predict(self, X):
+        return (self.regression_.predict(X) >= self.threshold).astype(int)
+
+
+# Estimators from the four attempts, each with a small hyperparameter grid
+CANDIDATES = {
+    'random_forest': (RandomForestClassifier, {
+        'n_estimators': [100, 300],
+        'max_depth': [None, 5],
+        'class_weight': [None, 'balanced'],
+        'random_state': [42],
+    }),
+    'logistic': (LogisticRegression, {
+        'C': [0.1, 1.0, 10.0],
+        'class_weight': [None, 'balanced'],
+        'max_iter': [1000],
+    }),
+    'linear_regression': (ThresholdedLinearRegression, {
+        'threshold': [0.5, 0.3],
+    }),
+}
+
+# Per-process views of the shared feature matrix, set by _attach
+_shared = {}
+
+
+def expand_grid(grid):
+    """
+    Expands a parameter grid into a list of parameter dicts.
+
+    Args:
+        grid (dict): Parameter name -> list of values.
+
+    Returns:
+        list: Every combination, as dicts.
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in product(*(grid[name] for name in names))]
+
+
+def _attach(x_name, y_name, n_rows, n_features, n_splits, seed):
+    # Map the parent's shared memory instead of receiving a pickled copy per task
+    x_block = shared_memory.SharedMemory(name=x_name)
+    y_block = shared_memory.SharedMemory(name=y_name)
+    X = np.ndarray((n_rows, n_features), dtype='float64', buffer=x_block.buf)
+    y = np.ndarray((n_rows,), dtype='int64', buffer=y_block.buf)
+    folds = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed).split(X, y))
+    _shared.update(blocks=(x_block, y_block), X=X, y=y, folds=folds)
+
+
+def _evaluate(task):
+    name, params, fold = task
+    X, y = _shared['X'], _shared['y']
+    train, test = _shared['folds'][fold]
+
+    estimator_class, _ = CANDIDATES[name]
+    pipeline = Pipeline([('scaler', StandardScaler()), ('model', estimator_class(**params))])
+
+    start = time.perf_counter()
+    pipeline.fit(X[train], y[train])
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = pipeline.predict(X[test])
+    predict_time = time.perf_counter() - start
+
+    return {
+        'estimator': name,
+        'params': params,
+        'fold': fold,
+        'accuracy': accuracy_score(y[test], y_pred),
+        'recall_errors': recall_score(y[test], y_pred, pos_label=1, zero_division=0),
+        'fit_time': fit_time,
+        'predict_time': predict_time,
+    }
+
+
+def compare_models(X, y, candidates=None, n_splits=5, workers=None, seed=42):
+    """
+    Evaluates every candidate estimator and grid point under stratified k-fold CV.
+
+    The feature matrix and labels are placed in shared memory once; worker
+    processes map it and receive only (estimator, params, fold) per task.
+
+    Args:
+        X (array-like): Feature matrix.
+        y (array-like): 0/1 error labels.
+        candidates (list, optional): Names from CANDIDATES. Defaults to all.
+        n_splits (int): Number of CV folds.
+        workers (int, optional): Worker processes. Defaults to the CPU count; 1 runs inline.
+        seed (int): Random state for the fold assignment.
+
+    Returns:
+        pd.DataFrame: Leaderboard with one row per (estimator, params), sorted by
+        recall on the error class and then accuracy. Columns: accuracy,
+        accuracy_std, recall_errors, fit_time and predict_time (mean seconds per fold).
+    """
+    X = np.ascontiguousarray(X, dtype='float64')
+    y = np.ascontiguousarray(y, dtype='int64')
+    names = list(CANDIDATES) if candidates is None else list(candidates)
+    tasks = [(name, params, fold)
+             for name in names
+             for params in expand_grid(CANDIDATES[name][1])
+             for fold in range(n_splits)]
+    workers = workers or os.cpu_count() or 1
+
+    x_block = shared_memory.SharedMemory(create=True, size=max(X.nbytes, 1))
+    y_block = shared_memory.SharedMemory(create=True, size=max(y.nbytes, 1))
+    try:
+        np.ndarray(X.shape, dtype='float64', buffer=x_block.buf)[:] = X
+        np.ndarray(y.shape, dtype='int64', buffer=y_block.buf)[:] = y
+        initargs = (x_block.name, y_block.name, X.shape[0], X.shape[1], n_splits, seed)
+
+        if workers == 1:
+            _attach(*initargs)
+            try:
+                results = [_evaluate(task) for task in tasks]
+            finally:
+                _shared.clear()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=initargs) as pool:
+                results = list(pool.map(_evaluate, tasks))
+    finally:
+        for block in (x_block, y_block):
+            block.close()
+            block.unlink()
+
+    folds = pd.DataFrame(results)
+    folds['params'] = folds['params'].map(lambda params: ', '.join(f'{k}={v}' for k, v in params.items()))
+    leaderboard = folds.groupby(['estimator', 'params'], sort=False).agg(
+        accuracy=('accuracy', 'mean'),
+        accuracy_std=('accuracy', 'std'),
+        recall_errors=('recall_errors', 'mean'),
+        fit_time=('fit_time', 'mean'),
+        predict_time=('predict_time', 'mean'),
+    )
+    return leaderboard.sort_values(['recall_errors', 'accuracy'], ascending=False)
+
+
+if __name__ == "__main__":
+    df = load_orders("EXTERNAL_PRODUCTIONS_converted.xlsx").to_frame()
+    X, y = training_data(df)
+    with pd.option_context('display.width', 200, 'display.max_colwidth', 80):
+        print(compare_models(X, y))
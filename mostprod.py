@@ -1,13 +1,16 @@
 import json
+import sys
+
 import matplotlib.pyplot as plt
 
-def find_most_productive_lots(filename, metric="Fruits/Plant"):
+def find_most_productive_lots(filename, metric="Fruits/Plant", output=None):
   """
   Finds the most productive lots based on a specified metric and plots them.
 
   Args:
     filename: The name of the JSON file.
     metric: The metric to use for determining productivity (default: "Fruits/Plant").
+    output: Optional PNG/SVG path; the chart is saved there instead of shown.
   """
 
   with open(filename, 'r') as f:
@@ -35,11 +38,17 @@ def find_most_productive_lots(filename, metric="Fruits/Plant"):
   plt.xlabel("Lot Position")
   plt.ylabel(metric)
   plt.xticks([i for i in range(len(top_5_lots))], [lot for lot, _ in top_5_lots], rotation=45)
-  plt.show()
+  if output:
+    plt.savefig(output)
+    plt.close()
+  else:
+    plt.show()
 
   return sorted_lots  # Still return the sorted list
 
-# Example usage
-filename = "Last projection (1st flowering) - 2022_converted.json"
-most_productive = find_most_productive_lots(filename, metric="Ton/Lot")
+if __name__ == "__main__":
+  # Example usage
+  filename = "Last projection (1st flowering) - 2022_converted.json"
+  most_productive = find_most_productive_lots(filename, metric="Ton/Lot",
+                                              output=sys.argv[1] if len(sys.argv) > 1 else None)
   
\ No newline at end of file
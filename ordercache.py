@@ -0,0 +1,239 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+SCHEMA_FILE = 'schema.json'
+SCHEMA_VERSION = 1
+
+
+def file_digest(path, block_size=1 << 20):
+    """
+    Computes the SHA-256 hex digest of a file, reading it in blocks.
+
+    Args:
+        path (str): Path to the file.
+        block_size (int): Number of bytes read per block.
+
+    Returns:
+        str: Hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path_for(source_path, cache_dir=None):
+    """
+    Returns the directory holding the columnar cache for a source workbook.
+
+    Args:
+        source_path (str): Path to the Excel file.
+        cache_dir (str, optional): Root cache directory. Defaults to a `.cache`
+            folder next to the source file.
+
+    Returns:
+        str: Path to the cache directory for this workbook.
+    """
+    source_path = os.path.abspath(source_path)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(source_path), '.cache')
+    return os.path.join(cache_dir, os.path.basename(source_path) + '.columns')
+
+
+def _read_schema(cache_path):
+    try:
+        with open(os.path.join(cache_path, SCHEMA_FILE), 'r') as f:
+            schema = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if schema.get('version') != SCHEMA_VERSION:
+        return None
+    return schema
+
+
+def _write_schema(cache_path, schema):
+    # Write to a temporary file first so readers never see a half-written schema
+    tmp_path = os.path.join(cache_path, SCHEMA_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(schema, f, indent=2)
+    os.replace(tmp_path, os.path.join(cache_path, SCHEMA_FILE))
+
+
+def _is_fresh(schema, source_path, stat):
+    """
+    Checks a cache schema against the current source file. The mtime/size pair is
+    checked first; the file is only hashed when those differ, and a matching hash
+    just refreshes the recorded mtime (e.g. after a `touch` or a copy).
+    """
+    source = schema['source']
+    if source['mtime_ns'] == stat.st_mtime_ns and source['size'] == stat.st_size:
+        return True
+    if source['size'] != stat.st_size:
+        return False
+    if source['sha256'] != file_digest(source_path):
+        return False
+    source['mtime_ns'] = stat.st_mtime_ns
+    return True
+
+
+def build_cache(source_path, cache_path, read_options=None):
+    """
+    Parses the workbook once and writes every column as a typed NumPy array.
+
+    Numeric and datetime columns are stored as-is. Text and mixed-type columns are
+    dictionary encoded: an int32 code array (-1 for missing) plus the list of
+    distinct values kept in the schema.
+
+    Args:
+        source_path (str): Path to the Excel file.
+        cache_path (str): Directory to write the cache into (replaced if present).
+        read_options (dict, optional): Extra keyword arguments for pd.read_excel.
+
+    Returns:
+        dict: The schema describing the written columns.
+    """
+    stat = os.stat(source_path)
+    df = pd.read_excel(source_path, **(read_options or {}))
+
+    parent = os.path.dirname(cache_path)
+    os.makedirs(parent, exist_ok=True)
+    build_path = tempfile.mkdtemp(prefix='.building-', dir=parent)
+
+    columns = []
+    for index, name in enumerate(df.columns):
+        series = df[name]
+        file_name = f'{index:03d}.npy'
+        column = {'name': str(name), 'file': file_name}
+
+        if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series) \
+                or pd.api.types.is_datetime64_any_dtype(series):
+            values = series.to_numpy()
+            column['kind'] = 'array'
+        else:
+            codes, categories = pd.factorize(series, use_na_sentinel=True)
+            values = codes.astype(np.int32)
+            column['kind'] = 'categorical'
+            column['categories'] = [
+                value.item() if isinstance(value, np.generic) else value
+                for value in categories
+            ]
+
+        column['dtype'] = str(values.dtype)
+        np.save(os.path.join(build_path, file_name), values, allow_pickle=False)
+        columns.append(column)
+
+    schema = {
+        'version': SCHEMA_VERSION,
+        'source': {
+            'path': os.path.abspath(source_path),
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': file_digest(source_path),
+            'read_options': read_options,
+        },
+        'rows': len(df),
+        'columns': columns,
+    }
+    _write_schema(build_path, schema)
+
+    # Swap the finished cache into place
+    if os.path.isdir(cache_path):
+        shutil.rmtree(cache_path)
+    os.replace(build_path, cache_path)
+    return schema
+
+
+def load_columns(source_path, columns=None, cache_dir=None, read_options=None):
+    """
+    Returns the requested columns of the production workbook as NumPy arrays,
+    building or rebuilding the columnar cache when the workbook has changed.
+
+    Plain columns are memory-mapped read-only; dictionary-encoded columns are
+    returned as (codes, categories) pairs so callers can group on the codes
+    without materializing the strings.
+
+    Args:
+        source_path (str): Path to the Excel file.
+        columns (list, optional): Column names to load. Defaults to all columns.
+        cache_dir (str, optional): Root cache directory.
+        read_options (dict, optional): Extra keyword arguments for pd.read_excel,
+            only used when the cache is (re)built.
+
+    Returns:
+        dict: Column name mapped to an array, or to a (codes, categories) tuple.
+
+    Raises:
+        FileNotFoundError: If the source workbook does not exist.
+        KeyError: If a requested column is not in the workbook.
+    """
+    stat = os.stat(source_path)
+    cache_path = cache_path_for(source_path, cache_dir)
+
+    schema = _read_schema(cache_path)
+    if schema is not None and schema['source'].get('read_options') != read_options:
+        schema = None
+    if schema is not None:
+        recorded_mtime = schema['source']['mtime_ns']
+        if not _is_fresh(schema, source_path, stat):
+            schema = None
+        elif schema['source']['mtime_ns'] != recorded_mtime:
+            _write_schema(cache_path, schema)
+    if schema is None:
+        schema = build_cache(source_path, cache_path, read_options)
+
+    by_name = {column['name']: column for column in schema['columns']}
+    wanted = list(by_name) if columns is None else list(columns)
+
+    loaded = {}
+    for name in wanted:
+        column = by_name[name]
+        values = np.load(os.path.join(cache_path, column['file']), mmap_mode='r', allow_pickle=False)
+        if column['kind'] == 'categorical':
+            loaded[name] = (values, column['categories'])
+        else:
+            loaded[name] = values
+    return loaded
+
+
+def load_productions(source_path, columns=None, cache_dir=None, read_options=None):
+    """
+    Drop-in replacement for pd.read_excel on the production workbook. The first
+    call converts the workbook into a columnar cache; later calls read the cache
+    and only parse the Excel file again when its contents change.
+
+    Args:
+        source_path (str): Path to the Excel file (e.g. EXTERNAL_PRODUCTIONS_converted.xlsx).
+        columns (list, optional): Only load these columns.
+        cache_dir (str, optional): Root cache directory.
+        read_options (dict, optional): Extra keyword arguments for pd.read_excel.
+
+    Returns:
+        pd.DataFrame: The workbook contents with the original column order and dtypes.
+    """
+    loaded = load_columns(source_path, columns, cache_dir, read_options)
+
+    data = {}
+    for name, values in loaded.items():
+        if isinstance(values, tuple):
+            codes, categories = values
+            decoded = np.empty(len(codes), dtype=object)
+            decoded[:] = np.nan
+            present = codes >= 0
+            decoded[present] = np.asarray(categories, dtype=object)[codes[present]]
+            data[name] = decoded
+        else:
+            data[name] = values
+    return pd.DataFrame(data)
+
+
+if __name__ == "__main__":
+    df = load_productions("EXTERNAL_PRODUCTIONS_converted.xlsx")
+    print(df.dtypes)
+    print(f"{len(df)} rows loaded from cache at {cache_path_for('EXTERNAL_PRODUCTIONS_converted.xlsx')}")
@@ -2,6 +2,9 @@ import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 
+from fulfillment import fulfillment_metrics
+from ordermodel import load_orders
+
 def analyze_production_data(df):
     """
     Analyzes production data to calculate average production times, accuracy rates,
@@ -24,12 +27,12 @@ def analyze_production_data(df):
     # Identify orders with errors
     df['HAS_ERRORS'] = (df['MISSING'] > 0) | (df['REJECTED'] > 0)
 
-    # Calculate average production time for orders with and without errors
-    avg_production_time_errors = df[df['HAS_ERRORS']]['PRODUCTION_TIME'].mean()
-    avg_production_time_no_errors = df[~df['HAS_ERRORS']]['PRODUCTION_TIME'].mean()
-
-    # Calculate overall accuracy rate
-    accuracy_rate = (1 - (df['HAS_ERRORS'].sum() / len(df))) * 100
+    # Calculate average production time for orders with and without errors,
+    # and the overall accuracy rate, in one grouped pass
+    metrics = fulfillment_metrics(df)
+    avg_production_time_errors = metrics['avg_time_with_errors']
+    avg_production_time_no_errors = metrics['avg_time_without_errors']
+    accuracy_rate = metrics['accuracy_rate']
 
     print(f"Average production time for orders with errors: {avg_production_time_errors:.2f} days")
     print(f"Average production time for orders without errors: {avg_production_time_no_errors:.2f} days")
@@ -58,8 +61,9 @@ def analyze_production_data(df):
     else:
         print("Quantity of items has a stronger influence on error rates.")
 
-# Load the data (assuming the file is in the same directory)
-df = pd.read_excel("EXTERNAL_PRODUCTIONS_converted.xlsx")
+if __name__ == "__main__":
+    # Load the data (assuming the file is in the same directory)
+    df = load_orders("EXTERNAL_PRODUCTIONS_converted.xlsx").to_frame()
 
-# Perform analysis
-analyze_production_data(df)
\ No newline at end of file
+    # Perform analysis
+    analyze_production_data(df)
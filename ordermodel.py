@@ -0,0 +1,340 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from ordercache import load_productions
+from orderstream import iter_order_batches
+
+# Raw export column -> attribute name on OrderRecord, in export order
+FIELDS = {
+    'LOTE': 'lote',
+    'ARTICLE': 'article',
+    'DESCRIPTION': 'description',
+    'SIZE': 'size',
+    'SEND_DATE': 'send_date',
+    'QTY': 'qty',
+    'O/C': 'oc',
+    'REFER_ID': 'refer_id',
+    'RECEPTION_DATE': 'reception_date',
+    'RECEPTION_QTY': 'reception_qty',
+    'MISSING': 'missing',
+    'REJECTED': 'rejected',
+    'REFER': 'refer',
+    'OBSERVATION': 'observation',
+}
+
+# Dictionary-encoded columns: int32 codes into a per-column list of values, -1 for null
+CATEGORICAL = ('LOTE', 'ARTICLE', 'DESCRIPTION', 'REFER_ID', 'REFER', 'OBSERVATION')
+# Epoch-millisecond timestamps, stored as datetime64[ms] with NaT for null
+DATES = ('SEND_DATE', 'RECEPTION_DATE')
+# Integer fields, int32 with INT_NULL for null
+INTEGERS = ('SIZE', 'QTY')
+INT_NULL = np.iinfo('int32').min
+# Error counts: null means no error was recorded, so nulls are stored as 0
+ERROR_COUNTS = ('MISSING', 'REJECTED')
+# Other optional numbers, NaN for null
+FLOATS = ('O/C', 'RECEPTION_QTY')
+
+
+class OrderRecord:
+    """
+    One production order with typed attributes instead of raw string keys.
+
+    Dates are epoch milliseconds (None when missing); MISSING and REJECTED are 0
+    when no error was recorded.
+    """
+
+    __slots__ = tuple(FIELDS.values())
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+        self.missing = self.missing or 0
+        self.rejected = self.rejected or 0
+
+    @classmethod
+    def from_dict(cls, record):
+        """
+        Builds a record from a raw export dict (e.g. one item of the JSON export).
+
+        Args:
+            record (dict): Order with the export's column names as keys.
+
+        Returns:
+            OrderRecord: The typed record.
+        """
+        return cls(**{name: record.get(column) for column, name in FIELDS.items()})
+
+    def to_dict(self):
+        """
+        Returns the record with the export's column names as keys.
+
+        Returns:
+            dict: The raw-style order dict.
+        """
+        return {column: getattr(self, name) for column, name in FIELDS.items()}
+
+    @property
+    def has_errors(self):
+        """
+        bool: True if any items were missing or rejected.
+        """
+        return self.missing > 0 or self.rejected > 0
+
+    def __repr__(self):
+        return f"OrderRecord(article={self.article!r}, size={self.size!r}, qty={self.qty!r})"
+
+
+class _Encoder:
+    # Incremental dictionary encoder that keeps first-seen order of values
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+
+    def encode(self, value):
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class OrderTable:
+    """
+    Struct-of-arrays table of production orders following one schema.
+
+    Text columns are dictionary encoded (int32 codes plus a value list), dates are
+    datetime64[ms], SIZE and QTY are int32 and error counts are zero-filled floats.
+    Incomplete orders are kept with their missing values as nulls (code -1, NaT,
+    INT_NULL, NaN); each analysis drops the rows it cannot use. Every analysis
+    (articles, fulfillment, sizes) can share one loaded table.
+
+    Attributes:
+        columns (dict): Column name -> NumPy array (codes for categorical columns).
+        categories (dict): Categorical column name -> list of distinct values.
+    """
+
+    def __init__(self, columns, categories):
+        self.columns = columns
+        self.categories = categories
+
+    def __len__(self):
+        return len(self.columns['ARTICLE'])
+
+    @classmethod
+    def from_records(cls, source, batch_size=65536):
+        """
+        Loads orders from a JSON export (streamed) or an iterable of raw dicts.
+
+        Args:
+            source: Path to the JSON file, or an iterable of order dicts.
+            batch_size (int): Records converted to arrays at a time.
+
+        Returns:
+            OrderTable: The loaded table.
+        """
+        if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+            batches = iter_order_batches(source, batch_size)
+        else:
+            batches = _batched(source, batch_size)
+
+        encoders = {column: _Encoder() for column in CATEGORICAL}
+        chunks = {column: [] for column in FIELDS}
+
+        for batch in batches:
+            for column in CATEGORICAL:
+                encode = encoders[column].encode
+                chunks[column].append(np.fromiter((encode(record.get(column)) for record in batch),
+                                                  dtype='int32', count=len(batch)))
+            for column in DATES:
+                values = np.array([record.get(column) for record in batch], dtype='float64')
+                chunks[column].append(_ms_to_datetime(values))
+            for column in INTEGERS:
+                values = (record.get(column) for record in batch)
+                chunks[column].append(np.fromiter((INT_NULL if value is None else value for value in values),
+                                                  dtype='int32', count=len(batch)))
+            for column in ERROR_COUNTS:
+                chunks[column].append(np.fromiter((record.get(column) or 0 for record in batch),
+                                                  dtype='float64', count=len(batch)))
+            for column in FLOATS:
+                values = [record.get(column) for record in batch]
+                chunks[column].append(np.array([np.nan if value is None else value for value in values],
+                                               dtype='float64'))
+
+        columns = {column: _concatenate(parts, column) for column, parts in chunks.items()}
+        categories = {column: encoders[column].values for column in CATEGORICAL}
+        return cls(columns, categories)
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Converts a DataFrame with the export's columns (e.g. from the Excel workbook).
+
+        Args:
+            df (pd.DataFrame): Orders with the export's column names.
+
+        Returns:
+            OrderTable: The converted table.
+        """
+        columns = {}
+        categories = {}
+        for column in FIELDS:
+            series = df[column]
+            if column in CATEGORICAL:
+                codes, values = pd.factorize(series, use_na_sentinel=True)
+                columns[column] = codes.astype('int32')
+                categories[column] = [value.item() if isinstance(value, np.generic) else value for value in values]
+            elif column in DATES:
+                if pd.api.types.is_datetime64_any_dtype(series):
+                    columns[column] = series.to_numpy('datetime64[ms]')
+                else:
+                    columns[column] = _ms_to_datetime(series.to_numpy('float64'))
+            elif column in INTEGERS:
+                columns[column] = series.fillna(INT_NULL).to_numpy('int32')
+            elif column in ERROR_COUNTS:
+                columns[column] = series.fillna(0).to_numpy('float64')
+            else:
+                columns[column] = series.to_numpy('float64')
+        return cls(columns, categories)
+
+    def column(self, name):
+        """
+        Returns a column decoded to plain values (categorical columns as an object array).
+
+        Args:
+            name (str): Export column name.
+
+        Returns:
+            np.ndarray: The column values.
+        """
+        values = self.columns[name]
+        if name not in CATEGORICAL:
+            return values
+        decoded = np.empty(len(values), dtype=object)
+        present = values >= 0
+        decoded[present] = np.asarray(self.categories[name], dtype=object)[values[present]]
+        return decoded
+
+    def has_errors(self):
+        """
+        Returns a boolean mask of orders with missing or rejected items.
+
+        Returns:
+            np.ndarray: True where MISSING > 0 or REJECTED > 0.
+        """
+        return (self.columns['MISSING'] > 0) | (self.columns['REJECTED'] > 0)
+
+    def to_frame(self, categorical=True):
+        """
+        Returns the table as a DataFrame with the export's column names.
+
+        Args:
+            categorical (bool): Keep text columns as pandas Categoricals (compact)
+                rather than decoding them to object columns.
+
+        Returns:
+            pd.DataFrame: One row per order.
+        """
+        data = {}
+        for name, values in self.columns.items():
+            if name in CATEGORICAL and categorical:
+                data[name] = pd.Categorical.from_codes(values, pd.Index(self.categories[name], dtype=object))
+            elif name in CATEGORICAL:
+                data[name] = self.column(name)
+            elif name in INTEGERS and (values == INT_NULL).any():
+                # NaN needs floats, as when pandas reads a column with blanks
+                data[name] = np.where(values == INT_NULL, np.nan, values)
+            else:
+                data[name] = values
+        return pd.DataFrame(data)
+
+    def record(self, index):
+        """
+        Returns one order as an OrderRecord.
+
+        Args:
+            index (int): Row number.
+
+        Returns:
+            OrderRecord: The order at that row.
+        """
+        values = {}
+        for column, name in FIELDS.items():
+            value = self.columns[column][index]
+            if column in CATEGORICAL:
+                value = self.categories[column][value] if value >= 0 else None
+            elif column in DATES:
+                value = None if np.isnat(value) else int(value.astype('int64'))
+            elif column in FLOATS:
+                value = None if np.isnan(value) else float(value)
+            elif column in INTEGERS:
+                value = None if value == INT_NULL else int(value)
+            else:
+                value = value.item()
+            values[name] = value
+        return OrderRecord(**values)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.record(index)
+
+    @property
+    def nbytes(self):
+        """
+        int: Memory used by the column arrays (excluding the category lists).
+        """
+        return sum(values.nbytes for values in self.columns.values())
+
+
+def _ms_to_datetime(values):
+    result = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[ms]')
+    present = ~np.isnan(values)
+    result[present] = values[present].astype('int64').astype('datetime64[ms]')
+    return result
+
+
+def _concatenate(parts, column):
+    if parts:
+        return np.concatenate(parts)
+    if column in CATEGORICAL or column in INTEGERS:
+        return np.empty(0, dtype='int32')
+    if column in DATES:
+        return np.empty(0, dtype='datetime64[ms]')
+    return np.empty(0, dtype='float64')
+
+
+def _batched(records, batch_size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load_orders(file_path):
+    """
+    Loads the production export into an OrderTable, from either the JSON export
+    or the Excel workbook (through the columnar cache in ordercache).
+
+    Args:
+        file_path (str): Path to EXTERNAL_PRODUCTIONS_converted.json or .xlsx.
+
+    Returns:
+        OrderTable: The loaded orders.
+    """
+    if os.path.splitext(file_path)[1].lower() in ('.xlsx', '.xls'):
+        return OrderTable.from_frame(load_productions(file_path))
+    return OrderTable.from_records(file_path)
+
+
+if __name__ == "__main__":
+    table = load_orders('EXTERNAL_PRODUCTIONS_converted.json')
+    print(f"{len(table)} orders in {table.nbytes} bytes of column data")
+    print(table.record(0))
+    print(table.to_frame().head())
@@ -0,0 +1,143 @@
+import json
+
+CHUNK_SIZE = 1 << 16  # Characters read from disk per refill
+
+
+def iter_orders(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Yields order records one at a time from a JSON file whose top level is an array,
+    or from an NDJSON file (one record per line), without loading the whole file
+    into memory.
+
+    Args:
+        file_path (str): Path to the JSON or NDJSON file (e.g. EXTERNAL_PRODUCTIONS_converted.json).
+        chunk_size (int): Number of characters read from disk at a time.
+
+    Yields:
+        dict: One order record per element of the top-level array.
+
+    Raises:
+        json.JSONDecodeError: If the file is neither a JSON array nor NDJSON, or a record is malformed.
+    """
+    decoder = json.JSONDecoder()
+
+    with open(file_path, 'r') as f:
+        buffer = ''
+        pos = 0
+        eof = False
+
+        def refill():
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            if chunk:
+                # Drop what has already been consumed so the buffer stays about one chunk long
+                buffer = buffer[pos:] + chunk
+                pos = 0
+            else:
+                eof = True
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos].isspace():
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return
+                refill()
+
+        def next_record():
+            nonlocal pos
+            while True:
+                try:
+                    record, end = decoder.raw_decode(buffer, pos)
+                    # A value that runs up to the end of the buffer may have been cut off
+                    # mid-token (e.g. a number), so only trust it once more input is visible
+                    if end >= len(buffer) and not eof:
+                        raise ValueError
+                except ValueError:
+                    if eof:
+                        raise
+                    refill()
+                    continue
+                pos = end
+                return record
+
+        skip_whitespace()
+        if pos < len(buffer) and buffer[pos] == '{':
+            # NDJSON: whitespace-separated records with no enclosing array
+            while True:
+                skip_whitespace()
+                if pos >= len(buffer):
+                    return
+                yield next_record()
+
+        # Opening bracket of the top-level array
+        if pos >= len(buffer) or buffer[pos] != '[':
+            raise json.JSONDecodeError("Expected '[' at start of order file", buffer, pos)
+        pos += 1
+
+        skip_whitespace()
+        if pos < len(buffer) and buffer[pos] == ']':
+            return
+
+        while True:
+            skip_whitespace()
+            yield next_record()
+
+            skip_whitespace()
+            if pos >= len(buffer):
+                raise json.JSONDecodeError("Unterminated order array", buffer, pos)
+            if buffer[pos] == ']':
+                return
+            if buffer[pos] != ',':
+                raise json.JSONDecodeError("Expected ',' or ']' between order records", buffer, pos)
+            pos += 1
+
+
+def iter_order_batches(file_path, batch_size=10000, chunk_size=CHUNK_SIZE):
+    """
+    Yields order records from a JSON array file in fixed-size lists.
+
+    Args:
+        file_path (str): Path to the JSON or NDJSON file.
+        batch_size (int): Maximum number of records per batch.
+        chunk_size (int): Number of characters read from disk at a time.
+
+    Yields:
+        list: Up to batch_size order records; only the last batch may be shorter.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    batch = []
+    for record in iter_orders(file_path, chunk_size=chunk_size):
+        batch.append(record)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def open_orders(source):
+    """
+    Normalizes the input accepted by the analysis functions.
+
+    Args:
+        source: Either a path to a JSON order file or an iterable of order records
+            (for example the output of iter_orders or a list already in memory).
+
+    Returns:
+        iterable: An iterable of order records.
+    """
+    if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+        return iter_orders(source)
+    return source
+
+
+if __name__ == "__main__":
+    file_path = 'EXTERNAL_PRODUCTIONS_converted.json'
+    total = 0
+    for batch in iter_order_batches(file_path, batch_size=100):
+        total += len(batch)
+        print(f"Read batch of {len(batch)} records ({total} so far)")
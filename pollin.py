@@ -1,13 +1,40 @@
 import json
+import sys
+
 import matplotlib.pyplot as plt
 import numpy as np
 
-def plot_pollinator_fruit_per_plant_correlation(filename):
+from charts import draw_points
+
+def pollinator_correlation(data):
+  """
+  Computes the correlation and best-fit line between pollinators and fruit per plant.
+
+  Args:
+    data: List of flowering records.
+
+  Returns:
+    A tuple (correlation coefficient, slope, intercept).
+  """
+
+  pollinators = [item['Pollinators'] for item in data]
+  fruits_per_plant = [item['Fruits/Plant'] for item in data]
+
+  # Calculate correlation coefficient
+  correlation_coefficient = np.corrcoef(pollinators, fruits_per_plant)[0, 1]
+
+  # Calculate regression line coefficients
+  slope, intercept = np.polyfit(pollinators, fruits_per_plant, 1)
+
+  return correlation_coefficient, slope, intercept
+
+def plot_pollinator_fruit_per_plant_correlation(filename, output=None):
   """
   Plots the correlation between pollinators and fruit per plant, including a best-fit line.
 
   Args:
     filename: The name of the JSON file.
+    output: Optional PNG/SVG path; the chart is saved there instead of shown.
   """
 
   with open(filename, 'r') as f:
@@ -17,14 +44,10 @@ def plot_pollinator_fruit_per_plant_correlation(filename):
   pollinators = [item['Pollinators'] for item in data]
   fruits_per_plant = [item['Fruits/Plant'] for item in data]
 
-  # Calculate correlation coefficient
-  correlation_coefficient = np.corrcoef(pollinators, fruits_per_plant)[0, 1]
+  correlation_coefficient, slope, intercept = pollinator_correlation(data)
 
   # Create scatter plot
-  plt.scatter(pollinators, fruits_per_plant, label="Data Points")
-
-  # Calculate regression line coefficients
-  slope, intercept = np.polyfit(pollinators, fruits_per_plant, 1)
+  draw_points(plt.gca(), pollinators, fruits_per_plant, label="Data Points")
 
   # Generate x values for the regression line
   x_fit = np.linspace(min(pollinators), max(pollinators), 100)
@@ -43,9 +66,14 @@ def plot_pollinator_fruit_per_plant_correlation(filename):
   # Add legend
   plt.legend()
 
-  # Show plot
-  plt.show()
+  # Save or show plot
+  if output:
+    plt.savefig(output)
+    plt.close()
+  else:
+    plt.show()
 
-# Example usage
-filename = "Last projection (1st flowering) - 2022_converted.json"
-plot_pollinator_fruit_per_plant_correlation(filename)
\ No newline at end of file
+if __name__ == "__main__":
+  # Example usage
+  filename = "Last projection (1st flowering) - 2022_converted.json"
+  plot_pollinator_fruit_per_plant_correlation(filename, output=sys.argv[1] if len(sys.argv) > 1 else None)
\ No newline at end of file
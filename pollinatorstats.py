@@ -0,0 +1,301 @@
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from orderstream import open_orders
+
+FLOWERING_FILE = 'Last projection (1st flowering) - 2022_converted.json'
+
+# Group key name -> raw key in the flowering export
+GROUP_KEYS = {
+    'Module': 'Module',
+    'Turn': 'Turn ',
+    'Variety': 'Variety\n of the pattern',
+    'Projection': 'Projection',
+}
+X_KEY = 'Pollinators'
+Y_KEY = 'Fruits/Plant'
+
+BATCH_SIZE = 10000
+
+
+class RunningRegression:
+    """
+    Running sums for the correlation and least-squares line of y on x.
+
+    Keeps the count, means, and the centered sums of squares and cross-products,
+    updated with Welford's method for single points and Chan's pairwise formula for
+    batches and merges, so results match a two-pass computation without storing
+    the data.
+    """
+
+    __slots__ = ('n', 'mean_x', 'mean_y', 'm2_x', 'm2_y', 'c_xy')
+
+    def __init__(self, n=0, mean_x=0.0, mean_y=0.0, m2_x=0.0, m2_y=0.0, c_xy=0.0):
+        self.n = n
+        self.mean_x = mean_x
+        self.mean_y = mean_y
+        self.m2_x = m2_x
+        self.m2_y = m2_y
+        self.c_xy = c_xy
+
+    def add(self, x, y):
+        """
+        Adds one (x, y) point.
+        """
+        self.n += 1
+        dx = x - self.mean_x
+        dy = y - self.mean_y
+        self.mean_x += dx / self.n
+        self.mean_y += dy / self.n
+        self.m2_x += dx * (x - self.mean_x)
+        self.m2_y += dy * (y - self.mean_y)
+        self.c_xy += dx * (y - self.mean_y)
+
+    def add_batch(self, x, y):
+        """
+        Adds arrays of points, summarizing them with NumPy and merging the summary in.
+        """
+        x = np.asarray(x, dtype='float64')
+        y = np.asarray(y, dtype='float64')
+        if len(x) == 0:
+            return
+        mean_x, mean_y = x.mean(), y.mean()
+        dx, dy = x - mean_x, y - mean_y
+        self.merge(RunningRegression(len(x), float(mean_x), float(mean_y),
+                                     float(dx @ dx), float(dy @ dy), float(dx @ dy)))
+
+    def merge(self, other):
+        """
+        Folds another RunningRegression (e.g. from another file or worker) into this one.
+
+        Returns:
+            RunningRegression: self.
+        """
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            for name in self.__slots__:
+                setattr(self, name, getattr(other, name))
+            return self
+        n = self.n + other.n
+        delta_x = other.mean_x - self.mean_x
+        delta_y = other.mean_y - self.mean_y
+        weight = self.n * other.n / n
+        self.m2_x += other.m2_x + delta_x * delta_x * weight
+        self.m2_y += other.m2_y + delta_y * delta_y * weight
+        self.c_xy += other.c_xy + delta_x * delta_y * weight
+        self.mean_x += delta_x * other.n / n
+        self.mean_y += delta_y * other.n / n
+        self.n = n
+        return self
+
+    def result(self):
+        """
+        Returns the statistics scipy.stats.linregress would give for the same points.
+
+        Returns:
+            dict: n, correlation, slope, intercept, r_squared, p_value (two-sided
+            test of zero slope) and stderr (of the slope); NaN where undefined.
+        """
+        nan = float('nan')
+        slope = self.c_xy / self.m2_x if self.m2_x > 0 else nan
+        intercept = self.mean_y - slope * self.mean_x if self.m2_x > 0 else nan
+        if self.m2_x > 0 and self.m2_y > 0:
+            correlation = max(-1.0, min(1.0, self.c_xy / math.sqrt(self.m2_x * self.m2_y)))
+        else:
+            correlation = nan
+
+        p_value = stderr = nan
+        df = self.n - 2
+        if df > 0 and not math.isnan(correlation):
+            if abs(correlation) == 1.0:
+                p_value, stderr = 0.0, 0.0
+            else:
+                # Imported here: scipy.stats takes about a second to import and only
+                # the p-value needs it
+                from scipy import stats
+
+                t = correlation * math.sqrt(df / (1 - correlation ** 2))
+                p_value = float(2 * stats.t.sf(abs(t), df))
+                stderr = math.sqrt((1 - correlation ** 2) * self.m2_y / self.m2_x / df)
+
+        return {
+            'n': self.n,
+            'correlation': correlation,
+            'slope': slope,
+            'intercept': intercept,
+            'r_squared': correlation ** 2,
+            'p_value': p_value,
+            'stderr': stderr,
+        }
+
+    def state(self):
+        """
+        Returns the running sums as a list, for saving as JSON.
+        """
+        return [getattr(self, name) for name in self.__slots__]
+
+
+class GroupedRegression:
+    """
+    RunningRegression per group of flowering records, built in one streaming pass.
+
+    Attributes:
+        by (tuple): Group key names from GROUP_KEYS (empty for a single overall group).
+        x (str): Raw key of the explanatory variable.
+        y (str): Raw key of the response.
+        groups (dict): Group key tuple -> RunningRegression.
+    """
+
+    def __init__(self, by=tuple(GROUP_KEYS), x=X_KEY, y=Y_KEY):
+        """
+        Args:
+            by (str | tuple): Group key names from GROUP_KEYS.
+            x (str): Raw key of the explanatory variable (default Pollinators).
+            y (str): Raw key of the response (default Fruits/Plant).
+        """
+        self.by = (by,) if isinstance(by, str) else tuple(by)
+        unknown = [name for name in self.by if name not in GROUP_KEYS]
+        if unknown:
+            raise ValueError(f"Unknown group keys: {', '.join(unknown)}")
+        self.x = x
+        self.y = y
+        self.groups = {}
+
+    def update(self, source, batch_size=BATCH_SIZE):
+        """
+        Streams flowering records into the per-group sums. Records without a
+        numeric x or y are skipped.
+
+        Args:
+            source: Path to a JSON array or NDJSON file, or an iterable of record dicts.
+            batch_size (int): Records summarized with NumPy at a time.
+
+        Returns:
+            int: Number of records counted.
+        """
+        raw_keys = [GROUP_KEYS[name] for name in self.by]
+        counted = 0
+        pending = {}
+        buffered = 0
+
+        for record in open_orders(source):
+            x, y = record.get(self.x), record.get(self.y)
+            if not isinstance(x, (int, float)) or not isinstance(y, (int, float)):
+                continue
+            points = pending.get(key := tuple(record.get(raw) for raw in raw_keys))
+            if points is None:
+                points = pending[key] = ([], [])
+            points[0].append(x)
+            points[1].append(y)
+            buffered += 1
+            if buffered == batch_size:
+                counted += self._flush(pending)
+                pending, buffered = {}, 0
+        return counted + self._flush(pending)
+
+    def _flush(self, pending):
+        for key, (xs, ys) in pending.items():
+            self.groups.setdefault(key, RunningRegression()).add_batch(xs, ys)
+        return sum(len(xs) for xs, _ in pending.values())
+
+    def merge(self, other):
+        """
+        Folds another GroupedRegression over the same keys and variables into this one.
+
+        Returns:
+            GroupedRegression: self.
+        """
+        if (other.by, other.x, other.y) != (self.by, self.x, self.y):
+            raise ValueError("Cannot merge regressions over different keys or variables")
+        for key, running in other.groups.items():
+            self.groups.setdefault(key, RunningRegression()).merge(running)
+        return self
+
+    def overall(self):
+        """
+        Returns the statistics over all groups together.
+
+        Returns:
+            dict: As RunningRegression.result().
+        """
+        total = RunningRegression()
+        for running in self.groups.values():
+            total.merge(running)
+        return total.result()
+
+    def results(self):
+        """
+        Returns the statistics of every group.
+
+        Returns:
+            pd.DataFrame: One row per group, indexed by the group keys, with the
+            columns of RunningRegression.result().
+        """
+        rows = [running.result() for running in self.groups.values()]
+        frame = pd.DataFrame(rows, columns=['n', 'correlation', 'slope', 'intercept',
+                                            'r_squared', 'p_value', 'stderr'])
+        if self.by:
+            keys = list(self.groups)
+            frame.index = pd.MultiIndex.from_tuples(keys, names=self.by) if len(self.by) > 1 \
+                else pd.Index([key[0] for key in keys], name=self.by[0])
+            try:
+                frame = frame.sort_index()
+            except TypeError:
+                # Mixed key types (e.g. Module 4, 7 and 'Nazario') sort as text
+                frame = frame.sort_index(key=lambda index: index.map(str))
+        return frame
+
+    def save(self, path):
+        """
+        Writes the partial state as JSON, so it can be loaded and merged later.
+        """
+        state = {'by': self.by, 'x': self.x, 'y': self.y,
+                 'groups': [[list(key), running.state()] for key, running in self.groups.items()]}
+        with open(path + '.tmp', 'w') as f:
+            json.dump(state, f)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a state written by save().
+        """
+        with open(path, 'r') as f:
+            state = json.load(f)
+        grouped = cls(state['by'], state['x'], state['y'])
+        grouped.groups = {tuple(key): RunningRegression(*sums) for key, sums in state['groups']}
+        return grouped
+
+
+def pollinator_regression(sources, by=tuple(GROUP_KEYS)):
+    """
+    Builds the grouped pollinator/fruit regression over one or more flowering files.
+
+    Args:
+        sources (str | list): Paths (or record iterables) to read; each is summarized
+            separately and the partial states are merged.
+        by (str | tuple): Group key names from GROUP_KEYS.
+
+    Returns:
+        GroupedRegression: The merged per-group sums.
+    """
+    if isinstance(sources, str) or hasattr(sources, '__fspath__'):
+        sources = [sources]
+    grouped = GroupedRegression(by)
+    for source in sources:
+        partial = GroupedRegression(by)
+        partial.update(source)
+        grouped.merge(partial)
+    return grouped
+
+
+if __name__ == "__main__":
+    grouped = pollinator_regression(FLOWERING_FILE)
+    with pd.option_context('display.width', 200):
+        print(grouped.results())
+    print(grouped.overall())
@@ -1,54 +1,98 @@
+import argparse
+
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, confusion_matrix, classification_report
 
-# Load the dataset
-file_path = 'EXTERNAL_PRODUCTIONS_converted.xlsx'
-df = pd.read_excel(file_path)
+from featurestore import open_store, training_data
+from ordermodel import load_orders
+
+def train_error_classifier(file_path, feature_store=None):
+    """
+    Trains a Random Forest that flags orders with MISSING or REJECTED items from
+    their time to completion and QTY, and evaluates it on a held-out 20%.
+
+    Args:
+        file_path (str): Path to the order file (e.g. EXTERNAL_PRODUCTIONS_converted.xlsx).
+        feature_store (FeatureStore, optional): Train on the store's per-order features
+            as well (article/LOTE error rates, lead time, QTY ratio); file_path is then unused.
+
+    Returns:
+        dict: model, accuracy, conf_matrix, class_report and feature_importances.
+    """
+    if feature_store is not None:
+        # Features as they stood before each order, read from the store instead of
+        # recomputed from the order history
+        X, y = training_data(feature_store)
+        X = X.rename(columns={'Time_to_Fulfillment': 'TIME_TO_COMPLETION'})
+    else:
+        # Load the dataset
+        df = load_orders(file_path).to_frame()
+
+        # Feature Engineering
+        # Calculate time to fulfillment in days
+        df['TIME_TO_COMPLETION'] = (df['RECEPTION_DATE'] - df['SEND_DATE']).dt.days
+
+        # Fill missing values in MISSING and REJECTED columns with 0 (assuming no error if NaN)
+        df['MISSING'].fillna(0, inplace=True)
+        df['REJECTED'].fillna(0, inplace=True)
+
+        # Create an 'ERROR' column where we flag orders with either missing or rejected items
+        df['ERROR'] = (df['MISSING'] > 0) | (df['REJECTED'] > 0)
+
+        # Features: TIME_TO_COMPLETION and QTY
+        X = df[['TIME_TO_COMPLETION', 'QTY']].fillna(0)  # Fill missing values with 0
+        y = df['ERROR'].astype(int)  # Convert boolean to int for classification
 
-# Feature Engineering
-# Calculate time to fulfillment in days
-df['TIME_TO_COMPLETION'] = (df['RECEPTION_DATE'] - df['SEND_DATE']).dt.days
+    # Split data into training and test sets (80% train, 20% test)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-# Fill missing values in MISSING and REJECTED columns with 0 (assuming no error if NaN)
-df['MISSING'].fillna(0, inplace=True)
-df['REJECTED'].fillna(0, inplace=True)
+    # Use Random Forest Classifier with class weighting to handle imbalanced data
+    model = RandomForestClassifier(class_weight='balanced', random_state=42)
+    model.fit(X_train, y_train)
 
-# Create an 'ERROR' column where we flag orders with either missing or rejected items
-df['ERROR'] = (df['MISSING'] > 0) | (df['REJECTED'] > 0)
+    # Predict on the test set
+    y_pred = model.predict(X_test)
 
-# Features: TIME_TO_COMPLETION and QTY
-X = df[['TIME_TO_COMPLETION', 'QTY']].fillna(0)  # Fill missing values with 0
-y = df['ERROR'].astype(int)  # Convert boolean to int for classification
+    # Evaluate the model
+    accuracy = accuracy_score(y_test, y_pred)
+    conf_matrix = confusion_matrix(y_test, y_pred)
+    class_report = classification_report(y_test, y_pred)
 
-# Split data into training and test sets (80% train, 20% test)
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    # Optionally, show the importance of features
+    importances = model.feature_importances_
+    feature_names = X.columns
+    feature_importances = pd.Series(importances, index=feature_names).sort_values(ascending=False)
 
-# Use Random Forest Classifier with class weighting to handle imbalanced data
-model = RandomForestClassifier(class_weight='balanced', random_state=42)
-model.fit(X_train, y_train)
+    return {
+        'model': model,
+        'accuracy': accuracy,
+        'conf_matrix': conf_matrix,
+        'class_report': class_report,
+        'feature_importances': feature_importances,
+    }
 
-# Predict on the test set
-y_pred = model.predict(X_test)
 
-# Evaluate the model
-accuracy = accuracy_score(y_test, y_pred)
-conf_matrix = confusion_matrix(y_test, y_pred)
-class_report = classification_report(y_test, y_pred)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train and evaluate the order error classifier.")
+    parser.add_argument('--feature-store', help="Train on the features of this feature store (filled from the orders if new)")
+    args = parser.parse_args()
 
-# Display the results
-print(f"Accuracy: {accuracy:.2f}")
-print("Confusion Matrix:")
-print(conf_matrix)
-print("\nClassification Report:")
-print(class_report)
+    file_path = 'EXTERNAL_PRODUCTIONS_converted.xlsx'
+    if args.feature_store:
+        with open_store(file_path, args.feature_store) as store:
+            results = train_error_classifier(file_path, feature_store=store)
+    else:
+        results = train_error_classifier(file_path)
 
-# Optionally, show the importance of features
-importances = model.feature_importances_
-feature_names = X.columns
-feature_importances = pd.Series(importances, index=feature_names).sort_values(ascending=False)
+    # Display the results
+    print(f"Accuracy: {results['accuracy']:.2f}")
+    print("Confusion Matrix:")
+    print(results['conf_matrix'])
+    print("\nClassification Report:")
+    print(results['class_report'])
 
-print("\nFeature Importances:")
-print(feature_importances)
+    print("\nFeature Importances:")
+    print(results['feature_importances'])
@@ -1,14 +1,18 @@
 import json
+import sys
+
 import matplotlib.pyplot as plt
-from scipy.stats import pearsonr
-import numpy as np
 
-def analyze_pollinators_vs_fruits(dataset_path):
+from charts import draw_fit, draw_points
+from pollinatorstats import RunningRegression
+
+def analyze_pollinators_vs_fruits(dataset_path, output=None):
   """
   Analyzes the correlation between the number of pollinators and fruits per plant.
 
   Args:
     dataset_path: Path to the JSON file containing the dataset.
+    output: Optional PNG/SVG path; the chart is saved there instead of shown.
 
   Returns:
     None. Displays a scatter plot with regression line and correlation coefficient.
@@ -20,27 +24,35 @@ def analyze_pollinators_vs_fruits(dataset_path):
   pollinators = [entry["Pollinators"] for entry in data]
   fruits_per_plant = [entry["Fruits/Plant"] for entry in data]
 
-  # Calculate Pearson correlation coefficient
-  correlation_coefficient, _ = pearsonr(pollinators, fruits_per_plant)
+  # Calculate the Pearson correlation and regression line in one pass
+  regression = RunningRegression()
+  regression.add_batch(pollinators, fruits_per_plant)
+  fit = regression.result()
+  correlation_coefficient = fit['correlation']
 
   # Create scatter plot
   plt.figure(figsize=(10, 6))
-  plt.scatter(pollinators, fruits_per_plant, alpha=0.5)
+  draw_points(plt.gca(), pollinators, fruits_per_plant, alpha=0.5)
   plt.title('Correlation between Pollinators and Fruits per Plant')
   plt.xlabel('Number of Pollinators')
   plt.ylabel('Fruits per Plant')
 
   # Add regression line
-  m, b = np.polyfit(pollinators, fruits_per_plant, 1)  # Calculate regression line
-  plt.plot(pollinators, m*np.array(pollinators) + b, color='red')  # Plot regression line
+  draw_fit(plt.gca(), pollinators, fit, color='red')  # Line between the smallest and largest x
 
   # Display correlation coefficient on the plot
   plt.text(0.05, 0.95, f'Correlation: {correlation_coefficient:.2f}', 
            transform=plt.gca().transAxes, fontsize=12)
 
   plt.grid(True)
-  plt.show()
+  if output:
+    plt.savefig(output)
+    plt.close()
+  else:
+    plt.show()
 
 
-# Replace 'Last projection (1st flowering) - 2022_converted.json' with the actual path
-analyze_pollinators_vs_fruits('Last projection (1st flowering) - 2022_converted.json') 
\ No newline at end of file
+if __name__ == "__main__":
+  # Replace 'Last projection (1st flowering) - 2022_converted.json' with the actual path
+  analyze_pollinators_vs_fruits('Last projection (1st flowering) - 2022_converted.json',
+                                output=sys.argv[1] if len(sys.argv) > 1 else None) 
\ No newline at end of file
@@ -1,13 +1,18 @@
 import json
+import sys
+
 import matplotlib.pyplot as plt
-from scipy.stats import linregress
 
-def analyze_pollinators_vs_fruit(json_file):
+from charts import draw_fit, draw_points
+from pollinatorstats import RunningRegression
+
+def analyze_pollinators_vs_fruit(json_file, output=None):
   """
   Analyzes the correlation between pollinators and fruits per plant from a JSON dataset.
 
   Args:
     json_file: Path to the JSON file containing the dataset.
+    output: Optional PNG/SVG path; the chart is saved there instead of shown.
 
   Returns:
     None. Displays a scatter plot with regression line and correlation coefficient.
@@ -17,27 +22,36 @@ def analyze_pollinators_vs_fruit(json_file):
     data = json.load(f)
 
   pollinators = [entry['Pollinators'] for entry in data]
-  fruits_per_plant = [entry['Fruits\/Plant'] for entry in data]
+  fruits_per_plant = [entry['Fruits/Plant'] for entry in data]
 
-  # Perform linear regression
-  slope, intercept, r_value, p_value, std_err = linregress(pollinators, fruits_per_plant)
+  # Perform linear regression in one pass over the points
+  regression = RunningRegression()
+  regression.add_batch(pollinators, fruits_per_plant)
+  fit = regression.result()
+  r_value = fit['correlation']
 
   # Create scatter plot
   plt.figure(figsize=(10, 6))
-  plt.scatter(pollinators, fruits_per_plant, alpha=0.7)
+  draw_points(plt.gca(), pollinators, fruits_per_plant, alpha=0.7)
   plt.xlabel('Number of Pollinators')
   plt.ylabel('Fruits per Plant')
   plt.title('Correlation between Pollinators and Fruits per Plant')
 
   # Add regression line
-  plt.plot(pollinators, [slope * x + intercept for x in pollinators], color='red', label='Regression Line')
+  draw_fit(plt.gca(), pollinators, fit, color='red', label='Regression Line')
 
   # Display correlation coefficient
   plt.annotate(f'Correlation Coefficient (r): {r_value:.2f}', xy=(0.05, 0.95), xycoords='axes fraction')
 
   plt.legend()
   plt.grid(True)
-  plt.show()
-
-# Replace 'your_file.json' with the actual path to your JSON file
-analyze_pollinators_vs_fruit('Last projection (1st flowering) - 20222_converted.json') 
\ No newline at end of file
+  if output:
+    plt.savefig(output)
+    plt.close()
+  else:
+    plt.show()
+
+if __name__ == "__main__":
+  # Replace 'your_file.json' with the actual path to your JSON file
+  analyze_pollinators_vs_fruit('Last projection (1st flowering) - 2022_converted.json',
+                               output=sys.argv[1] if len(sys.argv) > 1 else None) 
\ No newline at end of file
@@ -0,0 +1,340 @@
+import functools
+import hashlib
+import inspect
+import io
+import json
+import os
+import pickle
+import sqlite3
+import sys
+import tempfile
+import time
+
+CACHE_DIR = os.path.join('.cache', 'results')
+MAX_BYTES = 256 * 2**20
+# Bump to invalidate every stored result (e.g. when the pickled layout changes)
+CACHE_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    function TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    compute_seconds REAL NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+CREATE TABLE IF NOT EXISTS stats (
+    function TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0,
+    compute_seconds REAL NOT NULL DEFAULT 0,
+    saved_seconds REAL NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+"""
+
+
+def _digest(path, block_size=1 << 20):
+    # Same as ordercache.file_digest, kept here so this module needs no NumPy/pandas
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _Tee(io.TextIOBase):
+    # Writes to the real stdout while keeping a copy, so printed reports can be replayed on a hit
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer = io.StringIO()
+
+    def write(self, text):
+        self.buffer.write(text)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class ResultCache:
+    """
+    On-disk memoization of analysis results, keyed on the content of the input
+    files, the function and its parameters.
+
+    Input files are identified by their SHA-256, which is remembered per path with
+    the file's mtime and size, so an unchanged file is neither parsed nor reread
+    on a hit. The function's module file is hashed the same way, so editing the
+    analysis invalidates its results. Results are pickled together with whatever the function printed,
+    which is printed again on a hit. Entries are evicted least recently used first
+    once their total size passes max_bytes. Hits, misses, compute time and the
+    compute time hits saved are counted per function.
+
+    Attributes:
+        cache_dir (str): Directory holding the index and the pickled results.
+        max_bytes (int): Size limit of the stored results.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+        """
+        Args:
+            cache_dir (str): Directory holding the index and the pickled results.
+            max_bytes (int): Size limit of the stored results.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite'))
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def file_digest(self, path):
+        """
+        Returns the SHA-256 of a file, hashing it only when its mtime or size
+        differs from when it was last hashed.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        row = self.db.execute("SELECT mtime_ns, size, sha256 FROM files WHERE path = ?", (path,)).fetchone()
+        if row is not None and row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+            return row[2]
+        sha256 = _digest(path)
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                            (path, stat.st_mtime_ns, stat.st_size, sha256))
+        return sha256
+
+    def code_digest(self, func):
+        """
+        Returns a hash of the code behind a function: the SHA-256 of every loaded
+        module whose file is under the directory of the function's module (so
+        edits to helpers in the same module or in other repo modules it calls
+        count too), or of its source when it has no module file.
+        """
+        func = inspect.unwrap(func)
+        path = getattr(inspect.getmodule(func), '__file__', None)
+        if path and os.path.exists(path):
+            directory = os.path.dirname(os.path.realpath(path))
+            digests = []
+            for module in list(sys.modules.values()):
+                module_path = getattr(module, '__file__', None)
+                if not module_path:
+                    continue
+                module_path = os.path.realpath(module_path)
+                if module_path.startswith(directory + os.sep) and os.path.exists(module_path):
+                    digests.append((os.path.relpath(module_path, directory), self.file_digest(module_path)))
+            return hashlib.sha256(json.dumps(sorted(digests)).encode()).hexdigest()
+        try:
+            return hashlib.sha256(inspect.getsource(func).encode()).hexdigest()
+        except (OSError, TypeError):
+            return None
+
+    def key(self, func, arguments, paths):
+        """
+        Returns the cache key of a call: the function's name and code_digest, and
+        its arguments. Only the path arguments are hashed by content; every other
+        argument is keyed on its value (JSON, or repr for other objects), so
+        mutable inputs such as DataFrames are not a safe key.
+
+        Args:
+            func (callable): The function called.
+            arguments (dict): Parameter name -> value, defaults included.
+            paths (tuple): Parameters holding an input path (or a list of paths);
+                their file contents are hashed in place of the paths.
+
+        Returns:
+            tuple: (function name, hex key).
+        """
+        name = f"{func.__module__}.{func.__qualname__}"
+        params = {}
+        for param, value in arguments.items():
+            if param in paths and isinstance(value, (str, os.PathLike)):
+                value = {'sha256': self.file_digest(value)}
+            elif param in paths and isinstance(value, (list, tuple)):
+                value = [{'sha256': self.file_digest(item)} for item in value]
+            params[param] = value
+        encoded = json.dumps([CACHE_VERSION, name, self.code_digest(func), params], sort_keys=True, default=repr)
+        return name, hashlib.sha256(encoded.encode()).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.pkl')
+
+    def _count(self, name, **increments):
+        columns = ', '.join(f"{column} = {column} + ?" for column in increments)
+        with self.db:
+            self.db.execute("INSERT OR IGNORE INTO stats (function) VALUES (?)", (name,))
+            self.db.execute(f"UPDATE stats SET {columns} WHERE function = ?", (*increments.values(), name))
+
+    def _load(self, name, key):
+        row = self.db.execute("SELECT compute_seconds FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            with open(self._entry_path(key), 'rb') as f:
+                stored = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            with self.db:
+                self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            return None
+        with self.db:
+            self.db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        self._count(name, hits=1, saved_seconds=row[0])
+        return stored
+
+    def _store(self, name, key, stored, seconds):
+        try:
+            data = pickle.dumps(stored, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        if len(data) > self.max_bytes:
+            return
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see a half-written result
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        now = time.time()
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                            (key, name, len(data), seconds, now, now))
+        self.evict()
+
+    def evict(self, max_bytes=None):
+        """
+        Deletes least recently used results until the rest fit in max_bytes.
+
+        Returns:
+            int: Number of results deleted.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        excess = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0] - max_bytes
+        evicted = []
+        for key, size in self.db.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            if excess <= 0:
+                break
+            evicted.append(key)
+            excess -= size
+        with self.db:
+            self.db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in evicted])
+        for key in evicted:
+            try:
+                os.remove(self._entry_path(key))
+            except FileNotFoundError:
+                pass
+        return len(evicted)
+
+    def call(self, func, *args, paths=None, **kwargs):
+        """
+        Returns func(*args, **kwargs), from the cache when the same function was
+        called with the same parameters on input files with the same contents.
+
+        Args:
+            func (callable): The analysis function.
+            *args, **kwargs: Its arguments.
+            paths (tuple, optional): Parameters of func holding input paths.
+                Defaults to its first parameter.
+
+        Returns:
+            The function's result (a cached copy on a hit).
+        """
+        signature = inspect.signature(func)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        if paths is None:
+            paths = tuple(signature.parameters)[:1]
+        name, key = self.key(func, bound.arguments, paths)
+
+        stored = self._load(name, key)
+        if stored is not None:
+            result, output = stored
+            sys.stdout.write(output)
+            return result
+
+        tee = _Tee(sys.stdout)
+        start = time.perf_counter()
+        stdout, sys.stdout = sys.stdout, tee
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            sys.stdout = stdout
+        seconds = time.perf_counter() - start
+        self._count(name, misses=1, compute_seconds=seconds)
+        self._store(name, key, (result, tee.buffer.getvalue()), seconds)
+        return result
+
+    def memoize(self, func=None, *, paths=None):
+        """
+        Wraps a function so its calls go through call(). Usable as a decorator,
+        with or without the paths argument.
+        """
+        if func is None:
+            return functools.partial(self.memoize, paths=paths)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.call(func, *args, paths=paths, **kwargs)
+        return wrapper
+
+    def stats(self):
+        """
+        Returns the hit/miss counts per function.
+
+        Returns:
+            list: One dict per function with hits, misses, hit_rate, compute_seconds
+            (spent on misses) and saved_seconds (the recorded compute time of the
+            results served from the cache), plus stored entries and bytes.
+        """
+        stored = {name: (entries, size) for name, entries, size in self.db.execute(
+            "SELECT function, COUNT(*), SUM(size) FROM entries GROUP BY function")}
+        rows = []
+        for name, hits, misses, compute_seconds, saved_seconds in self.db.execute(
+                "SELECT function, hits, misses, compute_seconds, saved_seconds FROM stats ORDER BY function"):
+            entries, size = stored.get(name, (0, 0))
+            rows.append({
+                'function': name,
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+                'compute_seconds': compute_seconds,
+                'saved_seconds': saved_seconds,
+                'entries': entries,
+                'bytes': size,
+            })
+        return rows
+
+    def clear(self):
+        """
+        Deletes every stored result and resets the statistics.
+        """
+        self.evict(max_bytes=0)
+        with self.db:
+            self.db.execute("DELETE FROM stats")
+            self.db.execute("DELETE FROM files")
+
+
+if __name__ == "__main__":
+    import FIXarticleattempt2
+
+    with ResultCache() as cache:
+        analyze_stock = cache.memoize(FIXarticleattempt2.analyze_stock)
+        for _ in range(3):
+            print(analyze_stock('EXTERNAL_PRODUCTIONS_converted.json', month=10, year=2023))
+        for row in cache.stats():
+            print(row)
@@ -0,0 +1,326 @@
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from errormodel import FEATURES, get_model, load_model
+
+MS_PER_DAY = 86400000
+
+
+def order_features(order):
+    """
+    Turns one scoring request into the model's (Time_to_Fulfillment, QTY) features.
+
+    Args:
+        order (dict): Either Time_to_Fulfillment (days) and QTY, or SEND_DATE and
+            RECEPTION_DATE (epoch milliseconds or ISO strings) and QTY.
+
+    Returns:
+        tuple: (time_to_fulfillment_days, qty) as floats.
+
+    Raises:
+        ValueError: If the order lacks the needed fields or they are not finite numbers.
+    """
+    qty = order.get('QTY')
+    if qty is None:
+        raise ValueError("QTY is required")
+
+    days = order.get('Time_to_Fulfillment')
+    if days is None:
+        send, reception = order.get('SEND_DATE'), order.get('RECEPTION_DATE')
+        if send is None or reception is None:
+            raise ValueError("Time_to_Fulfillment or SEND_DATE and RECEPTION_DATE are required")
+        if isinstance(send, str) or isinstance(reception, str):
+            days = (datetime.fromisoformat(str(reception)) - datetime.fromisoformat(str(send))).days
+        else:
+            # Whole days, rounding down like Series.dt.days
+            days = (reception - send) // MS_PER_DAY
+    features = float(days), float(qty)
+    # NaN/inf would make predict_proba fail for every order batched with this one
+    if not all(math.isfinite(value) for value in features):
+        raise ValueError("Time_to_Fulfillment and QTY must be finite numbers")
+    return features
+
+
+class ServiceStats:
+    """
+    Request counters and a window of recent latencies for the /stats endpoint.
+    """
+
+    def __init__(self, window=10000):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_orders = 0
+        self.latencies = deque(maxlen=window)
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: Totals, throughput, mean batch size and p50/p99 latency in milliseconds.
+        """
+        elapsed = time.perf_counter() - self.started
+        latencies = np.array(self.latencies) * 1000
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'batches': self.batches,
+            'mean_batch_size': self.batched_orders / self.batches if self.batches else 0.0,
+            'throughput_per_s': self.requests / elapsed if elapsed > 0 else 0.0,
+            'latency_p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else None,
+            'latency_p99_ms': float(np.percentile(latencies, 99)) if len(latencies) else None,
+        }
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent scoring requests into one predict_proba call.
+
+    Requests wait until either max_batch orders are queued or max_wait seconds have
+    passed since the first one, then the whole batch is scored as one array.
+    """
+
+    def __init__(self, pipeline, stats, max_batch=256, max_wait=0.002):
+        self.pipeline = pipeline
+        self.stats = stats
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.positive = list(pipeline.classes_).index(1) if 1 in pipeline.classes_ else None
+        self._task = None
+        # Orders taken off the queue and not yet answered
+        self._batch = []
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """
+        Stops batching and fails every request still waiting for a score.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        pending = self._batch
+        self._batch = []
+        while not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Scoring service stopped"))
+
+    async def score(self, features):
+        """
+        Queues one order's features and waits for its error probability.
+
+        Args:
+            features (tuple): (time_to_fulfillment_days, qty).
+
+        Returns:
+            float: Probability that the order will have errors.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((features, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = self._batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                X = pd.DataFrame([features for features, _ in batch], columns=FEATURES)
+                # Score off the event loop so new requests keep queueing meanwhile
+                risks = await loop.run_in_executor(None, self._predict, X)
+            except Exception:
+                # Score the orders one at a time so a bad one only fails its own request
+                await self._score_each(batch)
+                self._batch = []
+                continue
+
+            self.stats.batches += 1
+            self.stats.batched_orders += len(batch)
+            for (_, future), risk in zip(batch, risks):
+                if not future.done():
+                    future.set_result(float(risk))
+            self._batch = []
+
+    async def _score_each(self, batch):
+        loop = asyncio.get_running_loop()
+        for features, future in batch:
+            try:
+                X = pd.DataFrame([features], columns=FEATURES)
+                risk = float((await loop.run_in_executor(None, self._predict, X))[0])
+            except Exception as error:
+                if not future.done():
+                    future.set_exception(error)
+                continue
+            if not future.done():
+                future.set_result(risk)
+
+    def _predict(self, X):
+        if self.positive is None:
+            return np.zeros(len(X))
+        return self.pipeline.predict_proba(X)[:, self.positive]
+
+
+class ScoringService:
+    """
+    Minimal HTTP/1.1 server for error-risk scoring on localhost (TCP or Unix socket).
+
+    Endpoints:
+        POST /score: JSON order (see order_features) -> {"error_risk": p}.
+        GET /stats: Latency percentiles and throughput counters.
+        GET /health: {"status": "ok"}.
+    """
+
+    def __init__(self, pipeline, max_batch=256, max_wait=0.002):
+        self.stats = ServiceStats()
+        self.batcher = MicroBatcher(pipeline, self.stats, max_batch=max_batch, max_wait=max_wait)
+        self.server = None
+
+    async def start(self, host='127.0.0.1', port=8765, unix_path=None):
+        """
+        Starts listening and returns the asyncio server.
+        """
+        self.batcher.start()
+        if unix_path:
+            self.server = await asyncio.start_unix_server(self._handle, path=unix_path)
+        else:
+            self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        await self.batcher.stop()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        name, _, value = line.decode('latin-1').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                    length = int(headers.get('content-length', 0))
+                    if length < 0:
+                        raise ValueError(f"Negative Content-Length: {length}")
+                except ValueError as error:
+                    # The rest of the stream cannot be framed, so reply and close
+                    await self._respond(writer, '400 Bad Request', {'error': f"Malformed request: {error}"}, False)
+                    break
+                body = await reader.readexactly(length)
+
+                status, payload = await self._route(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive):
+        data = json.dumps(payload).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+        )
+        await writer.drain()
+
+    async def _route(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return '200 OK', {'status': 'ok'}
+        if method == 'GET' and path == '/stats':
+            return '200 OK', self.stats.snapshot()
+        if method != 'POST' or path != '/score':
+            return '404 Not Found', {'error': f'No route for {method} {path}'}
+
+        start = time.perf_counter()
+        self.stats.requests += 1
+        try:
+            features = order_features(json.loads(body))
+        except (ValueError, TypeError, AttributeError) as error:
+            self.stats.errors += 1
+            return '400 Bad Request', {'error': str(error)}
+
+        try:
+            risk = await self.batcher.score(features)
+        except Exception as error:
+            self.stats.errors += 1
+            return '500 Internal Server Error', {'error': f"Scoring failed: {error}"}
+        self.stats.latencies.append(time.perf_counter() - start)
+        return '200 OK', {'error_risk': risk}
+
+
+async def serve(pipeline, host='127.0.0.1', port=8765, unix_path=None, max_batch=256, max_wait=0.002):
+    """
+    Runs the scoring service until cancelled.
+    """
+    service = ScoringService(pipeline, max_batch=max_batch, max_wait=max_wait)
+    server = await service.start(host, port, unix_path)
+    print(f"Scoring service listening on {unix_path or f'http://{host}:{port}'}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local error-risk scoring service with micro-batching.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument('--estimator', default='random_forest')
+    parser.add_argument('--training', default="EXTERNAL_PRODUCTIONS_converted.xlsx",
+                        help="Training data used when no stored model exists")
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    pipeline, _ = load_model(args.estimator)
+    if pipeline is None:
+        pipeline, _ = get_model(args.training, args.estimator)
+
+    try:
+        asyncio.run(serve(pipeline, args.host, args.port, args.unix,
+                          max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
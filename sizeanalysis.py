@@ -0,0 +1,179 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from ordermodel import load_orders
+
+# Per-process views of the shared order arrays, set by _attach
+_shared = {}
+
+
+def order_error_rates(df):
+    """
+    Computes each order's error rate: (MISSING + REJECTED) / QTY.
+
+    Args:
+        df (pd.DataFrame): Orders with SIZE, QTY, MISSING and REJECTED.
+
+    Returns:
+        pd.DataFrame: SIZE, ERRORS, QTY and ERROR_RATE for the orders with a
+        positive QTY, indexed like df.
+    """
+    qty = pd.to_numeric(df['QTY'], errors='coerce')
+    errors = df['MISSING'].fillna(0) + df['REJECTED'].fillna(0)
+    valid = (qty > 0) & df['SIZE'].notna()
+    return pd.DataFrame({
+        'SIZE': df.loc[valid, 'SIZE'],
+        'ERRORS': errors[valid].astype('float64'),
+        'QTY': qty[valid].astype('float64'),
+        'ERROR_RATE': (errors[valid] / qty[valid]).astype('float64'),
+    })
+
+
+def _sorted_groups(rates):
+    # Orders sorted by size, with each size's start offset and length
+    order = np.argsort(rates['SIZE'].to_numpy(), kind='stable')
+    sizes = rates['SIZE'].to_numpy()[order]
+    labels, starts, counts = np.unique(sizes, return_index=True, return_counts=True)
+    return order, labels, starts, counts
+
+
+def test_sizes(df, method='anova'):
+    """
+    Tests whether per-order error rates differ between sizes.
+
+    Each size's group holds the error rates of all its orders rather than one
+    aggregated value per size, which would leave the test undefined.
+
+    Args:
+        df (pd.DataFrame): Orders with SIZE, QTY, MISSING and REJECTED.
+        method (str): 'anova' (one-way ANOVA) or 'kruskal' (Kruskal-Wallis H test,
+            which does not assume normal error rates).
+
+    Returns:
+        tuple: (statistic, p-value); NaN when fewer than two sizes have orders.
+    """
+    tests = {'anova': stats.f_oneway, 'kruskal': stats.kruskal}
+    if method not in tests:
+        raise ValueError(f"Unknown method: {method}")
+
+    rates = order_error_rates(df)
+    order, _, starts, _ = _sorted_groups(rates)
+    groups = np.split(rates['ERROR_RATE'].to_numpy()[order], starts[1:])
+    if len(groups) < 2:
+        return float('nan'), float('nan')
+    # Identical rates everywhere (e.g. no errors at all) leave the test undefined
+    if np.ptp(rates['ERROR_RATE'].to_numpy()) == 0:
+        return float('nan'), float('nan')
+    statistic, pvalue = tests[method](*groups)
+    return float(statistic), float(pvalue)
+
+
+def _attach(values_name, n_values, starts, orders):
+    # Map the parent's shared memory instead of receiving a pickled copy per task
+    block = shared_memory.SharedMemory(name=values_name)
+    values = np.ndarray((3, n_values), dtype='float64', buffer=block.buf)
+    _shared.update(block=block, errors=values[0], qty=values[1], frequency=values[2],
+                   starts=starts, orders=orders)
+
+
+def _resample(task):
+    seed, n_resamples = task
+    errors, qty, frequency = _shared['errors'], _shared['qty'], _shared['frequency']
+    starts, orders = _shared['starts'], _shared['orders']
+    rng = np.random.default_rng(seed)
+
+    ends = np.append(starts[1:], len(errors))
+    rates = np.empty((n_resamples, len(starts)))
+    for group, (start, end) in enumerate(zip(starts, ends)):
+        # Drawing a size's orders with replacement is a multinomial draw over its
+        # distinct (errors, QTY) pairs, so the cost does not grow with the order count
+        counts = rng.multinomial(orders[group], frequency[start:end] / orders[group], size=n_resamples)
+        rates[:, group] = (counts @ errors[start:end]) / (counts @ qty[start:end])
+    return rates
+
+
+def bootstrap_error_rates(df, n_resamples=2000, confidence=0.95, workers=None, seed=42):
+    """
+    Estimates each size's error rate (errors / QTY over its orders) with a
+    percentile bootstrap confidence interval.
+
+    Orders are resampled with replacement within their size. Each size's orders
+    are reduced to their distinct (errors, QTY) pairs with frequencies, so a
+    resample is one vectorized multinomial draw per size whatever the number of
+    orders. Blocks of resamples are spread across worker processes that map the
+    pairs from shared memory.
+
+    Args:
+        df (pd.DataFrame): Orders with SIZE, QTY, MISSING and REJECTED.
+        n_resamples (int): Bootstrap resamples.
+        confidence (float): Interval coverage, e.g. 0.95.
+        workers (int, optional): Worker processes. Defaults to the CPU count; 1 runs inline.
+        seed (int): Seed for reproducible resamples (independent of the worker count).
+
+    Returns:
+        pd.DataFrame: One row per SIZE with orders, errors, qty, error_rate, ci_low
+        and ci_high.
+    """
+    rates = order_error_rates(df)
+    order, labels, _, counts = _sorted_groups(rates)
+    group = np.repeat(np.arange(len(labels)), counts)
+    pairs, frequency = np.unique(
+        np.column_stack([group, rates['ERRORS'].to_numpy()[order], rates['QTY'].to_numpy()[order]]),
+        axis=0, return_counts=True)
+    starts = np.searchsorted(pairs[:, 0], np.arange(len(labels)))
+
+    result = pd.DataFrame({
+        'orders': counts,
+        'errors': np.bincount(pairs[:, 0].astype('int64'), pairs[:, 1] * frequency, minlength=len(labels)),
+        'qty': np.bincount(pairs[:, 0].astype('int64'), pairs[:, 2] * frequency, minlength=len(labels)),
+    }, index=pd.Index(labels, name='SIZE'))
+    result['error_rate'] = result['errors'] / result['qty']
+    if len(labels) == 0 or n_resamples < 1:
+        result['ci_low'] = result['ci_high'] = np.nan
+        return result
+
+    workers = workers or os.cpu_count() or 1
+    # A fixed split into tasks keeps the resamples identical whatever the worker count
+    n_tasks = min(n_resamples, 64)
+    sizes = np.full(n_tasks, n_resamples // n_tasks)
+    sizes[:n_resamples % n_tasks] += 1
+    seeds = np.random.SeedSequence(seed).spawn(n_tasks)
+    tasks = list(zip(seeds, sizes.tolist()))
+
+    values = np.ascontiguousarray(np.vstack([pairs[:, 1], pairs[:, 2], frequency]), dtype='float64')
+    block = shared_memory.SharedMemory(create=True, size=values.nbytes)
+    try:
+        np.ndarray(values.shape, dtype='float64', buffer=block.buf)[:] = values
+        initargs = (block.name, values.shape[1], starts, counts)
+
+        if workers == 1:
+            _attach(*initargs)
+            try:
+                samples = [_resample(task) for task in tasks]
+            finally:
+                _shared.clear()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=initargs) as pool:
+                samples = list(pool.map(_resample, tasks))
+    finally:
+        block.close()
+        block.unlink()
+
+    samples = np.vstack(samples)
+    alpha = (1 - confidence) / 2
+    result['ci_low'] = np.quantile(samples, alpha, axis=0)
+    result['ci_high'] = np.quantile(samples, 1 - alpha, axis=0)
+    return result
+
+
+if __name__ == "__main__":
+    df = load_orders('EXTERNAL_PRODUCTIONS_converted.xlsx').to_frame()
+    for method in ('anova', 'kruskal'):
+        statistic, pvalue = test_sizes(df, method)
+        print(f"{method}: statistic {statistic:.3f}, p-value {pvalue:.4f}")
+    print(bootstrap_error_rates(df))
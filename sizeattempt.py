@@ -1,30 +1,48 @@
-import pandas as pd
-from scipy import stats
+import math
 
-# Load the Excel data into a pandas DataFrame
-df = pd.read_excel('EXTERNAL_PRODUCTIONS_converted.xlsx')
+from ordermodel import load_orders
+from sizeanalysis import test_sizes
 
-# Combine 'MISSING' and 'REJECTED' columns to create a 'TOTAL_ERRORS' column
-df['TOTAL_ERRORS'] = df['MISSING'] + df['REJECTED']
+def size_anova(df):
+    """
+    Tests whether error rates differ between sizes with a one-way ANOVA over the
+    per-order error rates of each size (see sizeanalysis.test_sizes).
 
-# Group the data by 'SIZE' and calculate the total errors and total quantity for each size
-grouped_by_size = df.groupby('SIZE').agg({'TOTAL_ERRORS': 'sum', 'QTY': 'sum'})
+    Args:
+        df (pd.DataFrame): Orders with SIZE, QTY, MISSING and REJECTED.
 
-# Calculate the error rate for each size
-grouped_by_size['ERROR_RATE'] = grouped_by_size['TOTAL_ERRORS'] / grouped_by_size['QTY']
+    Returns:
+        tuple: (F-value, p-value, per-size totals and error rate); the F- and
+        p-values are NaN when the test is undefined.
+    """
+    # Combine 'MISSING' and 'REJECTED' columns to create a 'TOTAL_ERRORS' column
+    df = df.assign(TOTAL_ERRORS=df['MISSING'] + df['REJECTED'])
 
-# Perform an ANOVA test to determine if there is a significant difference in error rates between sizes
-groups = []
-for size, data in grouped_by_size.groupby('SIZE'):
-    groups.append(data['ERROR_RATE'].dropna())
-fvalue, pvalue = stats.f_oneway(*groups)
+    # Group the data by 'SIZE' and calculate the total errors and total quantity for each size
+    grouped_by_size = df.groupby('SIZE').agg({'TOTAL_ERRORS': 'sum', 'QTY': 'sum'})
 
-# Print the results
-print(f"F-value: {fvalue}")
-print(f"P-value: {pvalue}")
+    # Calculate the error rate for each size
+    grouped_by_size['ERROR_RATE'] = grouped_by_size['TOTAL_ERRORS'] / grouped_by_size['QTY']
 
-# Interpretation
-if pvalue < 0.05:
-    print("The p-value is less than 0.05, indicating that there is a significant difference in error rates between sizes.")
-else:
-    print("The p-value is greater than 0.05, indicating that there is no significant difference in error rates between sizes.")
\ No newline at end of file
+    # Compare the sizes' per-order error rates: one aggregated rate per size
+    # leaves single-value groups, for which the ANOVA is undefined
+    fvalue, pvalue = test_sizes(df, 'anova')
+    return fvalue, pvalue, grouped_by_size
+
+
+if __name__ == "__main__":
+    # Load the Excel data into a pandas DataFrame
+    df = load_orders('EXTERNAL_PRODUCTIONS_converted.xlsx').to_frame()
+    fvalue, pvalue, grouped_by_size = size_anova(df)
+
+    # Print the results
+    print(f"F-value: {fvalue}")
+    print(f"P-value: {pvalue}")
+
+    # Interpretation
+    if math.isnan(pvalue):
+        print("The test is undefined: fewer than two sizes have orders, or all error rates are equal.")
+    elif pvalue < 0.05:
+        print("The p-value is less than 0.05, indicating that there is a significant difference in error rates between sizes.")
+    else:
+        print("The p-value is greater than 0.05, indicating that there is no significant difference in error rates between sizes.")
@@ -0,0 +1,176 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+from functools import lru_cache
+
+from orderstream import open_orders
+
+MS_PER_DAY = 86400000
+
+
+@lru_cache(maxsize=65536)
+def _utc_day_to_month(days):
+    # Civil-from-days conversion (proleptic Gregorian calendar) on the day number
+    # since 1970-01-01, so no datetime objects are allocated per record
+    z = days + 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    month = mp + 3 if mp < 10 else mp - 9
+    year = yoe + era * 400 + (1 if month <= 2 else 0)
+    return year, month
+
+
+def utc_month(timestamp_ms):
+    """
+    Converts an epoch timestamp in milliseconds to its (year, month) in UTC.
+
+    Args:
+        timestamp_ms (int | float): Milliseconds since the Unix epoch.
+
+    Returns:
+        tuple: (year, month) of the timestamp.
+    """
+    return _utc_day_to_month(int(timestamp_ms // MS_PER_DAY))
+
+
+@lru_cache(maxsize=65536)
+def local_month(timestamp_ms):
+    """
+    Converts an epoch timestamp in milliseconds to its (year, month) in local time.
+
+    Args:
+        timestamp_ms (int | float): Milliseconds since the Unix epoch.
+
+    Returns:
+        tuple: (year, month) of the timestamp.
+    """
+    date = datetime.fromtimestamp(timestamp_ms / 1000)
+    return date.year, date.month
+
+
+class StockIndex:
+    """
+    Per-article order aggregates grouped by (year, month), built in a single pass.
+
+    Each record's SEND_DATE is bucketed into a month exactly once; afterwards any
+    number of stock predictions can be answered from the index without touching
+    the raw records again.
+
+    Attributes:
+        article_counts (Counter): Number of orders per article, in first-seen order.
+        monthly (dict): article -> {(year, month): [total QTY, order count]}.
+    """
+
+    def __init__(self, utc=True):
+        """
+        Args:
+            utc (bool): Bucket SEND_DATE by UTC month (as in FIXarticleattempt2.py)
+                rather than local-time month (as in ERarticleattempt2.py).
+        """
+        self.utc = utc
+        self.article_counts = Counter()
+        self.monthly = defaultdict(dict)
+
+    @classmethod
+    def build(cls, source, utc=True):
+        """
+        Builds an index from a JSON order file or an iterable of order records.
+
+        Args:
+            source: Path to the JSON file, or an iterable of order records.
+            utc (bool): Bucket by UTC month instead of local-time month.
+
+        Returns:
+            StockIndex: The populated index.
+        """
+        index = cls(utc=utc)
+        index.add(open_orders(source))
+        return index
+
+    def add(self, records):
+        """
+        Folds order records into the index.
+
+        Args:
+            records (iterable): Order records with ARTICLE, SEND_DATE and QTY.
+        """
+        to_month = utc_month if self.utc else local_month
+        article_counts = self.article_counts
+        monthly = self.monthly
+
+        for entry in records:
+            article = entry['ARTICLE']
+            article_counts[article] += 1
+            bucket = monthly[article].setdefault(to_month(entry['SEND_DATE']), [0, 0])
+            bucket[0] += entry['QTY']
+            bucket[1] += 1
+
+    def top_articles(self, n=5):
+        """
+        Returns the n most frequently ordered articles (ties keep first-seen order).
+
+        Args:
+            n (int): Number of articles to return.
+
+        Returns:
+            list: Article identifiers, most ordered first.
+        """
+        return [article for article, count in self.article_counts.most_common(n)]
+
+    def predict(self, month, year, top_n=5, fallback=True, per_order=False, buffer=0.20):
+        """
+        Predicts stock needs for the top-N articles for a target month.
+
+        With the defaults this matches FIXarticleattempt2.analyze_stock: the target
+        month's quantity if the article was ordered then, otherwise the average
+        monthly quantity over the article's whole history, plus a 20% buffer.
+        With fallback=False and per_order=True it matches ERarticleattempt2.analyze_stock
+        (average quantity per order in the target month, 0 when there were none).
+
+        Args:
+            month (int): The month to predict stock for (1-12).
+            year (int): The year to predict stock for.
+            top_n (int): Number of most frequently ordered articles to predict for.
+            fallback (bool): Use the article's full history when the target month is empty.
+            per_order (bool): Average per order instead of per month.
+            buffer (float): Safety margin added on top of the average.
+
+        Returns:
+            dict: A dictionary containing:
+                - "most_frequent_articles": A list of the most frequently ordered articles.
+                - "predicted_stock_needs": A dictionary mapping article to predicted stock need.
+        """
+        most_frequent_articles = self.top_articles(top_n)
+        predicted_stock_needs = {}
+
+        for article in most_frequent_articles:
+            months = self.monthly.get(article, {})
+
+            if (year, month) in months:
+                relevant = [months[(year, month)]]
+            elif fallback:
+                relevant = list(months.values())
+            else:
+                relevant = []
+
+            if relevant:
+                total_quantity = sum(bucket[0] for bucket in relevant)
+                divisor = sum(bucket[1] for bucket in relevant) if per_order else len(relevant)
+                predicted_stock_needs[article] = int(total_quantity / divisor * (1 + buffer))
+            elif fallback:
+                predicted_stock_needs[article] = "No data available for this article"
+            else:
+                predicted_stock_needs[article] = 0
+
+        return {
+            "most_frequent_articles": most_frequent_articles,
+            "predicted_stock_needs": predicted_stock_needs
+        }
+
+
+if __name__ == "__main__":
+    index = StockIndex.build('EXTERNAL_PRODUCTIONS_converted.json')
+    for year, month in [(2008, 5), (2008, 9), (2023, 10)]:
+        print(year, month, index.predict(month, year))
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+from collections import Counter
+
+from orderstream import open_orders
+from stockindex import local_month
+
+STATE_PATH = os.path.join('.cache', 'stock_state.json')
+STATE_VERSION = 2
+
+
+class StockState:
+    """
+    Persistent per-article, per-month order aggregates for stock prediction.
+
+    Instead of recomputing monthly counts from the full order history on every run,
+    new orders are folded in with update() and predictions are read straight from
+    the aggregates. Months are bucketed by RECEPTION_DATE in local time, and kept in
+    first-seen order, exactly as articlegpt/finalarticle build their Counters.
+
+    Records are expected to arrive in RECEPTION_DATE order: the state keeps a
+    watermark (the latest RECEPTION_DATE folded in and the records seen at it), and
+    update() skips records at or before it, so feeding the same orders twice does
+    not count them twice.
+
+    Attributes:
+        months (dict): article -> {'YYYY-MM': [orders, orders with QTY, QTY sum]}.
+        ingested (int): Number of records folded in so far.
+        watermark (int): Latest RECEPTION_DATE folded in (epoch ms), None when empty.
+        watermark_ids (dict): Fingerprint -> count of the records folded in at the watermark.
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str, optional): File the state is saved to and loaded from.
+        """
+        self.path = path
+        self.months = {}
+        self.ingested = 0
+        self.watermark = None
+        self.watermark_ids = {}
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a saved state, or returns an empty one if the file does not exist yet.
+
+        Args:
+            path (str): Path to the state file.
+
+        Returns:
+            StockState: The loaded state.
+        """
+        state = cls(path)
+        try:
+            with open(path, 'r') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return state
+        if saved.get('version') != STATE_VERSION:
+            raise ValueError(f"Unsupported stock state version in {path}")
+        state.months = saved['months']
+        state.ingested = saved['ingested']
+        state.watermark = saved['watermark']
+        state.watermark_ids = saved['watermark_ids']
+        return state
+
+    def save(self, path=None):
+        """
+        Writes the state to disk atomically.
+
+        Args:
+            path (str, optional): Destination; defaults to the path the state was loaded from.
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path given to save the stock state to")
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': STATE_VERSION, 'ingested': self.ingested, 'watermark': self.watermark,
+                       'watermark_ids': self.watermark_ids, 'months': self.months}, f)
+        os.replace(tmp_path, path)
+        self.path = path
+
+    def update(self, new_records):
+        """
+        Folds new order records into the aggregates. Only the given records are
+        read, so the cost is proportional to the number of new orders. Records
+        received before the watermark, or already folded in at it, are skipped.
+
+        Args:
+            new_records: Path to a JSON file of new orders, or an iterable of order records.
+
+        Returns:
+            int: Number of records that were counted.
+        """
+        months = self.months
+        counted = 0
+        watermark, already_seen = self.watermark, Counter(self.watermark_ids)
+        latest, latest_ids = watermark, Counter(self.watermark_ids)
+
+        for record in open_orders(new_records):
+            article = record.get('ARTICLE')
+            reception_timestamp = record.get('RECEPTION_DATE')
+            if not (article and reception_timestamp):
+                continue
+
+            record_id = None
+            if watermark is not None and reception_timestamp <= watermark:
+                if reception_timestamp < watermark:
+                    continue
+                record_id = _record_id(record)
+                if already_seen[record_id]:
+                    already_seen[record_id] -= 1
+                    continue
+
+            year, month = local_month(reception_timestamp)
+            bucket = months.setdefault(article, {}).setdefault(f"{year:04d}-{month:02d}", [0, 0, 0])
+            bucket[0] += 1
+            qty = record.get('QTY')
+            if qty is not None:
+                bucket[1] += 1
+                bucket[2] += qty
+            counted += 1
+
+            if latest is None or reception_timestamp > latest:
+                latest, latest_ids = reception_timestamp, Counter()
+            if reception_timestamp == latest:
+                latest_ids[record_id or _record_id(record)] += 1
+
+        self.ingested += counted
+        self.watermark, self.watermark_ids = latest, dict(latest_ids)
+        return counted
+
+    def summarized_receptions(self):
+        """
+        Returns the number of orders per month for each article, in the shape of
+        articlegpt.summarize_receptions.
+
+        Returns:
+            dict: article -> {'YYYY-MM': order count}.
+        """
+        return {
+            article: {month: bucket[0] for month, bucket in months.items()}
+            for article, months in self.months.items()
+        }
+
+    def sorted_articles(self):
+        """
+        Returns articles sorted by order count, most ordered first.
+
+        Returns:
+            list: (article, count) tuples.
+        """
+        counts = {article: sum(bucket[0] for bucket in months.values())
+                  for article, months in self.months.items()}
+        return sorted(counts.items(), key=lambda item: item[1], reverse=True)
+
+    def most_frequent_articles(self, top_n=5):
+        """
+        Returns the articles with the largest total quantity ordered.
+
+        Args:
+            top_n (int): Number of articles to return.
+
+        Returns:
+            list: Article identifiers.
+        """
+        quantities = {article: sum(bucket[2] for bucket in months.values())
+                      for article, months in self.months.items()
+                      if any(bucket[1] for bucket in months.values())}
+        ranked = sorted(quantities.items(), key=lambda item: item[1], reverse=True)
+        return [article for article, _ in ranked[:top_n]]
+
+    def predict_stock_requirements(self, require_qty=False):
+        """
+        Predicts stock levels from the stored monthly aggregates using the simple
+        moving average of the scripts: the last 3 months if available, otherwise
+        all months.
+
+        Args:
+            require_qty (bool): Only count orders with a QTY, as finalarticle does.
+
+        Returns:
+            dict: Predicted stock level for each article.
+        """
+        field = 1 if require_qty else 0
+        stock_predictions = {}
+
+        for article, months in self.months.items():
+            order_counts = [bucket[field] for bucket in months.values() if bucket[field]]
+            if not order_counts:
+                continue
+
+            if len(order_counts) >= 3:
+                # Simple average of last 3 months for stock prediction
+                predicted_stock = sum(order_counts[-3:]) // 3
+            else:
+                predicted_stock = sum(order_counts) // len(order_counts)  # Average all available data
+
+            stock_predictions[article] = predicted_stock
+
+        return stock_predictions
+
+
+def _record_id(record):
+    # Content fingerprint telling apart the records received at the same timestamp
+    return hashlib.sha1(json.dumps(record, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+if __name__ == "__main__":
+    state = StockState()
+    print(f"Folded in {state.update('EXTERNAL_PRODUCTIONS_converted.json')} orders")
+    print(state.predict_stock_requirements())
@@ -0,0 +1,322 @@
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from orderstream import iter_orders
+
+ORDERS_TEMPLATE = 'EXTERNAL_PRODUCTIONS_converted.json'
+FLOWERING_TEMPLATE = 'Last projection (1st flowering) - 2022_converted.json'
+
+FORMATS = ('json', 'ndjson', 'xlsx')
+# Data rows that fit on one worksheet (Excel's row limit minus the header)
+XLSX_MAX_ROWS = 1048575
+
+DAY_MS = 86400000
+EPOCH = datetime(1970, 1, 1)
+CHUNK_SIZE = 100000
+
+# Column order of the real exports, used for NDJSON/JSON keys and xlsx headers
+ORDER_COLUMNS = ['LOTE', 'ARTICLE', 'DESCRIPTION', 'SIZE', 'SEND_DATE', 'QTY', 'O/C', 'REFER_ID',
+                 'RECEPTION_DATE', 'RECEPTION_QTY', 'MISSING', 'REJECTED', 'REFER', 'OBSERVATION']
+FLOWERING_COLUMNS = ['Date', 'Module', 'Turn ', 'Lots', 'Area\n (Hectares)', 'Variety\n of the pattern',
+                     'Plants/Lot', 'Pollinators', 'Harvestable Plants', 'Projection', 'Fruits/Plant (100%)',
+                     'Fruit profitability', 'Fruit weight/projection', 'Fruits/Plant', 'Ton/Lot', 'Ton/Hectare']
+DATE_COLUMNS = ('SEND_DATE', 'RECEPTION_DATE', 'Date')
+
+
+def parse_rows(text):
+    """
+    Parses a row count such as '10000', '10k', '1M' or '10M'.
+    """
+    text = text.strip().lower()
+    scale = {'k': 1000, 'm': 1000000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def order_profile(template=ORDERS_TEMPLATE):
+    """
+    Collects the empirical distributions of the order export that the generator samples from.
+
+    Args:
+        template (str): Path to a JSON order export.
+
+    Returns:
+        dict: Per-column value arrays plus lead times, article descriptions and the
+        (MISSING, REJECTED) pairs observed together.
+    """
+    records = list(iter_orders(template))
+    sent = [record for record in records if record.get('SEND_DATE') and record.get('RECEPTION_DATE')]
+    return {
+        'articles': list(dict.fromkeys(record['ARTICLE'] for record in records)),
+        'descriptions': [record['DESCRIPTION'] for record in records],
+        'sizes': np.array([record['SIZE'] for record in records]),
+        'qty': np.array([record['QTY'] for record in records]),
+        'lead_days': np.array([(record['RECEPTION_DATE'] - record['SEND_DATE']) // DAY_MS for record in sent]),
+        'errors': [(record.get('MISSING'), record.get('REJECTED')) for record in records],
+        'oc': [record.get('O/C') for record in records],
+        'refer_id': [record.get('REFER_ID') for record in records],
+        'refer': [record.get('REFER') for record in records],
+        'observation': [record.get('OBSERVATION') for record in records],
+        'orders_per_lote': max(1, len(records) // max(1, len({record.get('LOTE') for record in records}))),
+    }
+
+
+def synthetic_orders(rows, seed=42, profile=None, n_articles=None, chunk_size=CHUNK_SIZE):
+    """
+    Generates EXTERNAL_PRODUCTIONS-style order records in chunks.
+
+    SIZE, QTY, lead time, error counts and the reference columns are drawn from the
+    template's empirical distributions. Article popularity follows a Zipf-like law
+    over the template's articles plus synthetic ones, orders come in LOTE groups of
+    the template's average size, and send dates cover 2008 onwards.
+
+    Args:
+        rows (int): Number of orders.
+        seed (int): Random seed.
+        profile (dict, optional): From order_profile(); built from the real export if omitted.
+        n_articles (int, optional): Distinct articles; defaults to about sqrt(rows), at
+            least the template's.
+        chunk_size (int): Records per yielded list.
+
+    Yields:
+        list: Order dicts with epoch-millisecond dates.
+    """
+    profile = profile or order_profile()
+    rng = np.random.default_rng(seed)
+    real_articles = profile['articles']
+    n_articles = n_articles or max(len(real_articles), int(np.sqrt(rows)))
+    articles = np.array(real_articles + [f"31/1-{9000 + i}" for i in range(n_articles - len(real_articles))],
+                        dtype=object)
+    descriptions = np.array(profile['descriptions'], dtype=object)[
+        rng.integers(len(profile['descriptions']), size=n_articles)]
+    weights = 1 / np.arange(1, n_articles + 1)
+    weights /= weights.sum()
+
+    errors = profile['errors']
+    columns = {name: np.array(profile[name], dtype=object) for name in ('oc', 'refer_id', 'refer', 'observation')}
+    start_ms = 1199145600000  # 2008-01-01
+    span_days = max(365, rows // 500)
+
+    for start in range(0, rows, chunk_size):
+        n = min(chunk_size, rows - start)
+        article_index = rng.choice(n_articles, size=n, p=weights)
+        lote_numbers = (start + np.arange(n)) // profile['orders_per_lote']
+        # Send dates advance with the row number so the file is in send order, like the export
+        send = start_ms + (start + np.arange(n, dtype='int64')) * span_days // rows * DAY_MS
+        reception = send + rng.choice(profile['lead_days'], size=n) * DAY_MS
+        qty = rng.choice(profile['qty'], size=n)
+        size = rng.choice(profile['sizes'], size=n)
+        error_index = rng.integers(len(errors), size=n)
+        draws = {name: values[rng.integers(len(values), size=n)] for name, values in columns.items()}
+
+        chunk = []
+        for i in range(n):
+            missing, rejected = errors[error_index[i]]
+            chunk.append({
+                'LOTE': f"03/01/{11 + lote_numbers[i] // 100000:02d}-{lote_numbers[i] // 1000 % 100:02d}"
+                        f"-{lote_numbers[i] % 1000:03d}",
+                'ARTICLE': articles[article_index[i]],
+                'DESCRIPTION': descriptions[article_index[i]],
+                'SIZE': int(size[i]),
+                'SEND_DATE': int(send[i]),
+                'QTY': int(qty[i]),
+                'O/C': draws['oc'][i],
+                'REFER_ID': draws['refer_id'][i],
+                'RECEPTION_DATE': int(reception[i]),
+                'RECEPTION_QTY': float(qty[i] - (missing or 0)),
+                'MISSING': missing,
+                'REJECTED': rejected,
+                'REFER': draws['refer'][i],
+                'OBSERVATION': draws['observation'][i],
+            })
+        yield chunk
+
+
+def flowering_profile(template=FLOWERING_TEMPLATE):
+    """
+    Collects what the flowering generator needs from the real projection file.
+
+    Args:
+        template (str): Path to the flowering projection JSON.
+
+    Returns:
+        dict: Observed (Date, Module, Turn, Variety, Projection, profitability,
+        fruit weight) combinations, plants per lot and per-hectare density samples,
+        pollinator shares, and the linear fit of Fruits/Plant (100%) on pollinator
+        share with its residual spread.
+    """
+    with open(template, 'r') as f:
+        data = json.load(f)
+    plants = np.array([item['Plants/Lot'] for item in data], dtype='float64')
+    area = np.array([item['Area\n (Hectares)'] for item in data], dtype='float64')
+    share = np.array([item['Pollinators'] for item in data], dtype='float64') / plants
+    fruits = np.array([item['Fruits/Plant (100%)'] for item in data], dtype='float64')
+    slope, intercept = np.polyfit(share, fruits, 1)
+    return {
+        'settings': [(item['Date'], item['Module'], item['Turn '], item['Variety\n of the pattern'],
+                      item['Projection'], item['Fruit profitability'], item['Fruit weight/projection'])
+                     for item in data],
+        'plants': plants,
+        'density': plants / area,
+        'share': share,
+        'fruit_fit': (slope, intercept, float(np.std(fruits - (slope * share + intercept)))),
+    }
+
+
+def synthetic_flowering(rows, seed=42, profile=None, chunk_size=CHUNK_SIZE):
+    """
+    Generates flowering projection records in chunks.
+
+    Module, turn, variety, projection, date and fruit weight are drawn as observed
+    combinations; plants per lot, planting density and pollinator share are drawn
+    from the template; Fruits/Plant (100%) follows the template's linear relation
+    to pollinator share plus noise. The derived columns (Harvestable Plants,
+    Fruits/Plant, Ton/Lot, Ton/Hectare) are computed the way the real file's are.
+
+    Args:
+        rows (int): Number of lots.
+        seed (int): Random seed.
+        profile (dict, optional): From flowering_profile(); built from the real file if omitted.
+        chunk_size (int): Records per yielded list.
+
+    Yields:
+        list: Flowering dicts with epoch-millisecond dates.
+    """
+    profile = profile or flowering_profile()
+    rng = np.random.default_rng(seed)
+    settings = profile['settings']
+    slope, intercept, spread = profile['fruit_fit']
+
+    for start in range(0, rows, chunk_size):
+        n = min(chunk_size, rows - start)
+        setting = rng.integers(len(settings), size=n)
+        plants = rng.choice(profile['plants'], size=n).astype('int64')
+        area = np.round(plants / rng.choice(profile['density'], size=n), 2)
+        pollinators = np.round(plants * rng.choice(profile['share'], size=n)).astype('int64')
+        fruits_full = np.round(np.maximum(0.0, slope * pollinators / plants + intercept
+                                          + rng.normal(0, spread, size=n)), 1)
+
+        chunk = []
+        for i in range(n):
+            date, module, turn, variety, projection, profitability, weight = settings[setting[i]]
+            harvestable = int(plants[i] - pollinators[i])
+            fruits = fruits_full[i] * profitability
+            ton_lot = harvestable * fruits * weight / 1000
+            chunk.append({
+                'Date': date,
+                'Module': module,
+                'Turn ': turn,
+                'Lots': start + i + 1,
+                'Area\n (Hectares)': float(area[i]),
+                'Variety\n of the pattern': variety,
+                'Plants/Lot': int(plants[i]),
+                'Pollinators': int(pollinators[i]),
+                'Harvestable Plants': harvestable,
+                'Projection': projection,
+                'Fruits/Plant (100%)': float(fruits_full[i]),
+                'Fruit profitability': profitability,
+                'Fruit weight/projection': weight,
+                'Fruits/Plant': float(fruits),
+                'Ton/Lot': ton_lot,
+                'Ton/Hectare': ton_lot / area[i] if area[i] else 0.0,
+            })
+        yield chunk
+
+
+def write_records(chunks, path, fmt=None, columns=None):
+    """
+    Writes generated record chunks as a JSON array, NDJSON or an xlsx workbook,
+    one chunk at a time.
+
+    Args:
+        chunks (iterable): Lists of record dicts.
+        path (str): Output path.
+        fmt (str, optional): 'json', 'ndjson' or 'xlsx'; taken from the extension if omitted.
+        columns (list, optional): Header order for xlsx; defaults to the first record's keys.
+
+    Returns:
+        int: Number of records written.
+
+    Raises:
+        ValueError: For an unknown format, or more rows than fit on an xlsx sheet.
+    """
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+
+    written = 0
+    if fmt == 'xlsx':
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Sheet1')
+        for chunk in chunks:
+            if written + len(chunk) > XLSX_MAX_ROWS:
+                raise ValueError(f"xlsx sheets hold at most {XLSX_MAX_ROWS} rows")
+            if written == 0 and chunk:
+                columns = columns or list(chunk[0])
+                sheet.append(columns)
+            for record in chunk:
+                # Dates are stored as real Excel dates, as in the exported workbook
+                sheet.append([EPOCH + timedelta(milliseconds=record[column])
+                              if column in DATE_COLUMNS and record[column] is not None else record[column]
+                              for column in columns])
+            written += len(chunk)
+        workbook.save(path)
+        return written
+
+    with open(path, 'w') as f:
+        if fmt == 'json':
+            f.write('[')
+        for chunk in chunks:
+            if fmt == 'json':
+                f.write(''.join(('\n,' if written + i else '\n') + json.dumps(record)
+                                for i, record in enumerate(chunk)))
+            else:
+                f.write(''.join(json.dumps(record) + '\n' for record in chunk))
+            written += len(chunk)
+        if fmt == 'json':
+            f.write('\n]\n')
+    return written
+
+
+def generate(dataset, rows, path, fmt=None, seed=42):
+    """
+    Writes a synthetic order export or flowering projection file.
+
+    Args:
+        dataset (str): 'orders' or 'flowering'.
+        rows (int): Number of records.
+        path (str): Output path.
+        fmt (str, optional): 'json', 'ndjson' or 'xlsx'; taken from the extension if omitted.
+        seed (int): Random seed.
+
+    Returns:
+        int: Number of records written.
+    """
+    if dataset == 'orders':
+        return write_records(synthetic_orders(rows, seed), path, fmt, ORDER_COLUMNS)
+    if dataset == 'flowering':
+        return write_records(synthetic_flowering(rows, seed), path, fmt, FLOWERING_COLUMNS)
+    raise ValueError(f"Unknown dataset: {dataset}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic order exports and flowering projections.")
+    parser.add_argument('dataset', choices=('orders', 'flowering'))
+    parser.add_argument('--rows', type=parse_rows, default='10k', help="e.g. 10k, 1M, 10M")
+    parser.add_argument('--format', choices=FORMATS, default='json')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Output path (default: synthetic_<dataset>_<rows>.<format>)")
+    args = parser.parse_args()
+
+    path = args.output or f"synthetic_{args.dataset}_{args.rows}.{args.format}"
+    written = generate(args.dataset, args.rows, path, args.format, args.seed)
+    print(f"Wrote {written:,} records to {path}")
+
+
+if __name__ == "__main__":
+    main()
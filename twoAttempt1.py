@@ -2,6 +2,9 @@ import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
 
+from fulfillment import fulfillment_metrics
+from ordermodel import load_orders
+
 def analyze_production_data(df):
     """
     Analyzes production data to calculate average production times, accuracy rates, 
@@ -22,16 +25,11 @@ def analyze_production_data(df):
     # Identify orders with and without errors
     df['HAS_ERRORS'] = (df['MISSING'] > 0) | (df['REJECTED'] > 0)
 
-    # Calculate average production time for orders with errors
-    avg_production_time_errors = df[df['HAS_ERRORS']]['PRODUCTION_TIME'].mean()
-
-    # Calculate average production time for orders without errors
-    avg_production_time_no_errors = df[~df['HAS_ERRORS']]['PRODUCTION_TIME'].mean()
-
-    # Calculate average accuracy rate
-    total_orders = len(df)
-    orders_with_errors = len(df[df['HAS_ERRORS']])
-    accuracy_rate = ((total_orders - orders_with_errors) / total_orders) * 100
+    # Calculate average production times and accuracy rate in one grouped pass
+    metrics = fulfillment_metrics(df)
+    avg_production_time_errors = metrics['avg_time_with_errors']
+    avg_production_time_no_errors = metrics['avg_time_without_errors']
+    accuracy_rate = metrics['accuracy_rate']
 
     # --- Predictive Analysis ---
     # Prepare the data for predictive analysis
@@ -58,8 +56,9 @@ def analyze_production_data(df):
     else:
         print("Quantity has a larger impact on error rates.")
 
-# Load the data from the Excel file
-df = pd.read_excel("EXTERNAL_PRODUCTIONS_converted.xlsx")
+if __name__ == "__main__":
+    # Load the data from the Excel file
+    df = load_orders("EXTERNAL_PRODUCTIONS_converted.xlsx").to_frame()
 
-# Analyze the production data
-analyze_production_data(df)
\ No newline at end of file
+    # Analyze the production data
+    analyze_production_data(df)
@@ -0,0 +1,249 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from orderstream import open_orders
+from pollinatorstats import FLOWERING_FILE, RunningRegression
+
+# Input name -> raw key in the flowering export
+INPUT_KEYS = {
+    'area': 'Area\n (Hectares)',
+    'plants': 'Plants/Lot',
+    'pollinators': 'Pollinators',
+    'fruits_full': 'Fruits/Plant (100%)',
+    'profitability': 'Fruit profitability',
+    'fruit_weight': 'Fruit weight/projection',
+}
+# Scenario columns: multipliers on each lot's projected value
+FACTORS = ('pollinators', 'profitability', 'fruit_weight', 'harvestable')
+# Per-lot rows of the shared input array
+LOT_ROWS = ('fruits_full', 'share_effect', 'plants', 'pollinators', 'scale', 'area')
+# Per-scenario totals written by the workers
+SUMMARY_COLUMNS = ('Ton/Lot', 'Ton/Hectare')
+# Lots x scenarios cells computed at a time, to bound temporaries
+BLOCK_CELLS = 1 << 21
+
+# Per-process views of the shared inputs and outputs, set by _attach
+_shared = {}
+
+
+def lot_inputs(source=FLOWERING_FILE):
+    """
+    Reads the projection inputs of every lot.
+
+    Args:
+        source: Flowering JSON/NDJSON path or an iterable of records.
+
+    Returns:
+        dict: 'Lots' and each INPUT_KEYS name -> column (float64 for the inputs).
+    """
+    rows = {name: [] for name in ('Lots', *INPUT_KEYS)}
+    for record in open_orders(source):
+        rows['Lots'].append(record.get('Lots'))
+        for name, raw in INPUT_KEYS.items():
+            rows[name].append(record.get(raw))
+
+    inputs = {'Lots': np.array(rows.pop('Lots'), dtype=object)}
+    for name, values in rows.items():
+        inputs[name] = np.array([np.nan if value is None else value for value in values], dtype='float64')
+    return inputs
+
+
+def pollinator_effect(inputs):
+    """
+    Fits Fruits/Plant (100%) against pollinator share (pollinators per plant)
+    across lots, the relation the synthetic generator uses too.
+
+    Returns:
+        float: Extra fruits per plant for each unit of pollinator share.
+    """
+    share = inputs['pollinators'] / inputs['plants']
+    valid = np.isfinite(share) & np.isfinite(inputs['fruits_full'])
+    regression = RunningRegression()
+    regression.add_batch(share[valid], inputs['fruits_full'][valid])
+    return regression.result()['slope']
+
+
+def scenario_grid(**factors):
+    """
+    Builds every combination of the given multipliers.
+
+    Args:
+        **factors: FACTORS name -> sequence of multipliers, e.g.
+            pollinators=np.linspace(0.5, 2, 31). Factors left out stay at 1.
+
+    Returns:
+        pd.DataFrame: One row per scenario, one column per name in FACTORS.
+    """
+    unknown = [name for name in factors if name not in FACTORS]
+    if unknown:
+        raise ValueError(f"Unknown factors: {', '.join(unknown)}")
+    axes = [np.asarray(factors.get(name, [1.0]), dtype='float64') for name in FACTORS]
+    grid = np.meshgrid(*axes, indexing='ij')
+    return pd.DataFrame({name: values.ravel() for name, values in zip(FACTORS, grid)})
+
+
+def _attach(inputs_name, n_lots, factors_name, n_scenarios, outputs_name, per_lot):
+    # Map the parent's shared memory instead of receiving pickled copies per task
+    blocks = [shared_memory.SharedMemory(name=name) for name in (inputs_name, factors_name, outputs_name)]
+    lots = np.ndarray((len(LOT_ROWS), n_lots), dtype='float64', buffer=blocks[0].buf)
+    factors = np.ndarray((len(FACTORS), n_scenarios), dtype='float64', buffer=blocks[1].buf)
+    n_outputs = len(SUMMARY_COLUMNS) * n_scenarios + (2 * n_lots * n_scenarios if per_lot else 0)
+    outputs = np.ndarray((n_outputs,), dtype='float64', buffer=blocks[2].buf)
+    summary = outputs[:len(SUMMARY_COLUMNS) * n_scenarios].reshape(len(SUMMARY_COLUMNS), n_scenarios)
+    tons = per_hectare = None
+    if per_lot:
+        tons, per_hectare = outputs[len(SUMMARY_COLUMNS) * n_scenarios:].reshape(2, n_lots, n_scenarios)
+    _shared.update(blocks=blocks, lots=lots, factors=factors, summary=summary,
+                   tons=tons, per_hectare=per_hectare)
+
+
+def _simulate(task):
+    start, stop = task
+    fruits_full, share_effect, plants, pollinators, scale, area = _shared['lots']
+    pollinator_factor, profitability, fruit_weight, harvestable = _shared['factors'][:, start:stop]
+    summary, tons_out, per_hectare_out = _shared['summary'], _shared['tons'], _shared['per_hectare']
+
+    # Lots down, scenarios across. Fruits/Plant (100%) moves with the pollinator
+    # share, and pollinators take the place of harvestable plants (Harvestable
+    # Plants = Plants/Lot - Pollinators); Ton/Lot = harvestable plants x
+    # fruits/plant x profitability x weight
+    fruits = np.maximum(fruits_full[:, None] + share_effect[:, None] * (pollinator_factor - 1), 0)
+    harvestable_plants = np.maximum(plants[:, None] - pollinators[:, None] * pollinator_factor, 0) * harvestable
+    tons = harvestable_plants * fruits * scale[:, None] * (profitability * fruit_weight)
+
+    total = tons.sum(axis=0)
+    summary[0, start:stop] = total
+    summary[1, start:stop] = total / area.sum()
+    if tons_out is not None:
+        tons_out[:, start:stop] = tons
+        np.divide(tons, area[:, None], out=per_hectare_out[:, start:stop], where=area[:, None] > 0)
+    return stop - start
+
+
+def simulate(inputs, scenarios, slope=None, per_lot=False, workers=None):
+    """
+    Recomputes Ton/Lot and Ton/Hectare of every lot under every scenario.
+
+    Each scenario multiplies the lots' pollinators, fruit profitability, fruit
+    weight and harvestable plants. A pollinator change moves Fruits/Plant (100%)
+    by `slope` per unit of pollinator share and, since pollinators are planted in
+    place of fruiting plants, leaves Plants/Lot - pollinators harvestable plants
+    (at least 0) before the harvestable factor; the rest follows the projection's
+    own formulas (Fruits/Plant = Fruits/Plant (100%) x profitability, Ton/Lot =
+    harvestable plants x Fruits/Plant x fruit weight / 1000, Ton/Hectare =
+    Ton/Lot / area). The lots x scenarios arrays are computed with broadcasting,
+    in blocks of scenarios spread across worker processes, which read the inputs
+    and write their results straight into shared memory.
+
+    Args:
+        inputs (dict): From lot_inputs.
+        scenarios (pd.DataFrame | dict): Multipliers per scenario, with any of the
+            FACTORS columns (missing ones are 1), e.g. from scenario_grid.
+        slope (float, optional): Fruits per plant per unit of pollinator share.
+            Defaults to pollinator_effect(inputs).
+        per_lot (bool): Also return the per-lot results.
+        workers (int, optional): Worker processes. Defaults to the CPU count; 1 runs inline.
+
+    Returns:
+        pd.DataFrame: The scenarios with the total Ton/Lot over all lots, the
+        overall Ton/Hectare and the change from the projection. With per_lot,
+        a (summary, {'Ton/Lot': ..., 'Ton/Hectare': ...}) tuple whose arrays are
+        lots x scenarios.
+    """
+    scenarios = pd.DataFrame(scenarios).reset_index(drop=True)
+    unknown = [name for name in scenarios.columns if name not in FACTORS]
+    if unknown:
+        raise ValueError(f"Unknown factors: {', '.join(unknown)}")
+    slope = pollinator_effect(inputs) if slope is None else slope
+
+    # Lots with any input missing contribute nothing
+    valid = np.logical_and.reduce([np.isfinite(inputs[name]) for name in INPUT_KEYS])
+    share = inputs['pollinators'] / inputs['plants']
+    lots = np.vstack([
+        inputs['fruits_full'],
+        slope * share,
+        inputs['plants'],
+        inputs['pollinators'],
+        inputs['profitability'] * inputs['fruit_weight'] / 1000,
+        inputs['area'],
+    ])
+    lots[:, ~valid] = 0
+    lots = np.ascontiguousarray(lots, dtype='float64')
+    factors = np.ascontiguousarray(
+        [scenarios[name].to_numpy('float64') if name in scenarios else np.ones(len(scenarios))
+         for name in FACTORS], dtype='float64').reshape(len(FACTORS), len(scenarios))
+
+    n_lots, n_scenarios = lots.shape[1], factors.shape[1]
+    n_summary = len(SUMMARY_COLUMNS) * n_scenarios
+    n_outputs = n_summary + (2 * n_lots * n_scenarios if per_lot else 0)
+    step = max(1, BLOCK_CELLS // max(n_lots, 1))
+    tasks = [(start, min(start + step, n_scenarios)) for start in range(0, n_scenarios, step)]
+    workers = workers or os.cpu_count() or 1
+
+    blocks = [shared_memory.SharedMemory(create=True, size=max(size * 8, 1))
+              for size in (lots.size, factors.size, n_outputs)]
+    try:
+        np.ndarray(lots.shape, dtype='float64', buffer=blocks[0].buf)[:] = lots
+        np.ndarray(factors.shape, dtype='float64', buffer=blocks[1].buf)[:] = factors
+        # Lots without an area keep NaN for Ton/Hectare
+        np.ndarray((n_outputs,), dtype='float64', buffer=blocks[2].buf)[n_summary:] = np.nan
+        initargs = (blocks[0].name, n_lots, blocks[1].name, n_scenarios, blocks[2].name, per_lot)
+
+        if workers == 1 or len(tasks) <= 1:
+            _attach(*initargs)
+            try:
+                for task in tasks:
+                    _simulate(task)
+            finally:
+                _shared.clear()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=initargs) as pool:
+                list(pool.map(_simulate, tasks))
+
+        outputs = np.ndarray((n_outputs,), dtype='float64', buffer=blocks[2].buf)
+        summary = outputs[:n_summary].reshape(len(SUMMARY_COLUMNS), n_scenarios).copy()
+        cells = outputs[n_summary:].reshape(2, n_lots, n_scenarios).copy() if per_lot else None
+        del outputs
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    # Projected total with every factor at 1
+    baseline = (lots[0] * np.maximum(lots[2] - lots[3], 0) * lots[4]).sum()
+    result = pd.DataFrame(factors.T, columns=list(FACTORS))
+    for name, values in zip(SUMMARY_COLUMNS, summary):
+        result[name] = values
+    result['change'] = summary[0] / baseline - 1 if baseline else np.nan
+    if per_lot:
+        return result, {'Ton/Lot': cells[0], 'Ton/Hectare': cells[1]}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute flowering yield projections under a grid of scenarios.")
+    parser.add_argument('--source', default=FLOWERING_FILE)
+    parser.add_argument('--steps', type=int, default=21, help="Values per factor, from 0.5x to 1.5x")
+    parser.add_argument('--factors', nargs='+', choices=FACTORS, default=['pollinators', 'profitability', 'fruit_weight'])
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    inputs = lot_inputs(args.source)
+    grid = scenario_grid(**{name: np.linspace(0.5, 1.5, args.steps) for name in args.factors})
+    start = time.perf_counter()
+    result = simulate(inputs, grid, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"{len(grid):,} scenarios x {len(inputs['Lots']):,} lots in {elapsed:.2f}s")
+    with pd.option_context('display.width', 200):
+        print(result.nlargest(args.top, 'Ton/Lot'))
+
+
+if __name__ == "__main__":
+    main()